@@ -1,4 +1,43 @@
 import math
+import operator
+import re
+import sys
+
+_HASH_MODULUS = sys.hash_info.modulus
+_HASH_INF = sys.hash_info.inf
+
+_RATIONAL_FORMAT = re.compile(r"""
+    \s*(?P<sign>[-+]?)            # an optional sign
+    (?=\d|\.\d)                   # a digit, or a dot followed by a digit
+    (?P<num>\d*)                  # the numerator or the integer part
+    (?:
+        \s*/\s*(?P<den>\d+)       # a denominator
+    |
+        (?:\.(?P<decimal>\d*))?   # or a decimal part
+        (?:[eE](?P<exp>[-+]?\d+))? # and an exponent
+    )
+    \s*\Z
+""", re.VERBOSE | re.ASCII)
+
+
+def _integer_root(n, k):
+    """Return the integer r such that r ** k == n, or None if n is not a k-th power.
+
+    PRE : n >= 0 and k >= 2 are integers.
+    """
+    if n < 2:
+        return n
+    if k == 2:
+        root = math.isqrt(n)
+    else:
+        # Newton's method from above, it decreases to the floor of the root
+        root = 1 << - (- n.bit_length() // k)
+        while True:
+            smaller = ((k - 1) * root + n // root ** (k - 1)) // k
+            if smaller >= root:
+                break
+            root = smaller
+    return root if root ** k == n else None
 
 
 class Fraction:
@@ -9,6 +48,8 @@ class Fraction:
     This class allows fraction manipulations through several operations.
     """
 
+    __slots__ = ("__num", "__den")
+
     def __init__(self, num=0, den=1):
         """This builds a fraction based on some numerator and denominator.
 
@@ -28,6 +69,31 @@ class Fraction:
         else:
             raise ValueError("denominator and numerator must be integers !")
 
+    @classmethod
+    def _from_reduced(cls, num, den):
+        """Build a fraction from an already validated and reduced pair.
+
+        PRE : num and den are integers, den > 0 and gcd(num, den) == 1.
+        POST : return a new Fraction without re-checking or re-reducing its terms.
+        """
+        fraction = object.__new__(cls)
+        fraction.__num = num
+        fraction.__den = den
+        return fraction
+
+    @classmethod
+    def _reduce(cls, num, den):
+        """Build a fraction from integer terms whose validity is already known.
+
+        PRE : num and den are integers and den > 0.
+        POST : return a new Fraction in reduced form, skipping the type checks of __init__.
+        """
+        gcd = math.gcd(num, den)
+        if gcd != 1:
+            num //= gcd
+            den //= gcd
+        return cls._from_reduced(num, den)
+
     @property
     def numerator(self):
         return self.__num
@@ -36,6 +102,188 @@ class Fraction:
     def denominator(self):
         return self.__den
 
+    @classmethod
+    def _add_terms(cls, a, b, c, d):
+        """Add a/b and c/d with the Henrici algorithm (Knuth, TAOCP vol. 2, 4.5.1).
+
+        Only the gcd of the denominators is used, so intermediate products stay
+        as small as possible and the result needs no final reduction.
+
+        PRE : a/b and c/d are reduced with b > 0 and d > 0.
+        POST : return the reduced Fraction a/b + c/d.
+        """
+        g = math.gcd(b, d)
+        if g == 1:
+            return cls._from_reduced(a * d + b * c, b * d)
+        s = b // g
+        t = a * (d // g) + c * s
+        g2 = math.gcd(t, g)
+        if g2 == 1:
+            return cls._from_reduced(t, s * d)
+        return cls._from_reduced(t // g2, s * (d // g2))
+
+    @classmethod
+    def _mul_terms(cls, a, b, c, d):
+        """Multiply a/b by c/d, cross-cancelling before multiplying.
+
+        PRE : a/b and c/d are reduced with b > 0 and d > 0.
+        POST : return the reduced Fraction (a * c) / (b * d).
+        """
+        g1 = math.gcd(a, d)
+        if g1 > 1:
+            a //= g1
+            d //= g1
+        g2 = math.gcd(c, b)
+        if g2 > 1:
+            c //= g2
+            b //= g2
+        return cls._from_reduced(a * c, b * d)
+
+    # ------------------ Alternative constructors ------------------
+
+    @staticmethod
+    def _parse_terms(text):
+        """Parse "3/7", "-0.125", "1e-3" or "42" into an unreduced (num, den) pair.
+
+        PRE : text is a string.
+        POST : return (num, den) with den >= 0 (0 for a null denominator),
+               or None if text is not a valid rational.
+        """
+        # fast path for the most common "num/den" and "num" forms
+        head, slash, tail = text.partition("/")
+        head = head.strip()
+        digits = head[1:] if head.startswith(("-", "+")) else head
+        if digits.isdigit() and digits.isascii():
+            if not slash:
+                return int(head), 1
+            tail = tail.strip()
+            if tail.isdigit() and tail.isascii():
+                return int(head), int(tail)
+        match = _RATIONAL_FORMAT.match(text)
+        if match is None:
+            return None
+        num = int(match.group("num") or "0")
+        den = match.group("den")
+        if den is not None:
+            den = int(den)
+        else:
+            den = 1
+            decimal = match.group("decimal")
+            if decimal:
+                num = num * 10 ** len(decimal) + int(decimal)
+                den = 10 ** len(decimal)
+            exp = match.group("exp")
+            if exp is not None:
+                exp = int(exp)
+                if exp >= 0:
+                    num *= 10 ** exp
+                else:
+                    den *= 10 ** - exp
+        if match.group("sign") == "-":
+            num = - num
+        return num, den
+
+    @classmethod
+    def from_string(cls, text):
+        """Build a fraction from its textual form ("3/7", "-0.125", "1e-3", "42").
+
+        PRE : text is a string.
+        POST : return the Fraction, in reduced form, written in text.
+        RAISES : ValueError if text is not a valid rational.
+                 ZeroDivisionError if the denominator is 0.
+        """
+        terms = cls._parse_terms(text)
+        if terms is None:
+            raise ValueError(f"invalid literal for a fraction : {text!r}")
+        num, den = terms
+        if den == 0:
+            raise ZeroDivisionError("denominator cant be equal to zero")
+        return cls._reduce(num, den)
+
+    @classmethod
+    def from_decimal_string(cls, text):
+        """Build a fraction from a decimal number written as text ("0.125", "-3", "2.5e3").
+
+        PRE : text is a string.
+        POST : return the exact value of the decimal number as a Fraction.
+        RAISES : ValueError if text is not a valid decimal number.
+        """
+        terms = cls._parse_terms(text)
+        if terms is None or "/" in text:
+            raise ValueError(f"invalid literal for a decimal number : {text!r}")
+        return cls._reduce(*terms)
+
+    @classmethod
+    def from_float(cls, value):
+        """Build a fraction with the exact value of a float.
+
+        PRE : value is a float (or an int).
+        POST : return the Fraction equal to value, ex : 0.1 gives 3602879701896397/36028797018963968.
+        RAISES : ValueError if value is infinite, NaN or not a number.
+        """
+        if type(value) == int:
+            return cls._from_reduced(value, 1)
+        elif type(value) != float:
+            raise ValueError("value must be a float !")
+        elif not math.isfinite(value):
+            raise ValueError(f"cannot convert {value} to a fraction")
+        return cls._from_reduced(*value.as_integer_ratio())
+
+    @classmethod
+    def parse_many(cls, lines, strict=False):
+        """Stream an iterable of strings into Fractions.
+
+        Invalid lines are reported without raising (and catching) an exception per line.
+
+        PRE : lines is an iterable of strings, ex : a file or a CSV column.
+        POST : yield a Fraction for each line, or None for an invalid line or a null denominator.
+        RAISES : ValueError if strict is True and a line is invalid or has a null denominator.
+        """
+        parse = cls._parse_terms
+        build = cls._from_reduced
+        gcd = math.gcd
+        for line in lines:
+            terms = parse(line)
+            if terms is None or terms[1] == 0:
+                if strict:
+                    raise ValueError(f"invalid literal for a fraction : {line!r}")
+                yield None
+            else:
+                num, den = terms
+                divisor = gcd(num, den)
+                yield build(num // divisor, den // divisor)
+
+    def limit_denominator(self, max_den=1000000):
+        """Find the closest fraction to self with a denominator at most max_den.
+
+        The candidates are the convergents and the best semiconvergent of the continued
+        fraction of self, which are the best rational approximations (Stern-Brocot tree).
+
+        PRE : max_den is an integer >= 1.
+        POST : return the Fraction p/q with q <= max_den minimizing |self - p/q|.
+        RAISES : ValueError if max_den is less than 1.
+        """
+        if max_den < 1:
+            raise ValueError("max_den should be at least 1")
+        if self.__den <= max_den:
+            return self
+        p0, q0, p1, q1 = 0, 1, 1, 0
+        n, d = self.__num, self.__den
+        while True:
+            a = n // d
+            q2 = q0 + a * q1
+            if q2 > max_den:
+                break
+            p0, q0, p1, q1 = p1, q1, p0 + a * p1, q2
+            n, d = d, n - a * d
+        k = (max_den - q0) // q1
+        p2, q2 = p0 + k * p1, q0 + k * q1
+        # compare |p1/q1 - self| and |p2/q2 - self| with integers only
+        n, d = self.__num, self.__den
+        if abs(p1 * d - n * q1) * q2 <= abs(p2 * d - n * q2) * q1:
+            return Fraction._from_reduced(p1, q1)
+        return Fraction._from_reduced(p2, q2)
+
     # ------------------ Textual representations ------------------
 
     def __str__(self):
@@ -73,94 +321,263 @@ class Fraction:
         """Overloading of the + operator for fractions
 
          PRE : /
-         POST : Return a new Fraction object from the addition between arguments.
-         RAISES : TypeError if other is not a Fraction object.
+         POST : Return a new Fraction object from the addition between arguments,
+                or a float if other is a float.
+         RAISES : TypeError if other is not a Fraction, an int or a float.
          """
         if isinstance(other, Fraction):
-            num = self.numerator * other.denominator + self.denominator * other.numerator
-            den = self.denominator * other.denominator
-            return Fraction(num, den)
+            return Fraction._add_terms(self.__num, self.__den, other.__num, other.__den)
+        elif type(other) == int:
+            return Fraction._from_reduced(self.__num + other * self.__den, self.__den)
+        elif type(other) == float:
+            return float(self) + other
         else:
-            raise TypeError
+            return NotImplemented
+
+    __radd__ = __add__
 
     def __sub__(self, other):
         """Overloading of the - operator for fractions
 
         PRE : /
-        POST : Return a new Fraction object from the subtraction between arguments.
-        RAISES : TypeError if other is not a Fraction object.
+        POST : Return a new Fraction object from the subtraction between arguments,
+               or a float if other is a float.
+        RAISES : TypeError if other is not a Fraction, an int or a float.
         """
         if isinstance(other, Fraction):
-            num = self.numerator * other.denominator - self.denominator * other.numerator
-            den = self.denominator * other.denominator
-            return Fraction(num, den)
+            return Fraction._add_terms(self.__num, self.__den, - other.__num, other.__den)
+        elif type(other) == int:
+            return Fraction._from_reduced(self.__num - other * self.__den, self.__den)
+        elif type(other) == float:
+            return float(self) - other
         else:
-            raise TypeError
+            return NotImplemented
+
+    def __rsub__(self, other):
+        """Overloading of the - operator when the left operand is an int or a float"""
+        if type(other) == int:
+            return Fraction._from_reduced(other * self.__den - self.__num, self.__den)
+        elif type(other) == float:
+            return other - float(self)
+        else:
+            return NotImplemented
 
     def __mul__(self, other):
         """Overloading of the * operator for fractions
 
         PRE : /
-        POST : Return a new Fraction object from the multiplication between arguments.
-        RAISES : TypeError if other is not a Fraction object.
+        POST : Return a new Fraction object from the multiplication between arguments,
+               or a float if other is a float.
+        RAISES : TypeError if other is not a Fraction, an int or a float.
         """
         if isinstance(other, Fraction):
-            num = self.numerator * other.numerator
-            den = self.denominator * other.denominator
-            return Fraction(num, den)
+            return Fraction._mul_terms(self.__num, self.__den, other.__num, other.__den)
+        elif type(other) == int:
+            gcd = math.gcd(other, self.__den)
+            return Fraction._from_reduced(self.__num * (other // gcd), self.__den // gcd)
+        elif type(other) == float:
+            return float(self) * other
         else:
-            raise TypeError
+            return NotImplemented
+
+    __rmul__ = __mul__
 
     def __truediv__(self, other):
         """Overloading of the / operator for fractions
 
         PRE : /
-        POST : Return a new Fraction object from the division between arguments.
-        RAISES : TypeError if other is not a Fraction object.
+        POST : Return a new Fraction object from the division between arguments,
+               or a float if other is a float.
+        RAISES : TypeError if other is not a Fraction, an int or a float.
                 ZeroDivisionError if the numerator is equal to 0.
         """
         if isinstance(other, Fraction):
-            if other.numerator == 0:
+            if other.__num == 0:
                 raise ZeroDivisionError
+            elif other.__num < 0:
+                return Fraction._mul_terms(self.__num, self.__den, - other.__den, - other.__num)
             else:
-                num = self.numerator * other.denominator
-                den = self.denominator * other.numerator
-            return Fraction(num, den)
+                return Fraction._mul_terms(self.__num, self.__den, other.__den, other.__num)
+        elif type(other) == int:
+            if other == 0:
+                raise ZeroDivisionError
+            gcd = math.gcd(self.__num, other)
+            if other < 0:
+                gcd = - gcd
+            return Fraction._from_reduced(self.__num // gcd, self.__den * (other // gcd))
+        elif type(other) == float:
+            return float(self) / other
         else:
-            raise TypeError
+            return NotImplemented
 
-    def __pow__(self, power):
-        """Overloading of the ** operator for fractions
+    def __rtruediv__(self, other):
+        """Overloading of the / operator when the left operand is an int or a float
 
-        PRE : The power value need to be an integer.
-        POST : Return the power of a fraction.
-        RAISES : ZeroDivisionError if the numerator is equal to 0.
+        RAISES : ZeroDivisionError if the fraction is equal to 0.
         """
+        if type(other) == int:
+            if self.__num == 0:
+                raise ZeroDivisionError
+            gcd = math.gcd(other, self.__num)
+            if self.__num < 0:
+                gcd = - gcd
+            return Fraction._from_reduced((other // gcd) * self.__den, self.__num // gcd)
+        elif type(other) == float:
+            return other / float(self)
+        else:
+            return NotImplemented
+
+    def __pow__(self, power, modulo=None):
+        """Overloading of the ** operator and of pow() for fractions
+
+        The terms of a reduced fraction stay coprime when raised to a power, so the result of
+        an integer power is never reduced again.
+
+        PRE : power is an integer, a Fraction or a float.
+              modulo is None or an integer, then power must be an integer.
+        POST : Return the power of a fraction as a Fraction for an integer power. For a Fraction
+               power p/q, return a Fraction if the q-th root of the fraction is exact, else a float.
+               For a float power, return a float.
+               With modulo, return the integer num ** power * den ** -power modulo modulo.
+        RAISES : ZeroDivisionError if the numerator is equal to 0 and the power is negative.
+                 ValueError if modulo is 0, or if the denominator (or the numerator for
+                 a negative power) has no inverse modulo modulo.
+                 TypeError if modulo is given with a power or a modulo which is not an integer.
+        """
+        if modulo is not None:
+            if type(power) != int or type(modulo) != int:
+                raise TypeError("pow() with a modulo needs integer power and modulo")
+            if modulo == 0:
+                raise ValueError("pow() modulus cannot be 0")
+            try:
+                return pow(self.__num, power, modulo) * pow(self.__den, - power, modulo) % modulo
+            except ValueError:
+                raise ValueError(f"{self} has no inverse modulo {modulo}") from None
+        if isinstance(power, Fraction):
+            if power.__den == 1:
+                power = power.__num
+            else:
+                return self._root_power(power.__num, power.__den)
+        elif type(power) == float:
+            return float(self) ** power
+        elif type(power) != int:
+            return NotImplemented
         if power == 0:
-            return Fraction(1, 1)
+            return Fraction._from_reduced(1, 1)
         elif power < 0:
-            if self.numerator == 0:
+            if self.__num == 0:
                 raise ZeroDivisionError
+            elif self.__num < 0:
+                return Fraction._from_reduced(pow(- self.__den, - power), pow(- self.__num, - power))
             else:
-                num = pow(self.denominator, - power)
-                den = pow(self.numerator, - power)
-                return Fraction(num, den)
+                return Fraction._from_reduced(pow(self.__den, - power), pow(self.__num, - power))
         else:
-            num = pow(self.numerator, power)
-            den = pow(self.denominator, power)
-            return Fraction(num, den)
+            return Fraction._from_reduced(pow(self.__num, power), pow(self.__den, power))
+
+    def __rpow__(self, other):
+        """Overloading of the ** operator when the left operand is an int or a float, see __pow__"""
+        if type(other) == int:
+            return Fraction._from_reduced(other, 1) ** self
+        elif type(other) == float:
+            return other ** float(self)
+        else:
+            return NotImplemented
+
+    def _root_power(self, p, q):
+        """Raise the fraction to the power p/q.
+
+        PRE : p/q is reduced with q > 1.
+        POST : return a Fraction if the q-th root of the fraction is exact, else a float
+               (a complex for a negative fraction without an exact root).
+        """
+        num = self.__num
+        if num < 0 and q % 2 == 1:
+            root_num = _integer_root(- num, q)
+            if root_num is not None:
+                root_num = - root_num
+        elif num < 0:
+            root_num = None
+        else:
+            root_num = _integer_root(num, q)
+        if root_num is not None:
+            root_den = _integer_root(self.__den, q)
+            if root_den is not None:
+                return Fraction._from_reduced(root_num, root_den) ** p
+        return float(self) ** (p / q)
 
     def __eq__(self, other):
         """Overloading of the == operator for fractions
 
-        PRE : All arguments used need to be Fraction objects.
-        POST : Return True if all arguments are the same and False if not.
-        RAISES : TypeError if other is not a Fraction object.
+        PRE : /
+        POST : Return True if other is a Fraction, an int or a float with the same value, False if not.
         """
         if isinstance(other, Fraction):
-            return self.numerator == other.numerator and self.denominator == other.denominator
+            return self.__num == other.__num and self.__den == other.__den
+        elif type(other) == int:
+            return self.__den == 1 and self.__num == other
+        elif type(other) == float:
+            if math.isfinite(other):
+                return (self.__num, self.__den) == other.as_integer_ratio()
+            return False
         else:
-            raise TypeError
+            return NotImplemented
+
+    def __hash__(self):
+        """Return a hash consistent with the one of int and float for equal values
+
+        The algorithm is the one of the standard library for rationals: the value is
+        reduced modulo the hash modulus, so Fraction(n, 1) and n share the same hash.
+        """
+        try:
+            inverse = pow(self.__den, -1, _HASH_MODULUS)
+        except ValueError:
+            # den is a multiple of the modulus, so it has no inverse
+            result = _HASH_INF
+        else:
+            result = hash(hash(abs(self.__num)) * inverse)
+        if self.__num < 0:
+            result = - result
+        return -2 if result == -1 else result
+
+    def _compare(self, other, compare):
+        """Compare two values with cross-multiplication, without building a new Fraction
+
+        PRE : compare is a comparison function of two integers (ex : operator.lt).
+        POST : return the result of compare, or NotImplemented if other is not
+               a Fraction, an int or a float.
+        """
+        if isinstance(other, Fraction):
+            return compare(self.__num * other.__den, other.__num * self.__den)
+        elif type(other) == int:
+            return compare(self.__num, other * self.__den)
+        elif type(other) == float:
+            if not math.isfinite(other):
+                return compare(0.0, other)
+            num, den = other.as_integer_ratio()
+            return compare(self.__num * den, num * self.__den)
+        else:
+            return NotImplemented
+
+    def __lt__(self, other):
+        """Overloading of the < operator for fractions
+
+        PRE : /
+        POST : Return True if the fraction is strictly less than other.
+        RAISES : TypeError if other is not a Fraction, an int or a float.
+        """
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        """Overloading of the <= operator for fractions, see __lt__"""
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        """Overloading of the > operator for fractions, see __lt__"""
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        """Overloading of the >= operator for fractions, see __lt__"""
+        return self._compare(other, operator.ge)
 
     def __float__(self):
         """Returns the decimal value of the fraction
@@ -170,8 +587,6 @@ class Fraction:
         """
         return self.numerator / self.denominator
 
-    # TODO : [BONUS] You can overload other operators if you wish (ex : <, >, ...)
-
     # ------------------ Properties checking ------------------
 
     def is_zero(self):
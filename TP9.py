@@ -98,6 +98,26 @@ class FractionTestCase(unittest.TestCase):
         with self.assertRaises(ZeroDivisionError):
             pow(Fraction(0, 2), -1)
 
+    def test_power_modulo(self):
+        self.assertEqual(pow(Fraction(1, 2), 1, 7), 4)
+        self.assertEqual(pow(Fraction(3, 4), -2, 7), 1)
+        self.assertEqual(pow(Fraction(-2, 3), 3, 11), 5)
+        with self.assertRaises(ValueError):
+            pow(Fraction(1, 7), 2, 7)
+        with self.assertRaisesRegex(ValueError, "cannot be 0"):
+            pow(Fraction(1, 2), 3, 0)
+        with self.assertRaises(TypeError):
+            pow(Fraction(1, 2), Fraction(1, 2), 7)
+
+    def test_power_fraction(self):
+        self.assertEqual(Fraction(8, 27) ** Fraction(2, 3), Fraction(4, 9))
+        self.assertEqual(Fraction(-8, 27) ** Fraction(1, 3), Fraction(-2, 3))
+        self.assertEqual(Fraction(4, 9) ** Fraction(-1, 2), Fraction(3, 2))
+        self.assertEqual(Fraction(2, 3) ** Fraction(4, 1), Fraction(16, 81))
+        self.assertEqual(4 ** Fraction(1, 2), Fraction(2, 1))
+        self.assertAlmostEqual(Fraction(2, 1) ** Fraction(1, 2), 2 ** 0.5)
+        self.assertAlmostEqual(Fraction(1, 4) ** 0.5, 0.5)
+
     def test_is_equal(self):
         self.assertEqual(Fraction(1, 2) == Fraction(8, 16), True)
         self.assertEqual(Fraction(2, 4) == Fraction(1, 2), True)
@@ -140,6 +160,76 @@ class FractionTestCase(unittest.TestCase):
         self.assertEqual(Fraction(1, 3).is_adjacent_to(Fraction(2, 3)), False)
         self.assertEqual(Fraction(1, 3).is_adjacent_to(Fraction(1, 5)), False)
 
+    def test_slots(self):
+        self.assertEqual(hasattr(Fraction(1, 2), "__dict__"), False)
+        self.assertEqual(str(Fraction(2, 4) * Fraction(-2, 3)), "-1/3")
+        self.assertEqual(str(Fraction(1, 2) / Fraction(-1, 4)), "-2")
+        self.assertEqual(str(pow(Fraction(-2, 3), -3)), "-27/8")
+
+    def test_hash(self):
+        self.assertEqual(hash(Fraction(1, 2)) == hash(Fraction(2, 4)), True)
+        self.assertEqual(hash(Fraction(6, 3)) == hash(2), True)
+        self.assertEqual(hash(Fraction(-1, 4)) == hash(-0.25), True)
+        self.assertEqual(len({Fraction(1, 2), Fraction(3, 6), Fraction(2, 1), 2}), 2)
+
+    def test_comparison(self):
+        self.assertEqual(Fraction(1, 3) < Fraction(1, 2), True)
+        self.assertEqual(Fraction(-1, 2) > Fraction(-1, 3), False)
+        self.assertEqual(Fraction(4, 2) <= 2, True)
+        self.assertEqual(Fraction(1, 3) >= 0.5, False)
+        self.assertEqual(sorted([Fraction(3, 4), 1, Fraction(-1, 2)]), [Fraction(-1, 2), Fraction(3, 4), 1])
+        with self.assertRaises(TypeError):
+            Fraction(1, 2) < "1/2"
+
+    def test_int_operands(self):
+        self.assertEqual(Fraction(1, 2) + 1, Fraction(3, 2))
+        self.assertEqual(1 - Fraction(1, 3), Fraction(2, 3))
+        self.assertEqual(Fraction(5, 6) * 3, Fraction(5, 2))
+        self.assertEqual(Fraction(2, 3) / -4, Fraction(-1, 6))
+        self.assertEqual(3 / Fraction(-6, 5), Fraction(-5, 2))
+        with self.assertRaises(ZeroDivisionError):
+            Fraction(1, 2) / 0
+        with self.assertRaises(TypeError):
+            Fraction(1, 2) + "1"
+
+    def test_float_operands(self):
+        self.assertEqual(Fraction(1, 2) + 0.25, 0.75)
+        self.assertEqual(Fraction(1, 4) == 0.25, True)
+        self.assertEqual(1.5 * Fraction(1, 2), 0.75)
+
+    def test_from_string(self):
+        self.assertEqual(Fraction.from_string("3/6"), Fraction(1, 2))
+        self.assertEqual(Fraction.from_string(" -0.125 "), Fraction(-1, 8))
+        self.assertEqual(Fraction.from_string("2.5e-1"), Fraction(1, 4))
+        self.assertEqual(Fraction.from_decimal_string("12"), Fraction(12, 1))
+        with self.assertRaises(ValueError):
+            Fraction.from_string("Thibault")
+        with self.assertRaises(ValueError):
+            Fraction.from_decimal_string("1/2")
+        with self.assertRaises(ZeroDivisionError):
+            Fraction.from_string("1/0")
+
+    def test_from_float(self):
+        self.assertEqual(Fraction.from_float(0.5), Fraction(1, 2))
+        self.assertEqual(Fraction.from_float(-2.75), Fraction(-11, 4))
+        self.assertEqual(Fraction.from_float(0.1), Fraction(3602879701896397, 36028797018963968))
+        with self.assertRaises(ValueError):
+            Fraction.from_float(float("inf"))
+
+    def test_limit_denominator(self):
+        self.assertEqual(Fraction(314159, 100000).limit_denominator(10), Fraction(22, 7))
+        self.assertEqual(Fraction(314159, 100000).limit_denominator(200), Fraction(355, 113))
+        self.assertEqual(Fraction.from_float(0.1).limit_denominator(), Fraction(1, 10))
+        self.assertEqual(Fraction(-1, 3).limit_denominator(5), Fraction(-1, 3))
+        with self.assertRaises(ValueError):
+            Fraction(1, 3).limit_denominator(0)
+
+    def test_parse_many(self):
+        self.assertEqual(list(Fraction.parse_many(["1/2", "x", "0.75", "2/0"])),
+                         [Fraction(1, 2), None, Fraction(3, 4), None])
+        with self.assertRaises(ValueError):
+            list(Fraction.parse_many(["1/2", "x"], strict=True))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,199 @@
+import argparse
+import fractions
+import json
+import platform
+import random
+import statistics
+import sys
+import timeit
+
+from TP7 import Fraction
+from fraction_accumulator import fraction_sum
+
+
+def make_operands(seed, size=256):
+    """Build the operand pools used by the benchmarks.
+
+    PRE : seed is an integer, size the number of operands of each pool.
+    POST : return a dict of pools of (numerator, denominator) pairs :
+           "small" for values below 1000 and "huge" for values of about 2000 bits.
+    """
+    rng = random.Random(seed)
+    pools = {
+        "small": [(rng.randint(-999, 999), rng.randint(1, 999)) for _ in range(size)],
+        "huge": [(rng.getrandbits(2000) - (1 << 1999), rng.getrandbits(2000) | 1) for _ in range(size)],
+    }
+    return pools
+
+
+def make_cases(pools):
+    """Build the benchmark cases.
+
+    POST : return a list of (name, function, size) where function takes no argument and
+           runs one pass of size operations over an operand pool.
+    """
+    cases = []
+    for label, pairs in pools.items():
+        ours = [Fraction(num, den) for num, den in pairs]
+        theirs = [fractions.Fraction(num, den) for num, den in pairs]
+        shifted = ours[1:] + ours[:1]
+        shifted_theirs = theirs[1:] + theirs[:1]
+        for impl, values, others, cls in (("tp7", ours, shifted, Fraction),
+                                           ("stdlib", theirs, shifted_theirs, fractions.Fraction)):
+            def construct(pairs=pairs, cls=cls):
+                for num, den in pairs:
+                    cls(num, den)
+
+            def add(values=values, others=others):
+                for a, b in zip(values, others):
+                    a + b
+
+            def sub(values=values, others=others):
+                for a, b in zip(values, others):
+                    a - b
+
+            def mul(values=values, others=others):
+                for a, b in zip(values, others):
+                    a * b
+
+            def truediv(values=values, others=others):
+                for a, b in zip(values, others):
+                    if b:
+                        a / b
+
+            def power(values=values):
+                for a in values:
+                    a ** 7
+
+            def power_large(values=values[:16]):
+                for a in values:
+                    a ** 2000
+
+            def less(values=values, others=others):
+                for a, b in zip(values, others):
+                    a < b
+
+            def equal(values=values, others=others):
+                for a, b in zip(values, others):
+                    a == b
+
+            def to_float(values=values):
+                for a in values:
+                    float(a)
+
+            def to_str(values=values):
+                for a in values:
+                    str(a)
+
+            def chain_sum(values=values, zero=cls(0, 1)):
+                total = zero
+                for a in values:
+                    total = total + a
+
+            def chain_prod(values=values[:32], one=cls(1, 1)):
+                total = one
+                for a in values:
+                    total = total * a
+
+            for name, function in (("construct", construct), ("add", add), ("sub", sub),
+                                   ("mul", mul), ("truediv", truediv), ("pow", power),
+                                   ("lt", less), ("eq", equal), ("float", to_float),
+                                   ("str", to_str), ("chain_sum", chain_sum)):
+                cases.append((f"{label}.{name}.{impl}", function, len(values)))
+            # these two only run on a slice : the time per item is divided by the slice's length
+            cases.append((f"{label}.chain_prod.{impl}", chain_prod, len(values[:32])))
+            cases.append((f"{label}.pow_large.{impl}", power_large, len(values[:16])))
+
+        def mixed(values=ours):
+            for a in values:
+                a.as_mixed_number()
+
+        def adjacent(values=ours, others=shifted):
+            for a, b in zip(values, others):
+                a.is_adjacent_to(b)
+
+        def lazy_sum(values=ours):
+            fraction_sum(values)
+
+        cases.append((f"{label}.as_mixed_number.tp7", mixed, len(ours)))
+        cases.append((f"{label}.is_adjacent_to.tp7", adjacent, len(ours)))
+        cases.append((f"{label}.fraction_sum.tp7", lazy_sum, len(ours)))
+    return cases
+
+
+def run(cases, repeat, min_time, pattern=None):
+    """Time each case and return the results as a dict.
+
+    PRE : repeat is the number of measures, min_time the minimal duration of one measure.
+          pattern, if given, keeps only the cases whose name contains it.
+    POST : return {name: {"best": seconds per operation, "median": seconds per operation}}.
+    """
+    results = {}
+    for name, function, size in cases:
+        if pattern and pattern not in name:
+            continue
+        timer = timeit.Timer(function)
+        number, taken = timer.autorange()
+        number = max(1, round(number * min_time / taken))
+        timings = [t / (number * size) for t in timer.repeat(repeat=repeat, number=number)]
+        results[name] = {"best": min(timings), "median": statistics.median(timings)}
+        print(f"{name:40} {results[name]['best'] * 1e9:12.1f} ns/op", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Compare some results with a baseline.
+
+    PRE : results and baseline are dicts returned by run, tolerance a relative slowdown (ex : 0.1).
+    POST : return the list of (name, ratio) of the cases slower than the baseline by more than tolerance.
+    """
+    regressions = []
+    for name, measure in results.items():
+        if name in baseline:
+            ratio = measure["best"] / baseline[name]["best"]
+            if ratio > 1 + tolerance:
+                regressions.append((name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks of the Fraction hot paths.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="JSON results to compare with, exits with 1 on regression.")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of measures per case.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimal duration of a measure in seconds.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the operand pools.")
+    parser.add_argument("--size", type=int, default=256, help="Number of operands per pool.")
+    parser.add_argument("--filter", help="Only run the cases whose name contains this text.")
+    args = parser.parse_args(argv)
+
+    cases = make_cases(make_operands(args.seed, args.size))
+    results = run(cases, args.repeat, args.min_time, args.filter)
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "size": args.size,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for name, ratio in regressions:
+            print(f"REGRESSION {name} : {ratio:.2f}x slower than the baseline", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+from grid_model import GridModel
+
+
+def bench_build(size, repeat):
+    """Time the creation of a size * size grid and of its first full texture buffer.
+
+    POST : return the list of the measured durations in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        model = GridModel(size, size)
+        model.render()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_toggle(size, touches, seed):
+    """Time the work done by GridWidget for one touch : find the cell, toggle it and get the bytes to upload.
+
+    POST : return the list of the durations of each touch in seconds.
+    """
+    rng = random.Random(seed)
+    model = GridModel(size, size)
+    width = height = 1000.0
+    points = [(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(touches)]
+    timings = []
+    for x, y in points:
+        start = time.perf_counter()
+        col, row = model.cell_at(x, y, width, height)
+        model.toggle(col, row)
+        for i in model.take_dirty():
+            model.cell_color(i)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmarks of the grid model used by ex3.GridWidget.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 200, 1000], help="Side lengths of the grids.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of builds measured per size.")
+    parser.add_argument("--touches", type=int, default=10000, help="Number of toggles measured per size.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the touch positions.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for size in args.sizes:
+        build = bench_build(size, args.repeat)
+        toggle = bench_toggle(size, args.touches, args.seed)
+        toggle.sort()
+        results[f"{size}x{size}"] = {
+            "build_best": min(build),
+            "build_median": statistics.median(build),
+            "toggle_median": statistics.median(toggle),
+            "toggle_p99": toggle[int(len(toggle) * 0.99) - 1],
+        }
+        print(f"{size}x{size:<6} build {min(build) * 1e3:10.3f} ms   toggle {statistics.median(toggle) * 1e6:8.2f} us "
+              f"(p99 {results[f'{size}x{size}']['toggle_p99'] * 1e6:.2f} us)", file=sys.stderr)
+    report = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+import math
+import operator
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from TP7 import Fraction
+
+# Largest absolute value of an exponent, a bigger one would freeze the caller for a long time
+MAX_EXPONENT = 10000
+
+# Largest size in bits of the terms of a power : (9^9999)^999 has a small exponent but a result of
+# 32 million bits, which takes seconds to compute and would then stay in the caches
+MAX_POWER_BITS = 1 << 17
+
+# Largest absolute value of the exponent of a literal like 1e300 : 10 ** k has about 3.32 * k bits,
+# so the literal terms stay within MAX_POWER_BITS
+MAX_DECIMAL_EXPONENT = int(MAX_POWER_BITS / math.log2(10))
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+    |
+        (?P<operator>\*\*|[-+*/^()])
+    |
+        (?P<error>\S)                 # anything else is an error
+    )
+""", re.VERBOSE | re.ASCII)
+
+
+def _power(base, exponent):
+    if exponent.denominator != 1:
+        raise ValueError("the exponent must be an integer !")
+    exponent = exponent.numerator
+    if abs(exponent) > MAX_EXPONENT:
+        raise ValueError(f"the exponent must be between -{MAX_EXPONENT} and {MAX_EXPONENT} !")
+    # the terms of base ** k have at most k times the bits of the terms of base
+    if max(base.numerator.bit_length(), base.denominator.bit_length()) * abs(exponent) > MAX_POWER_BITS:
+        raise ValueError(f"the result of the power would have more than {MAX_POWER_BITS} bits !")
+    return base ** exponent
+
+
+def _negate(value):
+    return Fraction._from_reduced(- value.numerator, value.denominator)
+
+
+OPERATIONS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "^": _power,
+}
+
+
+def _tokenize(text):
+    """Split an expression into tokens.
+
+    POST : return (kinds, values) where kinds[i] is an operator or "number",
+           and values[i] the Fraction of a number.
+    RAISES : ValueError if text contains anything else.
+    """
+    kinds = []
+    values = []
+    for number, symbol, error in _TOKEN.findall(text):
+        if number:
+            kinds.append("number")
+            if number.isdigit():
+                values.append(Fraction._from_reduced(int(number), 1))
+            else:
+                exponent = number.lower().partition("e")[2]
+                if exponent and abs(int(exponent)) > MAX_DECIMAL_EXPONENT:
+                    raise ValueError(f"the exponent of {number[:20]!r} must be between "
+                                     f"-{MAX_DECIMAL_EXPONENT} and {MAX_DECIMAL_EXPONENT} !")
+                values.append(Fraction.from_decimal_string(number))
+        elif symbol:
+            kinds.append("^" if symbol == "**" else symbol)
+            values.append(None)
+        else:
+            raise ValueError(f"unexpected character : {error!r}")
+    return kinds, values
+
+
+def _unexpected(kind):
+    return ValueError("unexpected number" if kind == "number" else f"unexpected {kind!r}")
+
+
+class _Parser:
+    """Recursive descent parser turning tokens into a program in postfix order
+
+    expression := term (("+" | "-") term)*
+    term       := factor (("*" | "/") factor)*
+    factor     := ("+" | "-") factor | power
+    power      := atom ("^" factor)?
+    atom       := number | "(" expression ")"
+    """
+
+    def __init__(self, kinds, values):
+        # the kinds end with None, so peek never goes past the end
+        self.kinds = kinds + [None]
+        self.values = values
+        self.position = 0
+        self.program = []
+
+    def peek(self):
+        return self.kinds[self.position]
+
+    def take(self):
+        kind = self.kinds[self.position]
+        if kind is None:
+            raise ValueError("unexpected end of the expression")
+        self.position += 1
+        return kind
+
+    def expression(self):
+        self.term()
+        while self.peek() in ("+", "-"):
+            symbol = self.take()
+            self.term()
+            self.program.append(symbol)
+
+    def term(self):
+        self.factor()
+        while self.peek() in ("*", "/"):
+            symbol = self.take()
+            self.factor()
+            self.program.append(symbol)
+
+    def factor(self):
+        if self.peek() in ("+", "-"):
+            if self.take() == "-":
+                self.factor()
+                self.program.append("neg")
+            else:
+                self.factor()
+        else:
+            self.power()
+
+    def power(self):
+        self.atom()
+        if self.peek() == "^":
+            self.take()
+            # right associative : 2^3^2 is 2^(3^2), and 2^-1 is allowed
+            self.factor()
+            self.program.append("^")
+
+    def atom(self):
+        kind = self.take()
+        if kind == "number":
+            self.program.append(self.values[self.position - 1])
+        elif kind == "(":
+            self.expression()
+            if self.take() != ")":
+                raise ValueError("a closing parenthesis is missing")
+        else:
+            raise _unexpected(kind)
+
+
+@lru_cache(maxsize=4096)
+def parse(text):
+    """Compile an arithmetic expression.
+
+    PRE : text is a string made of numbers (integers or decimals like "2.5" or "1e-3"),
+          the operators + - * / ^ (or **) and parentheses.
+    POST : return the expression as a tuple of Fractions and operators in postfix order.
+           The result is cached by text.
+    RAISES : ValueError if text is not a valid expression.
+    """
+    parser = _Parser(*_tokenize(text))
+    parser.expression()
+    if parser.peek() is not None:
+        raise _unexpected(parser.peek())
+    return tuple(parser.program)
+
+
+def run(program):
+    """Evaluate a program returned by parse.
+
+    POST : return the exact value as a Fraction.
+    RAISES : ZeroDivisionError if the expression divides by 0.
+             ValueError if an exponent is not an integer or is too large, or a power is too large.
+    """
+    stack = []
+    for item in program:
+        if type(item) != str:
+            stack.append(item)
+        elif item == "neg":
+            stack[-1] = _negate(stack[-1])
+        else:
+            right = stack.pop()
+            stack[-1] = OPERATIONS[item](stack[-1], right)
+    return stack[0]
+
+
+@lru_cache(maxsize=4096)
+def evaluate(text):
+    """Evaluate an arithmetic expression exactly, ex : evaluate("1/3 + 0.5") gives 5/6.
+
+    PRE : text is an expression, see parse.
+    POST : return its value as a Fraction. The result is cached by text.
+    RAISES : ValueError if text is not a valid expression, an exponent is not a small integer
+             or a power is too large.
+             ZeroDivisionError if the expression divides by 0.
+    """
+    return run(parse(text))
+
+
+def _evaluate_or_error(text):
+    try:
+        return evaluate(text)
+    except (ValueError, ZeroDivisionError) as error:
+        return error
+
+
+def evaluate_many(expressions, workers=None, return_exceptions=False):
+    """Evaluate a batch of expressions.
+
+    Each distinct text is evaluated once; with workers, the distinct texts are shared
+    between processes.
+
+    PRE : expressions is an iterable of strings.
+          workers is None or the number of processes to use.
+          return_exceptions tells if invalid expressions give their exception instead of raising it.
+    POST : return the list of the values, in the order of expressions.
+    RAISES : ValueError or ZeroDivisionError for the first invalid expression,
+             unless return_exceptions is True.
+    """
+    expressions = list(expressions)
+    distinct = list(dict.fromkeys(expressions))
+    if workers and workers > 1 and len(distinct) > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            chunk = max(1, len(distinct) // (4 * workers))
+            values = dict(zip(distinct, pool.map(_evaluate_or_error, distinct, chunksize=chunk)))
+    else:
+        values = {text: _evaluate_or_error(text) for text in distinct}
+    results = [values[text] for text in expressions]
+    if not return_exceptions:
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+    return results
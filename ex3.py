@@ -1,22 +1,72 @@
 from kivy.app import App
-from kivy.uix.gridlayout import GridLayout
-from kivy.uix.button import Button
+from kivy.clock import Clock
+from kivy.graphics import Rectangle
+from kivy.graphics.texture import Texture
+from kivy.uix.widget import Widget
+
+from grid_model import GridModel
+
+
+class GridWidget(Widget):
+    """Widget drawing a whole grid of cells with a single textured rectangle
+
+    Each cell is one pixel of a texture scaled without smoothing, touches are mapped to cells
+    arithmetically and only the changed cells are uploaded, once per frame.
+    """
+
+    def __init__(self, cols=5, rows=5, **kwargs):
+        super(GridWidget, self).__init__(**kwargs)
+        self.model = GridModel(cols, rows)
+        self.texture = Texture.create(size=(cols, rows), colorfmt="rgba")
+        self.texture.mag_filter = "nearest"
+        self.texture.min_filter = "nearest"
+        self.texture.add_reload_observer(self.reload)
+        self.reload(self.texture)
+        with self.canvas:
+            self.rect = Rectangle(texture=self.texture, pos=self.pos, size=self.size)
+        self.bind(pos=self.update_rect, size=self.update_rect)
+        # Several toggles in the same frame give a single upload
+        self.redraw = Clock.create_trigger(self.flush)
+
+    def reload(self, texture):
+        self.model.take_dirty()
+        texture.blit_buffer(bytes(self.model.render()), colorfmt="rgba", bufferfmt="ubyte")
+
+    def update_rect(self, *args):
+        self.rect.pos = self.pos
+        self.rect.size = self.size
+
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            return super(GridWidget, self).on_touch_down(touch)
+        cell = self.model.cell_at(touch.x - self.x, touch.y - self.y, self.width, self.height)
+        if cell is not None:
+            self.model.toggle(*cell)
+            self.redraw()
+        return True
+
+    def flush(self, *args):
+        dirty = self.model.take_dirty()
+        if len(dirty) > self.model.cols:
+            # Past a row of changes, one upload of the whole texture is cheaper
+            self.texture.blit_buffer(bytes(self.model.render()), colorfmt="rgba", bufferfmt="ubyte")
+        else:
+            cols = self.model.cols
+            for i in dirty:
+                row, col = divmod(i, cols)
+                self.texture.blit_buffer(self.model.cell_color(i), size=(1, 1), pos=(col, row),
+                                         colorfmt="rgba", bufferfmt="ubyte")
+        self.canvas.ask_update()
 
 
 class MyApp(App):
+    def __init__(self, cols=5, rows=5, **kwargs):
+        super(MyApp, self).__init__(**kwargs)
+        self.cols = cols
+        self.rows = rows
+
     def build(self):
-        layout = GridLayout(cols=5, rows=5)
-        for i in range(25):
-            btn = Button(background_color='white')
-            btn.bind(on_press=self.change_color)
-            layout.add_widget(btn)
-        return layout
-
-    def change_color(self, instance):
-        if instance.background_color == [1, 1, 1, 1]:
-            instance.background_color = [0, 1, 1, 1]
-        else:
-            instance.background_color = [1, 1, 1, 1]
+        return GridWidget(cols=self.cols, rows=self.rows)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,209 @@
+import math
+
+from TP7 import Fraction
+
+
+def _terms(value):
+    """Return the (numerator, denominator) pair of a Fraction or an integer.
+
+    RAISES : TypeError if value is not a Fraction object or an integer.
+    """
+    if isinstance(value, Fraction):
+        return value.numerator, value.denominator
+    elif type(value) == int:
+        return value, 1
+    else:
+        raise TypeError
+
+
+def _pairwise(items, merge):
+    """Fold a list with merge as a balanced binary tree instead of left to right.
+
+    PRE : items is a non-empty list, merge is an associative function of two items.
+    POST : return merge applied over all the items, operands staying of similar size.
+    """
+    while len(items) > 1:
+        merged = [merge(items[i], items[i + 1]) for i in range(0, len(items) - 1, 2)]
+        if len(items) % 2:
+            merged.append(items[-1])
+        items = merged
+    return items[0]
+
+
+def _add_pairs(left, right):
+    """Add two unreduced (numerator, denominator) pairs over the lcm of their denominators."""
+    a, b = left
+    c, d = right
+    if b == d:
+        return a + c, b
+    lcm = b // math.gcd(b, d) * d
+    return a * (lcm // b) + c * (lcm // d), lcm
+
+
+def _mul_pairs(left, right):
+    """Multiply two unreduced (numerator, denominator) pairs without reducing."""
+    return left[0] * right[0], left[1] * right[1]
+
+
+class SumAccumulator:
+    """Class accumulating a sum of fractions with lazy reduction
+
+    Terms are grouped by denominator, so adding a fraction is a single integer addition.
+    The groups are merged over their lcm when there are too many of them, and the only
+    gcd reduction happens when the value is requested.
+    """
+
+    def __init__(self, max_groups=256, pairwise=True):
+        """This builds an empty sum.
+
+        PRE : max_groups is a positive integer, the number of distinct denominators kept before merging.
+              pairwise tells if groups are merged as a balanced tree (True) or left to right.
+        POST : create an accumulator whose value is 0.
+        """
+        self.__groups = {}
+        self.__max_groups = max_groups
+        self.__pairwise = pairwise
+
+    def add(self, value):
+        """Add a fraction or an integer to the sum.
+
+        PRE : /
+        POST : the value of the accumulator is increased by value.
+        RAISES : TypeError if value is not a Fraction object or an integer.
+        """
+        num, den = _terms(value)
+        groups = self.__groups
+        groups[den] = groups.get(den, 0) + num
+        if len(groups) > self.__max_groups:
+            self.__collapse()
+
+    def extend(self, values):
+        """Add every fraction of an iterable to the sum."""
+        groups = self.__groups
+        max_groups = self.__max_groups
+        for value in values:
+            num, den = _terms(value)
+            groups[den] = groups.get(den, 0) + num
+            if len(groups) > max_groups:
+                self.__collapse()
+
+    def __iadd__(self, value):
+        self.add(value)
+        return self
+
+    def __collapse(self):
+        """Merge all the groups into a single one over the lcm of their denominators."""
+        if not self.__groups:
+            return
+        pairs = [(num, den) for den, num in self.__groups.items()]
+        if self.__pairwise:
+            num, den = _pairwise(pairs, _add_pairs)
+        else:
+            num, den = pairs[0]
+            for pair in pairs[1:]:
+                num, den = _add_pairs((num, den), pair)
+        self.__groups.clear()
+        self.__groups[den] = num
+
+    def value(self):
+        """Return the reduced sum as a Fraction.
+
+        PRE : /
+        POST : return the sum of all the values added so far.
+        """
+        if not self.__groups:
+            return Fraction._from_reduced(0, 1)
+        self.__collapse()
+        ((den, num),) = self.__groups.items()
+        return Fraction._reduce(num, den)
+
+
+class ProductAccumulator:
+    """Class accumulating a product of fractions with lazy reduction
+
+    Numerators and denominators are buffered and multiplied in balanced trees once the
+    buffer is full; the gcd reduction is only done when the value is requested.
+    """
+
+    def __init__(self, buffer_size=256, pairwise=True):
+        """This builds an empty product.
+
+        PRE : buffer_size is a positive integer, the number of factors kept before folding.
+              pairwise tells if factors are folded as a balanced tree (True) or left to right.
+        POST : create an accumulator whose value is 1.
+        """
+        self.__num = 1
+        self.__den = 1
+        self.__buffer = []
+        self.__buffer_size = buffer_size
+        self.__pairwise = pairwise
+
+    def multiply(self, value):
+        """Multiply the product by a fraction or an integer.
+
+        PRE : /
+        POST : the value of the accumulator is multiplied by value.
+        RAISES : TypeError if value is not a Fraction object or an integer.
+        """
+        self.__buffer.append(_terms(value))
+        if len(self.__buffer) >= self.__buffer_size:
+            self.__fold()
+
+    def extend(self, values):
+        """Multiply the product by every fraction of an iterable."""
+        for value in values:
+            self.multiply(value)
+
+    def __imul__(self, value):
+        self.multiply(value)
+        return self
+
+    def __fold(self):
+        """Multiply the buffered factors into the running numerator and denominator."""
+        if not self.__buffer:
+            return
+        if self.__pairwise:
+            num, den = _pairwise(self.__buffer, _mul_pairs)
+        else:
+            num, den = 1, 1
+            for pair in self.__buffer:
+                num, den = _mul_pairs((num, den), pair)
+        self.__buffer = []
+        self.__num *= num
+        self.__den *= den
+
+    def value(self):
+        """Return the reduced product as a Fraction.
+
+        PRE : /
+        POST : return the product of all the values multiplied so far.
+        """
+        self.__fold()
+        num, den = self.__num, self.__den
+        if num == 0:
+            return Fraction._from_reduced(0, 1)
+        return Fraction._reduce(num, den)
+
+
+def fraction_sum(values, pairwise=True):
+    """Return the exact sum of an iterable of fractions (or integers) as a Fraction.
+
+    PRE : values contains only Fraction objects or integers.
+    POST : return the reduced sum, 0 for an empty iterable.
+    RAISES : TypeError if a value is not a Fraction object or an integer.
+    """
+    accumulator = SumAccumulator(pairwise=pairwise)
+    accumulator.extend(values)
+    return accumulator.value()
+
+
+def fraction_prod(values, pairwise=True):
+    """Return the exact product of an iterable of fractions (or integers) as a Fraction.
+
+    PRE : values contains only Fraction objects or integers.
+    POST : return the reduced product, 1 for an empty iterable.
+    RAISES : TypeError if a value is not a Fraction object or an integer.
+    """
+    accumulator = ProductAccumulator(pairwise=pairwise)
+    accumulator.extend(values)
+    return accumulator.value()
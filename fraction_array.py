@@ -0,0 +1,359 @@
+import numpy as np
+
+from TP7 import Fraction
+
+# Terms strictly below this bound can be cross-multiplied and summed in int64.
+_INT64_SAFE = 1 << 31
+_INT64_MAX = np.iinfo(np.int64).max
+_INT64_MIN = np.iinfo(np.int64).min
+
+
+def _as_integer_array(values):
+    """Convert some integer values to a one-dimensional NumPy array.
+
+    PRE : values is a sequence (or array) of integers.
+    POST : return an int64 array, or an object array if a value or its opposite does not fit in int64.
+    RAISES : ValueError if a value is not an integer.
+    """
+    array = np.asarray(values)
+    if array.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    if array.ndim != 1:
+        raise ValueError("a FractionArray must be one-dimensional !")
+    if array.dtype.kind in "iu":
+        if array.dtype.kind == "u" and array.max() > _INT64_MAX:
+            return array.astype(object)
+        array = array.astype(np.int64, copy=False)
+        # - 2 ** 63 has no opposite in int64 : np.abs and negations would wrap around
+        if array.min() == _INT64_MIN:
+            return array.astype(object)
+        return array
+    if array.dtype == object and all(type(value) == int for value in array):
+        return array
+    raise ValueError("denominators and numerators must be integers !")
+
+
+def _widen(*arrays):
+    """Choose the storage needed to combine some arrays without overflow.
+
+    PRE : arrays are int64 or object arrays of integers.
+    POST : return the arrays unchanged if int64 products of them cannot overflow,
+           else return them all converted to object (arbitrary precision) arrays.
+    """
+    for array in arrays:
+        if array.dtype == object or (array.size and (array.max() >= _INT64_SAFE or array.min() <= - _INT64_SAFE)):
+            return tuple(array.astype(object) for array in arrays)
+    return arrays
+
+
+def _narrow(array):
+    """Return an object array as int64 when all its values fit, else unchanged."""
+    if array.dtype == object and array.size:
+        if max(array.max(), - array.min()) <= _INT64_MAX:
+            return array.astype(np.int64)
+    return array
+
+
+class FractionArray:
+    """Class representing a one-dimensional array of fractions
+
+    Numerators and denominators are kept in two NumPy arrays, in reduced form with
+    positive denominators. They are stored as int64 while the values are small enough
+    and promoted to object arrays (Python integers) when an operation could overflow.
+    """
+
+    __slots__ = ("_num", "_den")
+
+    def __init__(self, num=(), den=None):
+        """This builds an array of fractions from arrays of numerators and denominators.
+
+        PRE : num and den are sequences of integers of the same length,
+              den defaults to an array of ones.
+        POST : create a FractionArray in reduced form.
+        RAISES : ZeroDivisionError if a denominator is 0.
+                 ValueError if the terms are not integers or their lengths differ.
+        """
+        num = _as_integer_array(num)
+        den = np.ones_like(num) if den is None else _as_integer_array(den)
+        if num.shape != den.shape:
+            raise ValueError("numerators and denominators must have the same length !")
+        if (den == 0).any():
+            raise ZeroDivisionError("denominator cant be equal to zero")
+        if num.dtype != den.dtype:
+            num, den = num.astype(object), den.astype(object)
+        self._num, self._den = self._reduce(num, den)
+
+    @classmethod
+    def _from_reduced(cls, num, den):
+        """Build an array from already validated and reduced terms.
+
+        PRE : num and den have the same shape, den > 0 and gcd(num, den) == 1 elementwise.
+        POST : return a new FractionArray sharing num and den.
+        """
+        array = object.__new__(cls)
+        array._num = num
+        array._den = den
+        return array
+
+    @staticmethod
+    def _reduce(num, den):
+        """Reduce a batch of fractions with np.gcd and make the denominators positive.
+
+        PRE : num and den are integer arrays of the same shape without null denominators.
+        POST : return the reduced (num, den) pair.
+        """
+        negative = den < 0
+        if negative.any():
+            num = np.where(negative, - num, num)
+            den = np.where(negative, - den, den)
+        gcd = np.gcd(num, den)
+        num = num // gcd
+        den = den // gcd
+        if num.dtype == object:
+            num, den = _narrow(num), _narrow(den)
+            if num.dtype != den.dtype:
+                num, den = num.astype(object), den.astype(object)
+        return num, den
+
+    @classmethod
+    def from_fractions(cls, fractions):
+        """Build an array from an iterable of Fraction objects.
+
+        PRE : fractions contains only Fraction objects.
+        POST : return a FractionArray holding the same values.
+        """
+        fractions = list(fractions)
+        num = _as_integer_array([f.numerator for f in fractions])
+        den = _as_integer_array([f.denominator for f in fractions])
+        if num.dtype != den.dtype:
+            num, den = num.astype(object), den.astype(object)
+        return cls._from_reduced(num, den)
+
+    @classmethod
+    def from_strings(cls, lines):
+        """Parse an iterable of strings ("3/7", "0.125", ...) into an array, reducing them in batch.
+
+        PRE : lines is an iterable of strings, ex : a CSV column.
+        POST : return a FractionArray with one value per line.
+        RAISES : ValueError if a line is not a valid rational.
+                 ZeroDivisionError if a denominator is 0.
+        """
+        parse = Fraction._parse_terms
+        num = []
+        den = []
+        for line in lines:
+            terms = parse(line)
+            if terms is None:
+                raise ValueError(f"invalid literal for a fraction : {line!r}")
+            num.append(terms[0])
+            den.append(terms[1])
+        return cls(num, den)
+
+    def to_fractions(self):
+        """Return the content of the array as a list of Fraction objects."""
+        build = Fraction._from_reduced
+        return [build(int(n), int(d)) for n, d in zip(self._num.tolist(), self._den.tolist())]
+
+    @property
+    def numerator(self):
+        return self._num
+
+    @property
+    def denominator(self):
+        return self._den
+
+    # ------------------ Container protocol ------------------
+
+    def __len__(self):
+        return len(self._num)
+
+    def __iter__(self):
+        return iter(self.to_fractions())
+
+    def __getitem__(self, index):
+        """Return a Fraction for an integer index, or a FractionArray for a slice or a mask."""
+        if isinstance(index, (int, np.integer)):
+            return Fraction._from_reduced(int(self._num[index]), int(self._den[index]))
+        return FractionArray._from_reduced(self._num[index], self._den[index])
+
+    def __str__(self):
+        return "[" + ", ".join(str(f) for f in self.to_fractions()) + "]"
+
+    def __repr__(self):
+        return f"FractionArray({self})"
+
+    # ------------------ Operators overloading ------------------
+
+    def _terms(self, other):
+        """Return the numerators and denominators of other, broadcastable against self.
+
+        RAISES : TypeError if other is not a FractionArray, a Fraction or an integer.
+        """
+        if isinstance(other, FractionArray):
+            if len(other) != len(self):
+                raise ValueError("arrays must have the same length !")
+            return other._num, other._den
+        if isinstance(other, Fraction):
+            num, den = other.numerator, other.denominator
+        elif type(other) == int:
+            num, den = other, 1
+        else:
+            raise TypeError
+        if abs(num) >= _INT64_SAFE or den >= _INT64_SAFE:
+            return np.array([num], dtype=object), np.array([den], dtype=object)
+        return np.array([num], dtype=np.int64), np.array([den], dtype=np.int64)
+
+    def _add_terms(self, c, d):
+        """Add c/d to the array, reducing by the gcd of the denominators first."""
+        a, b, c, d = _widen(self._num, self._den, c, d)
+        g = np.gcd(b, d)
+        num = a * (d // g) + c * (b // g)
+        den = (b // g) * d
+        return FractionArray._from_reduced(*self._reduce(num, den))
+
+    def _mul_terms(self, c, d):
+        """Multiply the array by c/d, cross-cancelling before multiplying."""
+        a, b, c, d = _widen(self._num, self._den, c, d)
+        g1 = np.gcd(a, d)
+        g2 = np.gcd(c, b)
+        num = (a // g1) * (c // g2)
+        den = (b // g2) * (d // g1)
+        if num.dtype == object:
+            num, den = _narrow(num), _narrow(den)
+            if num.dtype != den.dtype:
+                num, den = num.astype(object), den.astype(object)
+        return FractionArray._from_reduced(num, den)
+
+    def __add__(self, other):
+        """Elementwise addition
+
+        PRE : other is a FractionArray of the same length, a Fraction or an integer.
+        POST : return a new FractionArray.
+        RAISES : TypeError if other has another type.
+        """
+        return self._add_terms(*self._terms(other))
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return FractionArray._from_reduced(- self._num, self._den)
+
+    def __sub__(self, other):
+        """Elementwise subtraction, see __add__."""
+        c, d = self._terms(other)
+        return self._add_terms(- c, d)
+
+    def __rsub__(self, other):
+        return (- self)._add_terms(*self._terms(other))
+
+    def __mul__(self, other):
+        """Elementwise multiplication
+
+        PRE : other is a FractionArray of the same length, a Fraction or an integer.
+        POST : return a new FractionArray.
+        RAISES : TypeError if other has another type.
+        """
+        return self._mul_terms(*self._terms(other))
+
+    __rmul__ = __mul__
+
+    def _reciprocal(self):
+        if (self._num == 0).any():
+            raise ZeroDivisionError
+        sign = np.where(self._num < 0, -1, 1).astype(self._num.dtype)
+        return FractionArray._from_reduced(self._den * sign, self._num * sign)
+
+    def __truediv__(self, other):
+        """Elementwise division
+
+        PRE : other is a FractionArray of the same length, a Fraction or an integer.
+        POST : return a new FractionArray.
+        RAISES : ZeroDivisionError if a divisor is equal to 0.
+                 TypeError if other has another type.
+        """
+        c, d = self._terms(other)
+        if (c == 0).any():
+            raise ZeroDivisionError
+        sign = np.where(c < 0, -1, 1).astype(c.dtype)
+        return self._mul_terms(d * sign, c * sign)
+
+    def __rtruediv__(self, other):
+        return self._reciprocal()._mul_terms(*self._terms(other))
+
+    def __pow__(self, power):
+        """Elementwise power of the array
+
+        PRE : power is an integer.
+        POST : return a new FractionArray, terms are already coprime so no reduction is done.
+        RAISES : ZeroDivisionError if power is negative and a value is 0.
+        """
+        if type(power) != int:
+            raise TypeError
+        array = self
+        if power < 0:
+            array = self._reciprocal()
+            power = - power
+        num, den = array._num, array._den
+        if power == 0:
+            return FractionArray._from_reduced(np.ones_like(num), np.ones_like(den))
+        if num.dtype != object and len(num):
+            largest = max(int(num.max()), - int(num.min()), int(den.max()))
+            if largest.bit_length() * power >= 63:
+                num, den = num.astype(object), den.astype(object)
+        return FractionArray._from_reduced(num ** power, den ** power)
+
+    # ------------------ Comparisons ------------------
+
+    def _cross(self, other):
+        c, d = self._terms(other)
+        a, b, c, d = _widen(self._num, self._den, c, d)
+        return a * d, c * b
+
+    def __eq__(self, other):
+        c, d = self._terms(other)
+        return (self._num == c) & (self._den == d)
+
+    def __ne__(self, other):
+        return ~ self.__eq__(other)
+
+    def __lt__(self, other):
+        left, right = self._cross(other)
+        return np.asarray(left < right, dtype=bool)
+
+    def __le__(self, other):
+        left, right = self._cross(other)
+        return np.asarray(left <= right, dtype=bool)
+
+    def __gt__(self, other):
+        left, right = self._cross(other)
+        return np.asarray(left > right, dtype=bool)
+
+    def __ge__(self, other):
+        left, right = self._cross(other)
+        return np.asarray(left >= right, dtype=bool)
+
+    __hash__ = None
+
+    def to_float(self):
+        """Returns the decimal values of the fractions as a float64 array."""
+        if self._num.dtype == object:
+            return np.array([n / d for n, d in zip(self._num.tolist(), self._den.tolist())], dtype=np.float64)
+        return self._num / self._den
+
+    # ------------------ Properties checking ------------------
+
+    def is_zero(self):
+        """Return a boolean mask of the values equal to 0."""
+        return np.asarray(self._num == 0, dtype=bool)
+
+    def is_integer(self):
+        """Return a boolean mask of the integer values (reduced denominator equal to 1)."""
+        return np.asarray(self._den == 1, dtype=bool)
+
+    def is_proper(self):
+        """Return a boolean mask of the values whose absolute value is less than one."""
+        return np.asarray(abs(self._num) < self._den, dtype=bool)
+
+    def is_unit(self):
+        """Return a boolean mask of the values whose reduced numerator is 1."""
+        return np.asarray(self._num == 1, dtype=bool)
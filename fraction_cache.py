@@ -0,0 +1,218 @@
+import operator
+from collections import OrderedDict
+
+from TP7 import Fraction
+
+
+class FractionInterner:
+    """Class sharing Fraction instances for small values
+
+    Fractions are immutable, so every small value can be represented by a single shared
+    object. The interner returns that object for any numerator and denominator pair whose
+    reduced value lies in the configured range, and keeps a bounded LRU memo of the results
+    of binary operations between such values.
+    """
+
+    def __init__(self, max_num=1024, max_den=1024, memo_size=4096):
+        """This builds an empty interner.
+
+        PRE : max_num and max_den are positive integers, the largest absolute numerator and
+              the largest denominator of the interned fractions.
+              memo_size is a positive integer, the number of operation results kept.
+        POST : create an interner without any shared instance.
+        """
+        self.__max_num = max_num
+        self.__max_den = max_den
+        self.__memo_size = memo_size
+        self.__table = {}
+        self.__memo = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+    def _in_range(self, num, den):
+        return - self.__max_num <= num <= self.__max_num and 0 < den <= self.__max_den
+
+    def get(self, num=0, den=1):
+        """Return the shared Fraction num/den, or a new one if it is out of range.
+
+        PRE : numerator and denominator must be Integers.
+        POST : return a Fraction equal to num/den, the same object for every call with
+               an equal value in range.
+        RAISES : ZeroDivisionError if den is 0.
+                 ValueError if num or den is not an integer.
+        """
+        key = (num, den)
+        fraction = self.__table.get(key)
+        if fraction is not None and type(num) == int and type(den) == int:
+            self.hits += 1
+            return fraction
+        self.misses += 1
+        fraction = Fraction(num, den)
+        return self._store(fraction, key)
+
+    def intern(self, fraction):
+        """Return the shared instance equal to an existing Fraction.
+
+        PRE : fraction is a Fraction object.
+        POST : return the shared instance if the value is in range, fraction itself if not.
+        """
+        key = (fraction.numerator, fraction.denominator)
+        shared = self.__table.get(key)
+        if shared is not None:
+            self.hits += 1
+            return shared
+        self.misses += 1
+        return self._store(fraction, key)
+
+    def _store(self, fraction, key):
+        """Register fraction as the shared instance of its value when it is in range."""
+        reduced = (fraction.numerator, fraction.denominator)
+        if not self._in_range(*reduced):
+            return fraction
+        fraction = self.__table.setdefault(reduced, fraction)
+        if key != reduced and self._in_range(*key):
+            self.__table[key] = fraction
+        return fraction
+
+    def apply(self, operation, left, right):
+        """Compute operation(left, right), memoizing the result for interned operands.
+
+        PRE : operation is a binary function on fractions (ex : operator.add),
+              left and right are Fraction objects.
+        POST : return the result of the operation, shared if it is in range.
+        """
+        left_key = (left.numerator, left.denominator)
+        right_key = (right.numerator, right.denominator)
+        if not (self._in_range(*left_key) and self._in_range(*right_key)):
+            return operation(left, right)
+        key = (operation, left_key, right_key)
+        memo = self.__memo
+        result = memo.get(key)
+        if result is not None:
+            self.memo_hits += 1
+            memo.move_to_end(key)
+            return result
+        self.memo_misses += 1
+        result = operation(left, right)
+        if isinstance(result, Fraction):
+            result = self.intern(result)
+        memo[key] = result
+        if len(memo) > self.__memo_size:
+            memo.popitem(last=False)
+        return result
+
+    def add(self, left, right):
+        return self.apply(operator.add, left, right)
+
+    def sub(self, left, right):
+        return self.apply(operator.sub, left, right)
+
+    def mul(self, left, right):
+        return self.apply(operator.mul, left, right)
+
+    def truediv(self, left, right):
+        return self.apply(operator.truediv, left, right)
+
+    def stats(self):
+        """Return the hit and miss counters and the sizes of the tables as a dict."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memo_hits": self.memo_hits,
+            "memo_misses": self.memo_misses,
+            "interned": len(self.__table),
+            "memoized": len(self.__memo),
+        }
+
+    def clear(self):
+        """Forget every shared instance and memoized result, and reset the counters."""
+        self.__table.clear()
+        self.__memo.clear()
+        self.hits = self.misses = self.memo_hits = self.memo_misses = 0
+
+
+class PowerTable:
+    """Class memoizing the integer powers of some fractions
+
+    The powers of the last max_bases bases used are kept. A power k is built from the
+    memoized power k - 1 with a single product (the terms stay coprime, nothing is reduced),
+    so a series walking through base ** 0, base ** 1, base ** 2, ... costs one product per term.
+    """
+
+    def __init__(self, max_bases=64):
+        """This builds an empty table.
+
+        PRE : max_bases is a positive integer, the number of bases whose powers are kept.
+        POST : create a table without any memoized power.
+        """
+        self.__max_bases = max_bases
+        self.__bases = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def power(self, base, exponent):
+        """Return base ** exponent, memoized.
+
+        PRE : base is a Fraction object, exponent is an integer.
+        POST : return the Fraction base ** exponent.
+        RAISES : ZeroDivisionError if base is 0 and exponent is negative.
+                 TypeError if exponent is not an integer.
+        """
+        if type(exponent) != int:
+            raise TypeError("the exponent must be an integer !")
+        if exponent < 0:
+            if base.numerator == 0:
+                raise ZeroDivisionError
+            result = self.power(base, - exponent)
+            num, den = result.numerator, result.denominator
+            if num < 0:
+                return Fraction._from_reduced(- den, - num)
+            return Fraction._from_reduced(den, num)
+        key = (base.numerator, base.denominator)
+        powers = self.__bases.get(key)
+        if powers is None:
+            powers = self.__bases[key] = {}
+            if len(self.__bases) > self.__max_bases:
+                self.__bases.popitem(last=False)
+        else:
+            self.__bases.move_to_end(key)
+        result = powers.get(exponent)
+        if result is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        previous = powers.get(exponent - 1)
+        if previous is not None:
+            result = Fraction._from_reduced(previous.numerator * key[0], previous.denominator * key[1])
+        else:
+            result = base ** exponent
+        powers[exponent] = result
+        return result
+
+    def powers(self, base, stop, start=0):
+        """Return the list [base ** start, ..., base ** (stop - 1)], see power."""
+        return [self.power(base, k) for k in range(start, stop)]
+
+    def stats(self):
+        """Return the hit and miss counters and the sizes of the table as a dict."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bases": len(self.__bases),
+            "powers": sum(len(powers) for powers in self.__bases.values()),
+        }
+
+    def clear(self):
+        """Forget every memoized power and reset the counters."""
+        self.__bases.clear()
+        self.hits = self.misses = 0
+
+
+default_interner = FractionInterner()
+
+
+def interned(num=0, den=1):
+    """Return the shared Fraction num/den of the default interner, see FractionInterner.get."""
+    return default_interner.get(num, den)
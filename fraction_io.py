@@ -0,0 +1,351 @@
+import mmap
+import struct
+import sys
+from array import array
+from itertools import accumulate
+
+from TP7 import Fraction
+
+# File layout :
+#   header  : MAGIC, version (1 byte), flags (1 byte), stride (uint32)
+#   blocks  : varint record count, varint byte length, then the numerator column and
+#             the denominator column (the last block has a record count of 0)
+#   index   : the offset of every block as uint64
+#   trailer : record count (uint64), index offset (uint64), INDEX_MAGIC
+# Numerators are zigzag encoded. With the delta flag, both columns hold the zigzag encoded
+# differences with the previous record of the block, which keeps sorted data small. Every
+# block restarts from 0/0 so it can be decoded on its own.
+# A column starts with a width byte : 1, 2, 4 or 8 when every value fits in that many bytes
+# (the column is then packed with the array module), or 0 for the bigint escape where each
+# value is written with _write_uint.
+
+MAGIC = b"FRAC"
+INDEX_MAGIC = b"FIDX"
+VERSION = 1
+DELTA = 0x01
+
+_HEADER = struct.Struct("<4sBBI")
+_TRAILER = struct.Struct("<QQ4s")
+_OFFSET = struct.Struct("<Q")
+
+_WIDTHS = ((1, "B"), (2, "H"), (4, "I"), (8, "Q"))
+_TYPECODES = dict(_WIDTHS)
+for _width, _typecode in _WIDTHS:
+    assert array(_typecode).itemsize == _width
+# The array module uses the native byte order, the files are always little-endian
+_SWAP = sys.byteorder == "big"
+
+
+def _zigzag(values):
+    """Map signed integers to unsigned ones (0, -1, 1, -2, ... -> 0, 1, 2, 3, ...)."""
+    return [v + v if v >= 0 else - v - v - 1 for v in values]
+
+
+def _unzigzag(values):
+    return [v >> 1 if not v & 1 else - ((v + 1) >> 1) for v in values]
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    """Decode a varint of data at pos, return (value, next position)."""
+    byte = data[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    value = byte & 0x7F
+    shift = 7
+    while True:
+        pos += 1
+        byte = data[pos]
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos + 1
+        shift += 7
+
+
+def _write_uint(out, value):
+    """Append an unsigned integer of any size to a bytearray.
+
+    The lowest bit of the first varint tells how the value is written : 0 for a varint
+    of value << 1, 1 for a byte length followed by the value as little-endian bytes.
+    """
+    if value.bit_length() > 56:
+        size = (value.bit_length() + 7) // 8
+        _write_varint(out, (size << 1) | 1)
+        out += value.to_bytes(size, "little")
+    else:
+        _write_varint(out, value << 1)
+
+
+def _read_uint(data, pos):
+    """Decode an integer written by _write_uint, return (value, next position)."""
+    value, pos = _read_varint(data, pos)
+    if value & 1:
+        size = value >> 1
+        return int.from_bytes(data[pos:pos + size], "little"), pos + size
+    return value >> 1, pos
+
+
+def _write_column(out, values):
+    """Append a column of unsigned integers with the smallest width that fits them all."""
+    largest = max(values)
+    for width, typecode in _WIDTHS:
+        if largest < 1 << (8 * width):
+            out.append(width)
+            packed = array(typecode, values)
+            if _SWAP:
+                packed.byteswap()
+            out += packed.tobytes()
+            return
+    out.append(0)
+    for value in values:
+        _write_uint(out, value)
+
+
+def _read_column(data, pos, count):
+    """Decode a column of count integers at pos, return (values, next position)."""
+    width = data[pos]
+    pos += 1
+    if width:
+        values = array(_TYPECODES[width])
+        end = pos + count * width
+        values.frombytes(data[pos:end])
+        if _SWAP:
+            values.byteswap()
+        return values.tolist(), end
+    values = []
+    for _ in range(count):
+        value, pos = _read_uint(data, pos)
+        values.append(value)
+    return values, pos
+
+
+def _encode_block(fractions, delta):
+    nums = [fraction.numerator for fraction in fractions]
+    dens = [fraction.denominator for fraction in fractions]
+    if delta:
+        nums = [b - a for a, b in zip([0] + nums, nums)]
+        dens = _zigzag([b - a for a, b in zip([0] + dens, dens)])
+    out = bytearray()
+    _write_column(out, _zigzag(nums))
+    _write_column(out, dens)
+    return out
+
+
+def _decode_block(data, pos, count, delta):
+    """Return the list of the count fractions of a block whose columns start at pos."""
+    nums, pos = _read_column(data, pos, count)
+    dens, pos = _read_column(data, pos, count)
+    nums = _unzigzag(nums)
+    if delta:
+        nums = accumulate(nums)
+        dens = accumulate(_unzigzag(dens))
+    build = Fraction._from_reduced
+    return [build(num, den) for num, den in zip(nums, dens)]
+
+
+def write_fractions(fractions, delta=False, stride=1024):
+    """Serialize an iterable of fractions, chunk by chunk.
+
+    PRE : fractions contains only Fraction objects.
+          delta tells if records are stored as differences (smaller for sorted data).
+          stride is the number of records per block, the granularity of random access.
+    POST : yield the bytes of the serialized stream, one block at a time.
+    RAISES : TypeError if a value is not a Fraction object.
+    """
+    yield _HEADER.pack(MAGIC, VERSION, DELTA if delta else 0, stride)
+    offsets = []
+    position = _HEADER.size
+    count = 0
+    block = []
+    iterator = iter(fractions)
+    while True:
+        block.clear()
+        for fraction in iterator:
+            if not isinstance(fraction, Fraction):
+                raise TypeError
+            block.append(fraction)
+            if len(block) == stride:
+                break
+        if not block:
+            break
+        records = _encode_block(block, delta)
+        head = bytearray()
+        _write_varint(head, len(block))
+        _write_varint(head, len(records))
+        offsets.append(position)
+        position += len(head) + len(records)
+        count += len(block)
+        yield bytes(head + records)
+        if len(block) < stride:
+            break
+    yield b"\x00"
+    index_offset = position + 1
+    yield b"".join(_OFFSET.pack(offset) for offset in offsets)
+    yield _TRAILER.pack(count, index_offset, INDEX_MAGIC)
+
+
+def dump(fractions, path, delta=False, stride=1024):
+    """Write an iterable of fractions to a binary file, see write_fractions."""
+    with open(path, "wb") as file:
+        for chunk in write_fractions(fractions, delta, stride):
+            file.write(chunk)
+
+
+def _read_header(header):
+    magic, version, flags, stride = _HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION or stride == 0:
+        raise ValueError("not a fraction stream !")
+    return bool(flags & DELTA), stride
+
+
+def read_fractions(file):
+    """Deserialize a stream of fractions from a binary file object, block by block.
+
+    PRE : file is opened in binary mode, positioned at the start of a stream.
+    POST : yield the fractions in the order they were written.
+    RAISES : ValueError if the file is not a fraction stream.
+    """
+    delta, _ = _read_header(file.read(_HEADER.size))
+    while True:
+        count, length = _read_block_head(file)
+        if count == 0:
+            return
+        yield from _decode_block(file.read(length), 0, count, delta)
+
+
+def _read_block_head(file):
+    """Read the record count and byte length of the next block of a file object."""
+    values = []
+    for _ in range(2):
+        value = 0
+        shift = 0
+        while True:
+            byte = file.read(1)
+            if not byte:
+                raise ValueError("truncated fraction stream !")
+            value |= (byte[0] & 0x7F) << shift
+            shift += 7
+            if byte[0] < 0x80:
+                break
+        values.append(value)
+        if value == 0:
+            return 0, 0
+    return values
+
+
+def load(path):
+    """Read all the fractions of a binary file as a list."""
+    with open(path, "rb") as file:
+        return list(read_fractions(file))
+
+
+class FractionFile:
+    """Class giving random access to the fractions of a binary file
+
+    The file is memory-mapped; the block offsets of the index let any value be decoded
+    by reading at most one block.
+    """
+
+    def __init__(self, path):
+        """This opens a fraction file written by dump.
+
+        PRE : path is the path of a file written by dump.
+        POST : create a reader, the file stays mapped until close is called.
+        RAISES : ValueError if the file is not a fraction stream.
+        """
+        self.__file = open(path, "rb")
+        self.__map = None
+        try:
+            self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.__file.close()
+            raise ValueError("not a fraction stream !")
+        try:
+            self.__delta, self.__stride, self.__count, self.__offsets = self._read_index(self.__map)
+        except ValueError:
+            self.close()
+            raise
+        self.__cached = (None, None)
+
+    @staticmethod
+    def _read_index(data):
+        """Check the header and the trailer of a mapped file, and read its block offsets.
+
+        POST : return (delta, stride, count, offsets).
+        RAISES : ValueError if they do not describe a valid fraction stream.
+        """
+        end = len(data) - _TRAILER.size
+        if end < _HEADER.size:
+            raise ValueError("not a fraction stream !")
+        delta, stride = _read_header(data[:_HEADER.size])
+        count, index_offset, magic = _TRAILER.unpack(data[end:])
+        if magic != INDEX_MAGIC or not _HEADER.size <= index_offset <= end:
+            raise ValueError("not a fraction stream !")
+        blocks = (end - index_offset) // _OFFSET.size
+        # every block holds stride fractions, except the last one
+        if blocks != - (- count // stride):
+            raise ValueError("not a fraction stream !")
+        offsets = struct.unpack_from(f"<{blocks}Q", data, index_offset)
+        if any(not _HEADER.size <= offset < index_offset for offset in offsets):
+            raise ValueError("not a fraction stream !")
+        return delta, stride, count, offsets
+
+    def __len__(self):
+        return self.__count
+
+    def __getitem__(self, index):
+        """Return the fraction at position index.
+
+        RAISES : IndexError if index is out of range.
+        """
+        if index < 0:
+            index += self.__count
+        if not 0 <= index < self.__count:
+            raise IndexError("fraction index out of range")
+        block, rank = divmod(index, self.__stride)
+        if not self.__delta:
+            data = self.__map
+            count, pos = _read_varint(data, self.__offsets[block])
+            _, pos = _read_varint(data, pos)
+            width = data[pos]
+            other = data[pos + 1 + count * width] if width else 0
+            if width and other:
+                # both columns are packed, the record can be read without decoding the block
+                start = pos + 1 + rank * width
+                num = int.from_bytes(data[start:start + width], "little")
+                start = pos + 2 + count * width + rank * other
+                den = int.from_bytes(data[start:start + other], "little")
+                return Fraction._from_reduced(_unzigzag((num,))[0], den)
+        return self._block(block)[rank]
+
+    def _block(self, block):
+        """Decode a whole block, keeping the last one decoded for sequential accesses."""
+        if self.__cached[0] != block:
+            data = self.__map
+            count, pos = _read_varint(data, self.__offsets[block])
+            _, pos = _read_varint(data, pos)
+            self.__cached = (block, _decode_block(data, pos, count, self.__delta))
+        return self.__cached[1]
+
+    def __iter__(self):
+        for block in range(len(self.__offsets)):
+            yield from self._block(block)
+
+    def close(self):
+        """Unmap and close the file."""
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
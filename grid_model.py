@@ -0,0 +1,92 @@
+WHITE = (255, 255, 255)
+CYAN = (0, 255, 255)
+
+
+class GridModel:
+    """Class storing the state of a grid of cells
+
+    The state of every cell is one byte of a bytearray, cells being stored row by row from the
+    bottom-left corner (the layout of a Kivy texture). Changed cells are remembered until they
+    are taken, so a view only has to redraw those.
+    """
+
+    __slots__ = ("cols", "rows", "cells", "colors", "__dirty")
+
+    def __init__(self, cols, rows, colors=(WHITE, CYAN)):
+        """This builds a grid whose cells are all in state 0.
+
+        PRE : cols and rows are positive integers.
+              colors is a sequence of (r, g, b) tuples, the color of each state.
+        POST : create a grid of cols * rows cells.
+        RAISES : ValueError if cols or rows is not positive.
+        """
+        if cols <= 0 or rows <= 0:
+            raise ValueError("a grid needs at least one cell !")
+        self.cols = cols
+        self.rows = rows
+        self.cells = bytearray(cols * rows)
+        self.colors = tuple(colors)
+        self.__dirty = set()
+
+    def index(self, col, row):
+        """Return the position of a cell in cells.
+
+        RAISES : IndexError if the cell is outside the grid.
+        """
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            raise IndexError("cell outside the grid")
+        return row * self.cols + col
+
+    def get(self, col, row):
+        return self.cells[self.index(col, row)]
+
+    def set(self, col, row, state):
+        """Change the state of a cell, marking it as changed.
+
+        PRE : state is the index of a color of the grid.
+        """
+        i = self.index(col, row)
+        if self.cells[i] != state:
+            self.cells[i] = state
+            self.__dirty.add(i)
+
+    def toggle(self, col, row):
+        """Move a cell to its next state (0 -> 1 -> ... -> 0) and return that state."""
+        i = self.index(col, row)
+        state = self.cells[i] + 1
+        if state == len(self.colors):
+            state = 0
+        self.cells[i] = state
+        self.__dirty.add(i)
+        return state
+
+    def cell_at(self, x, y, width, height):
+        """Return the cell under a point of a view showing the whole grid.
+
+        PRE : x and y are relative to the bottom-left corner of the view, of size width * height.
+        POST : return (col, row), or None if the point is outside the grid.
+        """
+        if not (0 <= x < width and 0 <= y < height):
+            return None
+        return int(x * self.cols // width), int(y * self.rows // height)
+
+    def take_dirty(self):
+        """Return the indexes of the cells changed since the last call, and forget them."""
+        dirty = self.__dirty
+        self.__dirty = set()
+        return dirty
+
+    def render(self):
+        """Return the colors of all the cells as RGBA bytes, row by row from the bottom.
+
+        Every channel is filled by a single translate of the states, there is no loop over the cells.
+        """
+        rgba = bytearray(b"\xff" * (4 * len(self.cells)))
+        for channel in range(3):
+            table = bytes(color[channel] for color in self.colors).ljust(256, b"\0")
+            rgba[channel::4] = self.cells.translate(table)
+        return rgba
+
+    def cell_color(self, i):
+        """Return the color of the cell at index i as RGBA bytes."""
+        return bytes(self.colors[self.cells[i]]) + b"\xff"
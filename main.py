@@ -5,11 +5,51 @@ from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.checkbox import CheckBox
 
+from calculator import OPERATIONS, evaluate
+from ui_tasks import Debounced, LatestTask, shutdown
+
+SYMBOLS = {"add": "+", "sub": "-", "mul": "*", "div": "/"}
+
+
+def compute(text1, text2, operation):
+    """Compute the text shown by the calculator, run outside of the Kivy event loop.
+
+    Each field may hold a whole expression, ex : "1/3 + 2^-1"; results are exact and cached.
+    """
+    try:
+        num1 = evaluate(text1)
+        num2 = evaluate(text2)
+        result = OPERATIONS[SYMBOLS[operation]](num1, num2)
+    except ZeroDivisionError:
+        return "Erreur : la division par 0 est impossible"
+    except ValueError as error:
+        return f"Erreur : {error}"
+    try:
+        approximation = f"{float(result):.10g}"
+    except OverflowError:
+        approximation = None
+    try:
+        text = str(result)
+    except ValueError:
+        # more digits than Python accepts to convert an integer to text (4300 by default)
+        if approximation is None:
+            return "Erreur : le résultat est trop grand pour être affiché"
+        return f"≈ {approximation}"
+    if result.denominator == 1 or approximation is None:
+        return text
+    return f"{text} ≈ {approximation}"
+
+
 class Ex1(App):
     def __init__(self, **kwargs):
         super(Ex1, self).__init__(**kwargs)
         self.operation = ""
+        self.updating = False
     def build(self):
+        # One click changes several checkboxes : the operation is read once, on the next frame
+        self.update_operation = Debounced(self.read_operation)
+        # Big exact powers keep the GIL for their whole duration : a thread would still freeze the interface
+        self.task = LatestTask(self.show_result, executor="process")
         layout = GridLayout(cols=2)
         self.button = Button(text="Calculer")
         self.button.bind(on_press=self.calculate)
@@ -24,6 +64,7 @@ class Ex1(App):
         self.checkbox_mul.bind(active=self.action_checkbox)
         self.checkbox_div = CheckBox()
         self.checkbox_div.bind(active=self.action_checkbox)
+        self.checkboxes = [self.checkbox_add, self.checkbox_sub, self.checkbox_mul, self.checkbox_div]
         layout.add_widget(self.button)
         layout.add_widget(self.nombre1)
         layout.add_widget(self.nombre2)
@@ -39,13 +80,19 @@ class Ex1(App):
         return layout
 
     def action_checkbox(self, checkbox, value):
+        # Unchecking the other checkboxes calls this method again : those calls are ignored
+        if self.updating:
+            return
         if value:
-            checkbox.active = True
-            for cb in [self.checkbox_add, self.checkbox_sub, self.checkbox_mul, self.checkbox_div]:
+            self.updating = True
+            for cb in self.checkboxes:
                 if cb != checkbox:
                     cb.active = False
-        else:
-            checkbox.active = False
+            self.updating = False
+        self.update_operation()
+
+    def read_operation(self):
+        self.operation = ""
         if self.checkbox_add.active:
             self.operation = "add"
         elif self.checkbox_sub.active:
@@ -56,22 +103,16 @@ class Ex1(App):
             self.operation = "div"
 
     def calculate(self, instance):
-        try:
-            num1 = float(self.nombre1.text)
-            num2 = float(self.nombre2.text)
-            if self.operation == "add":
-                self.resultat.text = str(num1 + num2)
-            elif self.operation == "sub":
-                self.resultat.text = str(num1 - num2)
-            elif self.operation == "mul":
-                self.resultat.text = str(num1 * num2)
-            elif self.operation == "div":
-                if num2 != 0:
-                    self.resultat.text = str(num1 / num2)
-                else:
-                    self.resultat.text = "Erreur : la division par 0 est impossible"
-        except ValueError:
-            self.resultat.text = "Erreur : Entrez des nombres valides."
+        if self.operation not in SYMBOLS:
+            return
+        # Only the result of the last press is shown, the interface stays responsive meanwhile
+        self.task.submit(compute, self.nombre1.text, self.nombre2.text, self.operation)
+
+    def show_result(self, text):
+        self.resultat.text = text
+
+    def on_stop(self):
+        shutdown()
 
 
 if __name__ == "__main__":
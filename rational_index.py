@@ -0,0 +1,202 @@
+from bisect import bisect_left, bisect_right, insort
+
+from TP7 import Fraction
+
+
+def _as_fraction(value):
+    """Return value as a Fraction.
+
+    RAISES : TypeError if value is not a Fraction object, an int or a float.
+             ValueError if value is an infinite or NaN float.
+    """
+    if isinstance(value, Fraction):
+        return value
+    elif type(value) == int:
+        return Fraction._from_reduced(value, 1)
+    elif type(value) == float:
+        return Fraction.from_float(value)
+    else:
+        raise TypeError
+
+
+def _smaller_neighbour(num, den, sign):
+    """Find the fraction c/d with d < den (d == 1 if den == 1) such that num * d - den * c == sign.
+
+    Every solution of num * d - den * c == sign has d = d0 + k * den, so there is exactly one
+    with 0 < d <= den : d0, the inverse of num modulo den multiplied by sign.
+
+    PRE : num/den is reduced with den > 0, sign is 1 or -1.
+    POST : return the reduced pair (c, d).
+    """
+    if den == 1:
+        return num - sign, 1
+    d = sign * pow(num, -1, den) % den
+    return (num * d - sign) // den, d
+
+
+class RationalIndex:
+    """Class keeping a set of fractions sorted by value
+
+    The fractions are stored once each, in a sorted list for the range and nearest queries
+    (bisection, O(log n)) and in a set for the membership tests (O(1)). Two fractions a/b and
+    c/d are adjacent when |a * d - b * c| == 1, see Fraction.is_adjacent_to.
+    """
+
+    def __init__(self, fractions=()):
+        """This builds an index of some fractions.
+
+        PRE : fractions is an iterable of Fraction objects or integers.
+        POST : create an index holding each distinct value of fractions once.
+        RAISES : TypeError if a value is not a Fraction object, an int or a float.
+        """
+        self.__members = set()
+        self.__sorted = []
+        self.update(fractions)
+
+    def __len__(self):
+        return len(self.__sorted)
+
+    def __iter__(self):
+        """Iterate over the fractions in increasing order."""
+        return iter(self.__sorted)
+
+    def __contains__(self, value):
+        return value in self.__members
+
+    def add(self, fraction):
+        """Insert a fraction, in O(log n) comparisons.
+
+        POST : return True if the fraction was inserted, False if it was already in the index.
+        RAISES : TypeError if fraction is not a Fraction object, an int or a float.
+        """
+        fraction = _as_fraction(fraction)
+        if fraction in self.__members:
+            return False
+        self.__members.add(fraction)
+        insort(self.__sorted, fraction)
+        return True
+
+    def update(self, fractions):
+        """Insert many fractions at once, with a single sort instead of one insertion each.
+
+        POST : return the number of fractions inserted.
+        RAISES : TypeError if a value is not a Fraction object, an int or a float.
+        """
+        new = {_as_fraction(value) for value in fractions}
+        new.difference_update(self.__members)
+        if new:
+            self.__members |= new
+            self.__sorted.extend(new)
+            self.__sorted.sort()
+        return len(new)
+
+    def range(self, low, high, inclusive=True):
+        """Return the fractions between low and high, in increasing order.
+
+        PRE : low and high are Fraction objects, ints or floats.
+        POST : return the list of the fractions x with low <= x <= high,
+               or low < x < high if inclusive is False.
+        """
+        if inclusive:
+            start = bisect_left(self.__sorted, low)
+            stop = bisect_right(self.__sorted, high)
+        else:
+            start = bisect_right(self.__sorted, low)
+            stop = bisect_left(self.__sorted, high)
+        return self.__sorted[start:stop]
+
+    def nearest(self, value):
+        """Return the fraction of the index closest to value, the smaller one in case of a tie.
+
+        PRE : value is a Fraction object, an int or a float.
+        RAISES : ValueError if the index is empty.
+                 TypeError if value is not a Fraction object, an int or a float.
+        """
+        if not self.__sorted:
+            raise ValueError("the index is empty !")
+        value = _as_fraction(value)
+        i = bisect_left(self.__sorted, value)
+        if i == len(self.__sorted):
+            return self.__sorted[-1]
+        after = self.__sorted[i]
+        if i == 0 or after == value:
+            return after
+        before = self.__sorted[i - 1]
+        return before if value - before <= after - value else after
+
+    def adjacent_pairs(self):
+        """Yield all the pairs of adjacent fractions of the index, in O(n).
+
+        For a/b, the adjacent fractions with a smaller denominator are one for each sign of
+        a * d - b * c (one in all for an integer), so each pair is found from its fraction with
+        the larger denominator by a single membership test, instead of testing every pair.
+
+        POST : yield (x, y) tuples with x < y and x.is_adjacent_to(y), each pair once.
+        """
+        members = self.__members
+        build = Fraction._from_reduced
+        for fraction in self.__sorted:
+            num = fraction.numerator
+            den = fraction.denominator
+            for sign in ((1,) if den == 1 else (1, -1)):
+                c, d = _smaller_neighbour(num, den, sign)
+                other = build(c, d)
+                if other in members:
+                    # num * d - den * c == sign, so other < fraction when sign is 1
+                    yield (other, fraction) if sign == 1 else (fraction, other)
+
+
+def farey(order):
+    """Yield the Farey sequence of an order : the reduced fractions of [0, 1] with a denominator
+    at most order, in increasing order.
+
+    Each term is computed from the two previous ones, so the sequence is never stored.
+
+    PRE : order is an integer.
+    POST : yield 0/1, 1/order, ..., (order - 1)/order, 1/1 as Fraction objects.
+    RAISES : ValueError if order is less than 1.
+    """
+    if order < 1:
+        raise ValueError("the order of a Farey sequence must be at least 1")
+    build = Fraction._from_reduced
+    a, b, c, d = 0, 1, 1, order
+    yield build(a, b)
+    while c <= order:
+        k = (order + b) // d
+        a, b, c, d = c, d, k * c - a, k * d - b
+        yield build(a, b)
+
+
+def farey_neighbours(fraction, order):
+    """Return the fractions just before and just after fraction in the Farey sequence of an order.
+
+    These are its parents in the Stern-Brocot tree when order is its denominator, and they are
+    found without generating the sequence.
+
+    PRE : fraction is a Fraction object (or an int) with 0 <= fraction <= 1.
+          order is an integer at least equal to the denominator of fraction.
+    POST : return (left, right), left being None for 0 and right None for 1.
+    RAISES : ValueError if fraction is outside [0, 1] or its denominator is greater than order.
+             TypeError if fraction is not a Fraction object or an int.
+    """
+    if type(fraction) == float:
+        raise TypeError
+    fraction = _as_fraction(fraction)
+    num = fraction.numerator
+    den = fraction.denominator
+    if not 0 <= num <= den:
+        raise ValueError("the fraction must be between 0 and 1 !")
+    if den > order:
+        raise ValueError("the denominator of the fraction must be at most the order !")
+    left = right = None
+    build = Fraction._from_reduced
+    if num != 0:
+        # num * d - den * c == 1 with the largest d <= order
+        c, d = _smaller_neighbour(num, den, 1)
+        k = (order - d) // den
+        left = build(c + k * num, d + k * den)
+    if num != den:
+        c, d = _smaller_neighbour(num, den, -1)
+        k = (order - d) // den
+        right = build(c + k * num, d + k * den)
+    return left, right
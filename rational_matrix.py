@@ -0,0 +1,195 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+from TP7 import Fraction
+
+# Below this number of rows to update, a pivot step is not worth sending to other processes.
+_PARALLEL_MIN_ROWS = 32
+
+
+def _scale_rows(matrix):
+    """Turn each row of rational values into an integer row.
+
+    PRE : matrix is a non-empty list of rows of the same length, made of Fractions or integers.
+    POST : return (rows, scales) where rows[i] = scales[i] * matrix[i] has integer entries and
+           scales[i] is the lcm of the denominators of row i.
+    RAISES : ValueError if the rows have different lengths or a value is not a Fraction or an integer.
+    """
+    width = len(matrix[0])
+    rows = []
+    scales = []
+    for row in matrix:
+        if len(row) != width:
+            raise ValueError("all the rows of a matrix must have the same length !")
+        terms = []
+        scale = 1
+        for value in row:
+            if isinstance(value, Fraction):
+                terms.append((value.numerator, value.denominator))
+                scale = scale // math.gcd(scale, value.denominator) * value.denominator
+            elif type(value) == int:
+                terms.append((value, 1))
+            else:
+                raise ValueError("matrix entries must be Fractions or integers !")
+        rows.append([num * (scale // den) for num, den in terms])
+        scales.append(scale)
+    return rows, scales
+
+
+def _check_square(matrix):
+    if not matrix or len(matrix) != len(matrix[0]):
+        raise ValueError("the matrix must be square and non-empty !")
+
+
+def _eliminate_rows(pivot_row, rows, col, prev):
+    """Apply one fraction-free elimination step to some rows.
+
+    PRE : pivot_row[col] is the pivot, prev is the pivot of the previous step (1 at first).
+    POST : return the new rows, with a zero in column col; every division by prev is exact.
+    """
+    pivot = pivot_row[col]
+    pivot_tail = pivot_row[col + 1:]
+    result = []
+    for row in rows:
+        # the entries left of col are already zero in every row below the pivot
+        factor = row[col]
+        tail = row[col + 1:]
+        if factor == 0:
+            if prev == 1:
+                tail = [pivot * value for value in tail]
+            else:
+                tail = [pivot * value // prev for value in tail]
+        else:
+            tail = [(pivot * value - factor * pivot_value) // prev
+                    for value, pivot_value in zip(tail, pivot_tail)]
+        result.append(row[:col] + [0] + tail)
+    return result
+
+
+def _bareiss(rows, columns, workers=None):
+    """Bring integer rows to echelon form with Bareiss fraction-free elimination.
+
+    PRE : rows is a list of integer rows, columns the number of leading columns to eliminate.
+          workers is None or the number of processes sharing the row updates.
+    POST : rows is modified in place. Return (pivots, sign) where pivots is the list of pivot
+           columns and sign is -1 if an odd number of rows was swapped, 1 if not.
+    """
+    size = len(rows)
+    pivots = []
+    sign = 1
+    prev = 1
+    pool = ProcessPoolExecutor(workers) if workers and workers > 1 else None
+    try:
+        for col in range(columns):
+            r = len(pivots)
+            if r == size:
+                break
+            p = next((i for i in range(r, size) if rows[i][col] != 0), None)
+            if p is None:
+                continue
+            if p != r:
+                rows[r], rows[p] = rows[p], rows[r]
+                sign = - sign
+            pivot_row = rows[r]
+            below = rows[r + 1:]
+            if pool is not None and len(below) >= _PARALLEL_MIN_ROWS:
+                chunk = - (- len(below) // workers)
+                parts = [below[i:i + chunk] for i in range(0, len(below), chunk)]
+                futures = [pool.submit(_eliminate_rows, pivot_row, part, col, prev) for part in parts]
+                below = [row for future in futures for row in future.result()]
+            else:
+                below = _eliminate_rows(pivot_row, below, col, prev)
+            rows[r + 1:] = below
+            prev = pivot_row[col]
+            pivots.append(col)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return pivots, sign
+
+
+def determinant(matrix, workers=None):
+    """Compute the exact determinant of a square matrix of rational values.
+
+    PRE : matrix is a non-empty square list of rows of Fractions or integers.
+          workers is None or the number of processes used for the row operations.
+    POST : return the determinant as a Fraction.
+    RAISES : ValueError if the matrix is not square or a value is not a Fraction or an integer.
+    """
+    _check_square(matrix)
+    rows, scales = _scale_rows(matrix)
+    pivots, sign = _bareiss(rows, len(rows), workers)
+    if len(pivots) < len(rows):
+        return Fraction._from_reduced(0, 1)
+    return Fraction._reduce(sign * rows[-1][-1], math.prod(scales))
+
+
+def rank(matrix, workers=None):
+    """Compute the rank of a matrix of rational values.
+
+    PRE : matrix is a non-empty list of rows of the same length, made of Fractions or integers.
+    POST : return the rank as an integer.
+    RAISES : ValueError if the rows have different lengths or a value is not a Fraction or an integer.
+    """
+    rows, _ = _scale_rows(matrix)
+    pivots, _ = _bareiss(rows, len(rows[0]), workers)
+    return len(pivots)
+
+
+def _solve_columns(matrix, columns, workers):
+    """Solve matrix * X = B, B being given as a list of columns.
+
+    POST : return the solution as a list of columns of Fractions.
+    RAISES : ZeroDivisionError if the matrix is singular.
+    """
+    _check_square(matrix)
+    size = len(matrix)
+    for column in columns:
+        if len(column) != size:
+            raise ValueError("the right-hand side must have as many rows as the matrix !")
+    augmented = [list(matrix[i]) + [column[i] for column in columns] for i in range(size)]
+    rows, _ = _scale_rows(augmented)
+    pivots, _ = _bareiss(rows, size, workers)
+    if len(pivots) < size:
+        raise ZeroDivisionError("the matrix is singular")
+    det = rows[-1][size - 1]
+    sign = -1 if det < 0 else 1
+    solutions = []
+    for k in range(size, size + len(columns)):
+        # Fraction-free back substitution: y = det * x is an integer vector (Cramer's rule)
+        y = [0] * size
+        for i in range(size - 1, -1, -1):
+            row = rows[i]
+            total = det * row[k]
+            for j in range(i + 1, size):
+                total -= row[j] * y[j]
+            y[i] = total // row[i]
+        solutions.append([Fraction._reduce(sign * value, sign * det) for value in y])
+    return solutions
+
+
+def solve(matrix, b, workers=None):
+    """Solve the linear system matrix * x = b exactly.
+
+    PRE : matrix is a non-empty square list of rows of Fractions or integers,
+          b is a list of Fractions or integers with one value per row.
+    POST : return x as a list of Fractions.
+    RAISES : ZeroDivisionError if the matrix is singular.
+             ValueError if the shapes do not match or a value is not a Fraction or an integer.
+    """
+    return _solve_columns(matrix, [b], workers)[0]
+
+
+def inverse(matrix, workers=None):
+    """Compute the exact inverse of a square matrix of rational values.
+
+    PRE : matrix is a non-empty square list of rows of Fractions or integers.
+    POST : return the inverse as a list of rows of Fractions.
+    RAISES : ZeroDivisionError if the matrix is singular.
+             ValueError if the matrix is not square or a value is not a Fraction or an integer.
+    """
+    _check_square(matrix)
+    size = len(matrix)
+    identity = [[1 if i == j else 0 for i in range(size)] for j in range(size)]
+    columns = _solve_columns(matrix, identity, workers)
+    return [[column[i] for column in columns] for i in range(size)]
@@ -1,8 +1,42 @@
 import argparse
+import asyncio
 import datetime
+import fnmatch
+import functools
+import glob
+import hashlib
+import itertools
+import json
+import mmap
 import os
-import fileinput
+import queue
+import re
 import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de clones reflink
+    fcntl = None
+
+# Noms des dossiers jamais parcourus par --root ; les dossiers du script sont exclus par leur chemin réel
+DOSSIERS_IGNORES = frozenset({".git"})
+
+# Taille des blocs copiés et du tampon d'écriture du moteur de remplacement
+TAILLE_TAMPON = 1 << 20
+
+# Âge en secondes à partir duquel le nettoyage supprime un fichier temporaire ou un objet non référencé :
+# une exécution en cours n'a pas encore écrit le manifeste qui référence ses objets
+DELAI_ABANDON = 86400
+
+# Requête ioctl de Linux clonant un fichier sans copier ses données (btrfs, XFS...)
+FICLONE = 0x40049409
 
 def backup_file(original_file, backup_suffix=".bak", incremental=False, backup_folder="backups", backup_prefix="backup"):
     """
@@ -26,47 +60,453 @@ def backup_file(original_file, backup_suffix=".bak", incremental=False, backup_f
     except Exception as e:
         print(f"Erreur lors de la création de la sauvegarde : {e}")
 
-def clean_backup_files(current_folder=".", backup_suffix=".bak"):
+def _cloner(source, destination):
     """
-    Supprime tous les fichiers de sauvegarde avec le suffixe spécifié dans le répertoire spécifié.
+    Copie un fichier, par un clone copy-on-write (reflink) si le système de fichiers le permet.
 
-    PRE: current_folder (str, optional): Répertoire où supprimer les fichiers de sauvegarde (par défaut courant).
-         backup_suffix (str, optional): Suffixe des fichiers de sauvegarde à supprimer (par défaut ".bak").
-    POST: /
-    Raises: Toute exception pouvant survenir lors de la suppression des fichiers de sauvegarde.
+    PRE: source (str): Fichier à copier.
+         destination (str): Fichier créé (ou remplacé).
+    POST: destination a le même contenu que source.
     """
-    # Liste tous les fichiers de sauvegarde dans le répertoire spécifié
-    backup_files = [f for f in os.listdir(current_folder) if f.endswith(backup_suffix)]
-    
-    # Supprime chaque fichier de sauvegarde
-    for backup_file in backup_files:
+    if fcntl is not None:
         try:
-            os.remove(os.path.join(current_folder, backup_file))
-        except Exception as e:
-            print(f"Erreur lors de la suppression du fichier de sauvegarde {backup_file}: {e}")
+            with open(source, "rb") as entree, open(destination, "wb") as sortie:
+                fcntl.ioctl(sortie.fileno(), FICLONE, entree.fileno())
+            return
+        except OSError:
+            pass
+    shutil.copyfile(source, destination)
 
-def log_replacement(log_file, fichier, motif_recherche, motifs_remplacement, modified_lines):
+def empreinte_fichier(fichier):
+    """
+    PRE: fichier (str): Chemin du fichier.
+    POST: Retourne l'empreinte SHA-256 du contenu du fichier, en hexadécimal.
     """
-    Enregistre un remplacement dans un fichier journal.
+    empreinte = hashlib.sha256()
+    with open(fichier, "rb") as entree:
+        for bloc in iter(functools.partial(entree.read, TAILLE_TAMPON), b""):
+            empreinte.update(bloc)
+    return empreinte.hexdigest()
 
-    PRE: log_file (str): Chemin du fichier journal.
-         fichier (str): Chemin du fichier modifié.
-         ligne (int): Numéro de ligne où le remplacement a eu lieu.
-         motif_recherche (str): Motif recherché.
-         motifs_remplacement (list): Liste de motifs de remplacement.
-    POST: /
-    Raises: Toute exception pouvant survenir lors de l'écriture dans le fichier journal.
+def _chemin_objet(empreinte, backup_folder, compresser):
+    """
+    Retourne (chemin de l'objet relatif à backup_folder, True s'il est déjà stocké) pour une empreinte.
+
+    Un objet déjà présent est réutilisé qu'il soit compressé ou non, et sa date de modification
+    est mise à jour pour que le nettoyage le considère comme récent ; sinon son dossier est créé.
+    """
+    dossier = os.path.join("objects", empreinte[:2])
+    brut = os.path.join(dossier, empreinte[2:])
+    for objet in (brut, brut + ".z"):
+        try:
+            os.utime(os.path.join(backup_folder, objet))
+            return objet, True
+        except FileNotFoundError:
+            pass
+    os.makedirs(os.path.join(backup_folder, dossier), exist_ok=True)
+    return (brut + ".z" if compresser else brut), False
+
+def stocker_objet(fichier, backup_folder="backups", compresser=False):
+    """
+    Sauvegarde le contenu d'un fichier dans le magasin d'objets adressé par contenu.
+
+    Chaque contenu est stocké une seule fois sous backups/objects/<2 premiers caractères>/<reste
+    de l'empreinte> : un contenu déjà sauvegardé (par une exécution précédente ou un autre fichier
+    identique) n'est ni copié ni compressé à nouveau. Sans compression, l'objet est un clone
+    reflink quand c'est possible, sinon une copie.
+
+    PRE: fichier (str): Chemin du fichier à sauvegarder.
+         backup_folder (str, optional): Dossier des sauvegardes (par défaut "backups").
+         compresser (bool, optional): Si True, un nouvel objet est compressé avec zlib (suffixe ".z").
+    POST: Retourne le chemin de l'objet, relatif à backup_folder.
+    Raises: OSError: Toute erreur de lecture ou d'écriture.
+    """
+    objet, present = _chemin_objet(empreinte_fichier(fichier), backup_folder, compresser)
+    if present:
+        return objet
+    descripteur, temporaire = tempfile.mkstemp(dir=os.path.dirname(os.path.join(backup_folder, objet)), suffix=".tmp")
+    try:
+        if compresser:
+            compresseur = zlib.compressobj()
+            with open(fichier, "rb") as entree, open(descripteur, "wb") as sortie:
+                for bloc in iter(functools.partial(entree.read, TAILLE_TAMPON), b""):
+                    sortie.write(compresseur.compress(bloc))
+                sortie.write(compresseur.flush())
+        else:
+            os.close(descripteur)
+            _cloner(fichier, temporaire)
+        # Deux processus peuvent sauvegarder le même contenu : le dernier remplace un objet identique
+        os.replace(temporaire, os.path.join(backup_folder, objet))
+    except BaseException:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+        raise
+    return objet
+
+def stocker_octets(contenu, backup_folder="backups", compresser=False):
+    """
+    Sauvegarde un contenu déjà en mémoire dans le magasin d'objets, sans relire le fichier (voir stocker_objet).
+
+    PRE: contenu (bytes): Contenu d'origine du fichier.
+         backup_folder (str, optional): Dossier des sauvegardes (par défaut "backups").
+         compresser (bool, optional): Si True, un nouvel objet est compressé avec zlib (suffixe ".z").
+    POST: Retourne le chemin de l'objet, relatif à backup_folder.
+    Raises: OSError: Toute erreur d'écriture.
+    """
+    objet, present = _chemin_objet(hashlib.sha256(contenu).hexdigest(), backup_folder, compresser)
+    if present:
+        return objet
+    descripteur, temporaire = tempfile.mkstemp(dir=os.path.dirname(os.path.join(backup_folder, objet)), suffix=".tmp")
+    try:
+        with open(descripteur, "wb") as sortie:
+            sortie.write(zlib.compress(contenu) if compresser else contenu)
+        os.replace(temporaire, os.path.join(backup_folder, objet))
+    except BaseException:
+        os.remove(temporaire)
+        raise
+    return objet
+
+def ecrire_manifeste(entrees, backup_folder="backups"):
     """
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    motifs_str = ", ".join(motifs_remplacement)
+    Enregistre le manifeste d'une exécution : pour chaque fichier modifié, l'objet de son contenu d'origine.
 
-    # Ajoute l'entrée de journal pour chaque ligne modifiée
-    with open(log_file, 'a') as log:
-        for line_number in modified_lines:
-            log_entry = f"{timestamp} - Remplacement dans {fichier} (ligne {line_number}): {motif_recherche} par {motifs_str}\n"
-            log.write(log_entry)
+    Un fichier sauvegardé plusieurs fois pendant l'exécution n'y figure qu'une fois, avec sa première
+    sauvegarde : les suivantes sont des contenus intermédiaires, déjà modifiés par l'exécution.
 
-    print(f"Remplacement enregistré dans le journal des modifications.")
+    PRE: entrees (list): Dictionnaires avec les clés "fichier" (chemin absolu), "objet" et "mode",
+                         dans l'ordre des sauvegardes.
+         backup_folder (str, optional): Dossier des sauvegardes (par défaut "backups").
+    POST: Retourne l'identifiant de l'exécution (horodatage), utilisable avec --restore.
+    """
+    premieres = {}
+    for entree in entrees:
+        premieres.setdefault(entree["fichier"], entree)
+    entrees = list(premieres.values())
+    dossier = os.path.join(backup_folder, "runs")
+    os.makedirs(dossier, exist_ok=True)
+    identifiant = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    with open(os.path.join(dossier, f"{identifiant}.json"), "w", encoding="utf-8") as manifeste:
+        json.dump({"run": identifiant, "fichiers": entrees}, manifeste, indent=1, ensure_ascii=False)
+    return identifiant
+
+def restaurer_sauvegarde(identifiant, backup_folder="backups"):
+    """
+    Remet les fichiers d'une exécution dans l'état où ils étaient avant celle-ci.
+
+    PRE: identifiant (str): Identifiant de l'exécution, ou "last" pour la plus récente.
+         backup_folder (str, optional): Dossier des sauvegardes (par défaut "backups").
+    POST: Retourne la liste des fichiers restaurés.
+    Raises: FileNotFoundError: Si aucune exécution ne correspond à l'identifiant.
+            OSError: Toute erreur de lecture ou d'écriture.
+    """
+    dossier = os.path.join(backup_folder, "runs")
+    if identifiant == "last":
+        executions = sorted(nom for nom in os.listdir(dossier) if nom.endswith(".json")) if os.path.isdir(dossier) else []
+        if not executions:
+            raise FileNotFoundError("aucune exécution sauvegardée.")
+        identifiant = executions[-1][:-len(".json")]
+    with open(os.path.join(dossier, f"{identifiant}.json"), encoding="utf-8") as manifeste:
+        entrees = json.load(manifeste)["fichiers"]
+    restaures = []
+    vus = set()
+    for entree in entrees:
+        fichier = entree["fichier"]
+        # Manifestes écrits avant la déduplication : seule la première sauvegarde d'un fichier est l'originale
+        if fichier in vus:
+            continue
+        vus.add(fichier)
+        objet = os.path.join(backup_folder, entree["objet"])
+        descripteur, temporaire = tempfile.mkstemp(dir=os.path.dirname(fichier), prefix=f".{os.path.basename(fichier)}.", suffix=".tmp")
+        try:
+            if objet.endswith(".z"):
+                decompresseur = zlib.decompressobj()
+                with open(objet, "rb") as entree_objet, open(descripteur, "wb") as sortie:
+                    for bloc in iter(functools.partial(entree_objet.read, TAILLE_TAMPON), b""):
+                        sortie.write(decompresseur.decompress(bloc))
+                    sortie.write(decompresseur.flush())
+            else:
+                os.close(descripteur)
+                _cloner(objet, temporaire)
+            os.chmod(temporaire, entree["mode"])
+        except BaseException:
+            os.remove(temporaire)
+            raise
+        os.replace(temporaire, fichier)
+        restaures.append(fichier)
+    return restaures
+
+def _fichiers_recursifs(dossier):
+    """
+    PRE: dossier (str): Dossier de départ.
+    POST: Génère (chemin, os.stat_result) pour chaque fichier de l'arborescence, parcourue avec os.scandir.
+    """
+    pile = [dossier]
+    while pile:
+        courant = pile.pop()
+        try:
+            with os.scandir(courant) as entrees:
+                for entree in entrees:
+                    if entree.is_dir(follow_symlinks=False):
+                        pile.append(entree.path)
+                    elif entree.is_file(follow_symlinks=False):
+                        yield entree.path, entree.stat(follow_symlinks=False)
+        except OSError as e:
+            print(f"Impossible de parcourir le dossier {courant} : {e}")
+
+def _supprimer_lot(lot):
+    """Supprime une liste de (chemin, taille) ; retourne (nombre supprimé, octets libérés, erreurs)."""
+    nb_supprimes = 0
+    octets = 0
+    erreurs = []
+    for chemin, taille in lot:
+        try:
+            os.remove(chemin)
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            erreurs.append(f"Erreur lors de la suppression du fichier de sauvegarde {chemin}: {e}")
+            continue
+        nb_supprimes += 1
+        octets += taille
+    return nb_supprimes, octets, erreurs
+
+def supprimer_fichiers(fichiers, fils=8, taille_lot=1000):
+    """
+    Supprime des fichiers par lots, en parallèle : la suppression attend surtout le système de fichiers.
+
+    PRE: fichiers (iterable): (chemin, taille) des fichiers à supprimer.
+         fils (int, optional): Nombre de lots supprimés en même temps.
+         taille_lot (int, optional): Nombre de fichiers par lot.
+    POST: Retourne (nombre de fichiers supprimés, octets libérés, liste des erreurs).
+    """
+    iterateur = iter(fichiers)
+    lots = iter(lambda: list(itertools.islice(iterateur, taille_lot)), [])
+    nb_supprimes = 0
+    octets = 0
+    erreurs = []
+    with ThreadPoolExecutor(max_workers=fils) as pool:
+        for nb, taille, erreurs_lot in pool.map(_supprimer_lot, lots):
+            nb_supprimes += nb
+            octets += taille
+            erreurs += erreurs_lot
+    return nb_supprimes, octets, erreurs
+
+def nettoyer_sauvegardes(backup_folder="backups", garder=None, age_max=None, taille_max=None, fils=8, simulation=False):
+    """
+    Applique une politique de rétention au dossier des sauvegardes et supprime ce qui n'est plus utile.
+
+    Les unités de sauvegarde sont les exécutions (manifestes de backups/runs) et les copies complètes
+    (--backup-mode copy). Sont supprimées, de la plus ancienne à la plus récente :
+    les exécutions au-delà des garder plus récentes, les unités plus anciennes que age_max, puis
+    des unités jusqu'à ce que le dossier occupe au plus taille_max octets. Les objets qui ne sont
+    plus référencés par aucun manifeste conservé sont ensuite supprimés, de même que les fichiers
+    temporaires ; les uns comme les autres seulement s'ils datent de plus de DELAI_ABANDON secondes,
+    pour ne pas supprimer ceux d'une exécution en cours.
+
+    PRE: backup_folder (str, optional): Dossier des sauvegardes (par défaut "backups").
+         garder (int, optional): Nombre d'exécutions les plus récentes à conserver (None : toutes).
+         age_max (float, optional): Âge maximal en secondes (None : pas de limite).
+         taille_max (int, optional): Taille maximale du dossier en octets (None : pas de limite).
+         fils (int, optional): Nombre de suppressions simultanées.
+         simulation (bool, optional): Si True, calcule ce qui serait supprimé sans rien supprimer.
+    POST: Retourne (nombre de fichiers supprimés, octets libérés, liste des erreurs).
+    """
+    maintenant = datetime.datetime.now().timestamp()
+    dossier_objets = os.path.join(backup_folder, "objects")
+    executions = []
+    copies = []
+    objets = {}
+    temporaires = []
+    prefixe = len(os.path.join(backup_folder, ""))
+    for chemin, infos in _fichiers_recursifs(backup_folder):
+        relatif = chemin[prefixe:]
+        if chemin.endswith(".tmp"):
+            if maintenant - infos.st_mtime > DELAI_ABANDON:
+                temporaires.append((chemin, infos.st_size))
+        elif relatif.startswith("objects" + os.sep):
+            objets[relatif] = (infos.st_size, infos.st_mtime)
+        elif relatif.startswith("runs" + os.sep) and chemin.endswith(".json"):
+            executions.append((infos.st_mtime, chemin, infos.st_size))
+        else:
+            copies.append((infos.st_mtime, chemin, infos.st_size))
+    executions.sort()
+    copies.sort()
+
+    # Objets référencés par chaque exécution
+    references = {}
+    compteurs = {}
+    for _, chemin, _ in executions:
+        try:
+            with open(chemin, encoding="utf-8") as manifeste:
+                references[chemin] = {entree["objet"] for entree in json.load(manifeste)["fichiers"]}
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Manifeste illisible {chemin} : {e}")
+            references[chemin] = set()
+        for objet in references[chemin]:
+            compteurs[objet] = compteurs.get(objet, 0) + 1
+
+    a_supprimer = list(temporaires)
+    total = (sum(objets.get(objet, (0, 0))[0] for objet in compteurs) + sum(taille for _, _, taille in executions)
+             + sum(taille for _, _, taille in copies))
+
+    def abandonner_execution(chemin, taille):
+        nonlocal total
+        a_supprimer.append((chemin, taille))
+        total -= taille
+        for objet in references[chemin]:
+            compteurs[objet] -= 1
+            if compteurs[objet] == 0:
+                total -= objets.get(objet, (0, 0))[0]
+
+    # Unités triées de la plus ancienne à la plus récente
+    unites = sorted([(date, chemin, taille, True) for date, chemin, taille in executions]
+                    + [(date, chemin, taille, False) for date, chemin, taille in copies])
+    conservees = []
+    # executions[:-0 or None] : avec garder = 0, toutes les exécutions sont de trop
+    trop_anciennes = {chemin for _, chemin, _ in executions[:-garder or None]} if garder is not None else set()
+    for date, chemin, taille, execution in unites:
+        if chemin in trop_anciennes or (age_max is not None and maintenant - date > age_max):
+            if execution:
+                abandonner_execution(chemin, taille)
+            else:
+                a_supprimer.append((chemin, taille))
+                total -= taille
+        else:
+            conservees.append((chemin, taille, execution))
+    if taille_max is not None:
+        for chemin, taille, execution in conservees:
+            if total <= taille_max:
+                break
+            if execution:
+                abandonner_execution(chemin, taille)
+            else:
+                a_supprimer.append((chemin, taille))
+                total -= taille
+
+    # Ramasse-miettes : objets anciens qui ne sont plus référencés par aucun manifeste conservé
+    a_supprimer += [(os.path.join(backup_folder, objet), taille) for objet, (taille, date) in objets.items()
+                    if not compteurs.get(objet) and maintenant - date > DELAI_ABANDON]
+
+    if simulation:
+        return len(a_supprimer), sum(taille for _, taille in a_supprimer), []
+    resultat = supprimer_fichiers(a_supprimer, fils)
+    # Les dossiers d'objets vidés sont retirés ; os.rmdir échoue sur ceux qui contiennent encore des objets
+    if os.path.isdir(dossier_objets):
+        with os.scandir(dossier_objets) as entrees:
+            for entree in entrees:
+                if entree.is_dir(follow_symlinks=False):
+                    try:
+                        os.rmdir(entree.path)
+                    except OSError:
+                        pass
+    return resultat
+
+class JournalModifications:
+    """
+    Journal des modifications ouvert une seule fois et écrit par lots.
+
+    Les entrées sont formatées en mémoire puis écrites d'un bloc quand le lot est plein, toutes les
+    intervalle secondes par un fil d'arrière-plan, et à la fermeture. Le journal change de fichier
+    quand il dépasse taille_max octets (journal.1, journal.2... jusqu'à nb_archives).
+    Un seul processus doit écrire dans un journal : les processus du pool renvoient leurs résultats
+    au processus principal, qui les enregistre.
+    """
+
+    def __init__(self, chemin, format_journal="text", taille_max=10 << 20, nb_archives=5, taille_lot=1024, intervalle=1.0):
+        """
+        PRE: chemin (str): Chemin du fichier journal.
+             format_journal (str, optional): "text" (une phrase par ligne) ou "jsonl" (un objet JSON par
+                                             ligne modifiée : fichier, ligne, colonne, ancien et nouveau texte).
+             taille_max (int, optional): Taille au-delà de laquelle le journal est archivé (0 : jamais).
+             nb_archives (int, optional): Nombre d'anciens journaux conservés.
+             taille_lot (int, optional): Nombre d'entrées en attente avant une écriture.
+             intervalle (float, optional): Délai maximal en secondes avant l'écriture des entrées (None : pas de fil).
+        """
+        self.chemin = chemin
+        self.format_journal = format_journal
+        self.taille_max = taille_max
+        self.nb_archives = nb_archives
+        self.taille_lot = taille_lot
+        self._en_attente = []
+        self._verrou = threading.Lock()
+        self._journal = open(chemin, "a", encoding="utf-8", buffering=TAILLE_TAMPON)
+        self._arret = threading.Event()
+        self._fil = None
+        if intervalle:
+            self._fil = threading.Thread(target=self._vider_periodiquement, args=(intervalle,), daemon=True)
+            self._fil.start()
+
+    def enregistrer(self, fichier, lignes, motif_recherche, motifs_remplacement, details=None):
+        """
+        Ajoute au journal les lignes modifiées d'un fichier.
+
+        PRE: fichier (str): Chemin du fichier modifié.
+             lignes (list): Numéros des lignes modifiées.
+             motif_recherche (str): Motif recherché.
+             motifs_remplacement (list): Liste de motifs de remplacement.
+             details (list, optional): (ligne, colonne, ancien texte, nouveau texte) par ligne modifiée,
+                                       requis pour le format "jsonl".
+        POST: Les entrées sont en attente d'écriture.
+        """
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if self.format_journal == "jsonl":
+            entrees = [json.dumps({"date": timestamp, "fichier": fichier, "ligne": ligne, "colonne": colonne,
+                                   "ancien": ancien, "nouveau": nouveau}, ensure_ascii=False) + "\n"
+                       for ligne, colonne, ancien, nouveau in details]
+        else:
+            suffixe = f"): {motif_recherche} par {', '.join(motifs_remplacement)}\n"
+            prefixe = f"{timestamp} - Remplacement dans {fichier} (ligne "
+            entrees = [f"{prefixe}{ligne}{suffixe}" for ligne in lignes]
+        with self._verrou:
+            self._en_attente.extend(entrees)
+            if len(self._en_attente) >= self.taille_lot:
+                self._vider()
+
+    def _vider(self):
+        """Écrit les entrées en attente ; le verrou doit être détenu."""
+        if not self._en_attente:
+            return
+        bloc = "".join(self._en_attente)
+        self._en_attente.clear()
+        if self.taille_max and self._journal.tell() + len(bloc) > self.taille_max and self._journal.tell():
+            self._archiver()
+        self._journal.write(bloc)
+        self._journal.flush()
+
+    def _archiver(self):
+        """Décale les anciens journaux (journal.1 devient journal.2...) et recommence un journal vide."""
+        self._journal.close()
+        for numero in range(self.nb_archives - 1, 0, -1):
+            if os.path.exists(f"{self.chemin}.{numero}"):
+                os.replace(f"{self.chemin}.{numero}", f"{self.chemin}.{numero + 1}")
+        if self.nb_archives:
+            os.replace(self.chemin, f"{self.chemin}.1")
+        self._journal = open(self.chemin, "w", encoding="utf-8", buffering=TAILLE_TAMPON)
+
+    def _vider_periodiquement(self, intervalle):
+        while not self._arret.wait(intervalle):
+            with self._verrou:
+                self._vider()
+
+    def vider(self):
+        """Écrit immédiatement les entrées en attente."""
+        with self._verrou:
+            self._vider()
+
+    def fermer(self):
+        """Arrête le fil d'arrière-plan, écrit les entrées en attente et ferme le journal."""
+        self._arret.set()
+        if self._fil is not None:
+            self._fil.join()
+        with self._verrou:
+            self._vider()
+            self._journal.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
 
 def create_log_folder():
     """
@@ -92,85 +532,1338 @@ def create_backup_folder():
         os.makedirs(backup_folder)
     return backup_folder
 
-def do_recherche_remplacement():
+def create_cache_folder():
+    """
+    Crée un dossier de cache s'il n'existe pas.
+
+    PRE: /
+    POST: Chemin du dossier de cache créé.
+    """
+    cache_folder = "cache"
+    if not os.path.exists(cache_folder):
+        os.makedirs(cache_folder)
+    return cache_folder
+
+def lister_fichiers(fichiers=None, motif_glob=None, depuis_stdin=False):
+    """
+    Génère les chemins des fichiers à traiter sans interaction avec l'utilisateur.
+
+    PRE: fichiers (list, optional): Liste de chemins de fichiers.
+         motif_glob (str, optional): Motif glob (ex: "src/**/*.txt"), "**" parcourt les sous-dossiers.
+         depuis_stdin (bool, optional): Si True, lit aussi un chemin par ligne sur l'entrée standard.
+    POST: Génère les chemins dans l'ordre : fichiers, puis glob, puis entrée standard.
+    """
+    if fichiers:
+        yield from fichiers
+    if motif_glob:
+        for chemin in glob.iglob(motif_glob, recursive=True):
+            if os.path.isfile(chemin):
+                yield chemin
+    if depuis_stdin:
+        for ligne in sys.stdin:
+            chemin = ligne.strip()
+            if chemin:
+                yield chemin
+
+def filtrer_extensions(fichiers, extensions):
+    """
+    Ne garde que les fichiers dont l'extension est prise en charge.
+
+    PRE: fichiers (iterable): Chemins des fichiers.
+         extensions (list): Extensions acceptées, sans le point.
+    POST: Génère les chemins acceptés, un message est affiché pour chaque fichier refusé.
+    """
+    extensions = {extension.lower() for extension in extensions}
+    for fichier in fichiers:
+        _, extension = os.path.splitext(fichier)
+        if extension[1:].lower() in extensions:
+            yield fichier
+        else:
+            print(f"L'extension {extension[1:]} n'est pas prise en charge. Le fichier {fichier} ne sera pas inclus.")
+
+def sans_doublons(fichiers):
+    """
+    Élimine les fichiers déjà rencontrés, par exemple donnés par --files et trouvés aussi sous --root.
+
+    Un fichier traité deux fois subirait deux remplacements, et deux processus réécriraient le même
+    fichier en même temps.
+
+    PRE: fichiers (iterable): Chemins des fichiers.
+    POST: Génère chaque fichier une seule fois (comparés par chemin réel), dans l'ordre de leur première apparition.
+    """
+    vus = set()
+    for fichier in fichiers:
+        reel = os.path.realpath(fichier)
+        if reel not in vus:
+            vus.add(reel)
+            yield fichier
+
+def parcourir_arborescence(racine, extensions, motifs_ignores=(), dossiers_ignores=DOSSIERS_IGNORES, chemins_ignores=()):
+    """
+    Parcourt récursivement un dossier et génère les fichiers à traiter au fur et à mesure.
+
+    Le parcours utilise os.scandir, qui donne le type de chaque entrée sans appel système
+    supplémentaire, et élague les dossiers ignorés sans les ouvrir.
+
+    PRE: racine (str): Dossier de départ.
+         extensions (list): Extensions acceptées, sans le point.
+         motifs_ignores (list, optional): Motifs fnmatch (ex: "*.min.txt", "build") comparés au nom
+                                          de chaque fichier et dossier ; les correspondances sont ignorées.
+         dossiers_ignores (set, optional): Noms de dossiers à ne jamais parcourir.
+         chemins_ignores (iterable, optional): Dossiers précis à ne pas parcourir (ex: les sauvegardes du script),
+                                               comparés par chemin réel : un autre dossier du même nom est parcouru.
+    POST: Génère les chemins des fichiers dont l'extension est acceptée.
+    """
+    extensions = frozenset("." + extension.lower().lstrip(".") for extension in extensions)
+    ignore = re.compile("|".join(fnmatch.translate(motif) for motif in motifs_ignores)).match if motifs_ignores else None
+    chemins_ignores = frozenset(os.path.realpath(chemin) for chemin in chemins_ignores)
+    # Les liens symboliques vers des dossiers ne sont pas suivis : le chemin réel d'un sous-dossier
+    # est celui de son parent suivi de son nom, sans appel à os.path.realpath
+    pile = [(racine, os.path.realpath(racine))]
+    while pile:
+        dossier, reel = pile.pop()
+        try:
+            with os.scandir(dossier) as entrees:
+                sous_dossiers = []
+                for entree in entrees:
+                    nom = entree.name
+                    if ignore is not None and ignore(nom):
+                        continue
+                    if entree.is_dir(follow_symlinks=False):
+                        reel_sous_dossier = os.path.join(reel, nom)
+                        if nom not in dossiers_ignores and reel_sous_dossier not in chemins_ignores:
+                            sous_dossiers.append((entree.path, reel_sous_dossier))
+                    elif os.path.splitext(nom)[1].lower() in extensions and entree.is_file():
+                        yield entree.path
+        except OSError as e:
+            print(f"Impossible de parcourir le dossier {dossier} : {e}")
+            continue
+        # Parcours en profondeur dans l'ordre du système de fichiers
+        pile.extend(reversed(sous_dossiers))
+
+class MoteurRegex:
+    """
+    Moteur de remplacement basé sur une expression régulière compilée sur des octets.
+
+    Le remplacement est soit des octets fixes, soit une TableRemplacement qui choisit le texte
+    selon l'occurrence trouvée.
+    """
+
+    def __init__(self, expression, remplacement, compte=0):
+        """
+        PRE: expression (re.Pattern): Expression compilée sur des octets.
+             remplacement (bytes ou callable): Remplacement passé à expression.subn.
+             compte (int, optional): Nombre maximal de remplacements par ligne (0 pour toutes les occurrences).
+        """
+        self.expression = expression
+        self.remplacement = remplacement
+        self.compte = compte
+
+    def chercher(self, tampon, position=0):
+        """
+        PRE: tampon (bytes ou mmap): Contenu à parcourir.
+        POST: Retourne la position de la première occurrence à partir de position, ou -1.
+        """
+        correspondance = self.expression.search(tampon, position)
+        return -1 if correspondance is None else correspondance.start()
+
+    def remplacer(self, ligne):
+        """
+        PRE: ligne (bytes): Ligne à modifier.
+        POST: Retourne (nouvelle ligne, nombre de remplacements).
+        """
+        return self.expression.subn(self.remplacement, ligne, count=self.compte)
+
+class TableRemplacement:
+    """
+    Remplacement d'une expression en alternance : associe chaque occurrence à son texte de remplacement.
+    """
+
+    def __init__(self, table, ignore_case=False):
+        self.table = table
+        self.ignore_case = ignore_case
+
+    def __call__(self, correspondance):
+        occurrence = correspondance.group()
+        return self.table[occurrence.lower() if self.ignore_case else occurrence]
+
+def _preparer_table(table, ignore_case):
+    """
+    Encode une table {motif: remplacement} en octets, avec des motifs en minuscules si ignore_case.
+
+    Raises: ValueError: Si la table est vide ou contient un motif vide.
+    """
+    if not table:
+        raise ValueError("la table de remplacement est vide.")
+    resultat = {}
+    for motif, remplacement in table.items():
+        if not motif:
+            raise ValueError("le motif de recherche est vide.")
+        motif = motif.encode("utf-8")
+        resultat[motif.lower() if ignore_case else motif] = remplacement.encode("utf-8")
+    return resultat
+
+def _expression_trie(motifs):
+    """
+    Construit une expression régulière reconnaissant un ensemble de motifs, factorisée en arbre préfixe.
+
+    Les motifs partageant un préfixe partagent une branche, ce qui évite à re d'essayer chaque motif
+    l'un après l'autre ; les branches optionnelles sont gourmandes, le motif le plus long l'emporte.
+
+    PRE: motifs (iterable): Motifs non vides en octets.
+    POST: Retourne le texte de l'expression en octets.
+    """
+    arbre = {}
+    for motif in motifs:
+        noeud = arbre
+        for octet in motif:
+            noeud = noeud.setdefault(octet, {})
+        noeud[None] = {}
+
+    def construire(noeud):
+        branches = [re.escape(bytes([octet])) + construire(enfant)
+                    for octet, enfant in sorted((cle, valeur) for cle, valeur in noeud.items() if cle is not None)]
+        if not branches:
+            return b""
+        corps = branches[0] if len(branches) == 1 else b"(?:" + b"|".join(branches) + b")"
+        if None in noeud:
+            return (corps if len(branches) == 1 and len(corps) == 1 else b"(?:" + corps + b")") + b"?"
+        return corps
+
+    return construire(arbre)
+
+def compiler_motif(motif_recherche, texte_remplacement, ignore_case=False, compte=0):
+    """
+    Prépare un motif de recherche unique et son remplacement pour le moteur de remplacement.
+
+    Les fichiers sont traités comme des octets (UTF-8) ; avec ignore_case, seules les lettres
+    ASCII sont comparées sans tenir compte de la casse.
+
+    PRE: motif_recherche (str): Motif recherché, non vide.
+         texte_remplacement (str): Texte qui remplace chaque occurrence.
+         ignore_case (bool, optional): Si True, la recherche ignore la casse.
+         compte (int, optional): Nombre maximal de remplacements par ligne (0 pour toutes les occurrences).
+    POST: Retourne un MoteurRegex.
+    Raises: ValueError: Si le motif de recherche est vide.
+    """
+    if not motif_recherche:
+        raise ValueError("le motif de recherche est vide.")
+    expression = re.compile(re.escape(motif_recherche.encode("utf-8")), re.IGNORECASE if ignore_case else 0)
+    # Les barres obliques inverses du texte ne doivent pas être interprétées par re
+    remplacement = texte_remplacement.encode("utf-8").replace(b"\\", b"\\\\")
+    return MoteurRegex(expression, remplacement, compte)
+
+def compiler_table(table, ignore_case=False, compte=0):
+    """
+    Prépare une table de motifs pour un remplacement en un seul passage avec une expression en alternance.
+
+    PRE: table (dict): Associe chaque motif (str) à son remplacement (str).
+         ignore_case (bool, optional): Si True, la recherche ignore la casse (lettres ASCII).
+         compte (int, optional): Nombre maximal de remplacements par ligne (0 pour toutes les occurrences).
+    POST: Retourne un MoteurRegex ; à une position donnée, le motif le plus long est remplacé.
+    Raises: ValueError: Si la table est vide ou contient un motif vide.
+    """
+    table = _preparer_table(table, ignore_case)
+    expression = re.compile(_expression_trie(table), re.IGNORECASE if ignore_case else 0)
+    return MoteurRegex(expression, TableRemplacement(table, ignore_case), compte)
+
+class AutomateAhoCorasick:
+    """
+    Moteur de remplacement multi-motifs basé sur un automate d'Aho-Corasick.
+
+    Le temps de recherche ne dépend pas du nombre de motifs. Tant que l'automate est dans son état
+    initial, la recherche saute directement au prochain octet pouvant commencer un motif.
+    """
+
+    # Version de la structure de l'automate, à incrémenter à chaque changement de ses attributs :
+    # elle fait partie de la clé du cache de charger_automate
+    VERSION = 2
+
+    def __init__(self, table, ignore_case=False, compte=0):
+        """
+        PRE: table (dict): Associe chaque motif (str) à son remplacement (str).
+             ignore_case (bool, optional): Si True, la recherche ignore la casse (lettres ASCII).
+             compte (int, optional): Nombre maximal de remplacements par ligne (0 pour toutes les occurrences).
+        Raises: ValueError: Si la table est vide ou contient un motif vide.
+        """
+        self.table = _preparer_table(table, ignore_case)
+        self.ignore_case = ignore_case
+        self.compte = compte
+        # transitions[etat] : {octet: etat suivant}, longueurs[etat] : longueurs des motifs finissant en etat
+        self.transitions = [{}]
+        self.longueurs = [()]
+        for motif in self.table:
+            etat = 0
+            for octet in motif:
+                suivant = self.transitions[etat].get(octet)
+                if suivant is None:
+                    suivant = len(self.transitions)
+                    self.transitions[etat][octet] = suivant
+                    self.transitions.append({})
+                    self.longueurs.append(())
+                etat = suivant
+            self.longueurs[etat] = (len(motif),)
+        # Liens d'échec calculés en largeur ; chaque état hérite des motifs de son lien d'échec
+        self.echecs = [0] * len(self.transitions)
+        file = deque(self.transitions[0].values())
+        while file:
+            etat = file.popleft()
+            for octet, suivant in self.transitions[etat].items():
+                file.append(suivant)
+                echec = self.echecs[etat]
+                while echec and octet not in self.transitions[echec]:
+                    echec = self.echecs[echec]
+                echec = self.transitions[echec].get(octet, 0)
+                self.echecs[suivant] = echec if echec != suivant else 0
+                self.longueurs[suivant] = self.longueurs[suivant] + self.longueurs[self.echecs[suivant]]
+        self._preparer_recherche()
+
+    def _preparer_recherche(self):
+        """
+        Calcule les attributs de recherche dérivés des transitions : table des minuscules et premiers octets.
+        """
+        self.minuscules = bytes(range(256)).lower() if self.ignore_case else None
+        premiers = bytes(sorted(self.transitions[0]))
+        self.premiers = re.compile(b"[" + b"".join(re.escape(bytes([octet])) for octet in premiers) + b"]",
+                                   re.IGNORECASE if self.ignore_case else 0)
+
+    def donnees(self):
+        """
+        POST: Retourne les tables de l'automate sous forme de données JSON (listes, nombres, textes),
+              que depuis_donnees sait relire.
+        """
+        return {
+            "version": self.VERSION,
+            "ignore_case": self.ignore_case,
+            "table": [[motif.hex(), remplacement.hex()] for motif, remplacement in self.table.items()],
+            "transitions": [sorted(transitions.items()) for transitions in self.transitions],
+            "echecs": self.echecs,
+            "longueurs": self.longueurs,
+        }
+
+    @classmethod
+    def depuis_donnees(cls, donnees, compte=0):
+        """
+        Reconstruit un automate à partir du résultat de donnees(), sans recalculer ses liens d'échec.
+
+        PRE: donnees (dict): Tables de l'automate, par exemple relues depuis un fichier JSON.
+             compte (int, optional): Nombre maximal de remplacements par ligne.
+        POST: Retourne un AutomateAhoCorasick.
+        Raises: ValueError: Si les données sont d'une autre version ou incohérentes.
+        """
+        if donnees["version"] != cls.VERSION:
+            raise ValueError(f"version {donnees['version']!r} de l'automate non prise en charge.")
+        automate = cls.__new__(cls)
+        automate.ignore_case = donnees["ignore_case"] is True
+        automate.compte = compte
+        automate.table = {bytes.fromhex(motif): bytes.fromhex(remplacement) for motif, remplacement in donnees["table"]}
+        automate.transitions = [{int(octet): int(suivant) for octet, suivant in transitions}
+                                for transitions in donnees["transitions"]]
+        automate.echecs = [int(echec) for echec in donnees["echecs"]]
+        automate.longueurs = [tuple(int(longueur) for longueur in longueurs) for longueurs in donnees["longueurs"]]
+        nb_etats = len(automate.transitions)
+        if not nb_etats or len(automate.echecs) != nb_etats or len(automate.longueurs) != nb_etats:
+            raise ValueError("les tables de l'automate n'ont pas le même nombre d'états.")
+        for transitions in automate.transitions:
+            if any(not 0 <= octet < 256 or not 0 < suivant < nb_etats for octet, suivant in transitions.items()):
+                raise ValueError("transition invalide dans l'automate.")
+        if any(not 0 <= echec < nb_etats for echec in automate.echecs):
+            raise ValueError("lien d'échec invalide dans l'automate.")
+        automate._preparer_recherche()
+        return automate
+
+    def _occurrences(self, tampon, position=0, premiere=False):
+        """
+        Génère (début, fin) pour chaque occurrence, dans l'ordre des fins d'occurrence.
+        """
+        transitions, echecs, longueurs = self.transitions, self.echecs, self.longueurs
+        minuscules = self.minuscules
+        taille = len(tampon)
+        etat = 0
+        i = position
+        while i < taille:
+            if etat == 0:
+                correspondance = self.premiers.search(tampon, i)
+                if correspondance is None:
+                    return
+                i = correspondance.start()
+            octet = tampon[i] if minuscules is None else minuscules[tampon[i]]
+            while etat and octet not in transitions[etat]:
+                etat = echecs[etat]
+            etat = transitions[etat].get(octet, 0)
+            i += 1
+            for longueur in longueurs[etat]:
+                yield i - longueur, i
+
+    def chercher(self, tampon, position=0):
+        """
+        PRE: tampon (bytes ou mmap): Contenu à parcourir.
+        POST: Retourne la position d'une occurrence à partir de position, ou -1. C'est l'occurrence
+              qui finit le plus tôt : sa ligne est donc la première ligne contenant un motif.
+        """
+        for debut, _ in self._occurrences(tampon, position):
+            return debut
+        return -1
+
+    def remplacer(self, ligne):
+        """
+        Remplace les occurrences de la ligne, la plus à gauche puis la plus longue d'abord.
+
+        PRE: ligne (bytes): Ligne à modifier.
+        POST: Retourne (nouvelle ligne, nombre de remplacements).
+        """
+        occurrences = sorted(self._occurrences(ligne), key=lambda occurrence: (occurrence[0], - occurrence[1]))
+        cle = ligne.lower() if self.ignore_case else ligne
+        morceaux = []
+        position = 0
+        nb_remplacements = 0
+        for debut, fin in occurrences:
+            if debut < position:
+                continue
+            morceaux.append(ligne[position:debut])
+            morceaux.append(self.table[cle[debut:fin]])
+            position = fin
+            nb_remplacements += 1
+            if nb_remplacements == self.compte:
+                break
+        morceaux.append(ligne[position:])
+        return b"".join(morceaux), nb_remplacements
+
+def lire_table(chemin):
+    """
+    Lit un fichier de correspondances : une ligne "motif<TAB>remplacement" par motif.
+
+    Les lignes vides et celles commençant par "#" sont ignorées.
+
+    PRE: chemin (str): Chemin du fichier de correspondances (UTF-8).
+    POST: Retourne un dictionnaire {motif: remplacement}.
+    Raises: ValueError: Si une ligne ne contient pas de tabulation.
+            FileNotFoundError: Si le fichier n'existe pas.
+    """
+    table = {}
+    with open(chemin, encoding="utf-8") as fichier:
+        for numero, ligne in enumerate(fichier, start=1):
+            ligne = ligne.rstrip("\r\n")
+            if not ligne or ligne.startswith("#"):
+                continue
+            motif, tabulation, remplacement = ligne.partition("\t")
+            if not tabulation:
+                raise ValueError(f"ligne {numero} de {chemin} : motif et remplacement doivent être séparés par une tabulation.")
+            table[motif] = remplacement
+    return table
+
+def charger_automate(table, ignore_case=False, compte=0, cache_folder="cache"):
+    """
+    Retourne l'automate d'Aho-Corasick d'une table, en le réutilisant depuis le disque s'il existe.
+
+    L'automate est enregistré dans cache_folder sous un nom dérivé du contenu de la table,
+    les exécutions suivantes avec la même table évitent donc sa construction. Le cache ne contient
+    que des données JSON : contrairement à pickle, un fichier de cache déposé par un tiers ne peut
+    pas exécuter de code. Un fichier illisible, corrompu, d'une autre version de l'automate ou
+    d'une autre table est simplement reconstruit.
+
+    PRE: table (dict): Associe chaque motif (str) à son remplacement (str).
+         ignore_case (bool, optional): Si True, la recherche ignore la casse.
+         compte (int, optional): Nombre maximal de remplacements par ligne.
+         cache_folder (str, optional): Dossier du cache.
+    POST: Retourne un AutomateAhoCorasick.
+    """
+    version = AutomateAhoCorasick.VERSION
+    empreinte = hashlib.sha256(repr((version, sorted(table.items()), ignore_case)).encode("utf-8")).hexdigest()
+    chemin = os.path.join(cache_folder, f"aho-v{version}-{empreinte}.json")
+    try:
+        with open(chemin, encoding="utf-8") as fichier:
+            automate = AutomateAhoCorasick.depuis_donnees(json.load(fichier), compte)
+        if automate.ignore_case != ignore_case or automate.table != _preparer_table(table, ignore_case):
+            raise ValueError(f"{chemin} contient l'automate d'une autre table.")
+    except Exception:
+        automate = AutomateAhoCorasick(table, ignore_case, compte)
+        descripteur, temporaire = tempfile.mkstemp(dir=cache_folder, suffix=".tmp")
+        with open(descripteur, "w", encoding="utf-8") as fichier:
+            json.dump(automate.donnees(), fichier, separators=(",", ":"))
+        os.replace(temporaire, chemin)
+    return automate
+
+def _copier(tampon, debut, fin, ecrire):
+    """
+    Écrit tampon[debut:fin] par blocs de TAILLE_TAMPON octets.
+
+    POST: Retourne le nombre de fins de ligne copiées.
+    """
+    nb_lignes = 0
+    for position in range(debut, fin, TAILLE_TAMPON):
+        bloc = tampon[position:min(position + TAILLE_TAMPON, fin)]
+        nb_lignes += bloc.count(b"\n")
+        ecrire(bloc)
+    return nb_lignes
+
+def _colonne(ancienne, nouvelle):
+    """
+    POST: Retourne la colonne (à partir de 1) du premier caractère qui diffère entre deux lignes.
+    """
+    for colonne, (a, b) in enumerate(zip(ancienne, nouvelle)):
+        if a != b:
+            return colonne + 1
+    return min(len(ancienne), len(nouvelle)) + 1
+
+def remplacer_tampon(tampon, moteur, ecrire, debut_occurrence=None, details=None):
+    """
+    Effectue le remplacement dans un tampon d'octets en ne découpant que les lignes concernées.
+
+    Le texte entre deux lignes contenant une occurrence est recopié tel quel par grands blocs ;
+    seules les lignes contenant une occurrence sont passées au moteur.
+
+    PRE: tampon (bytes ou mmap): Contenu du fichier.
+         moteur: MoteurRegex ou AutomateAhoCorasick.
+         ecrire (callable): Fonction recevant les octets du résultat, dans l'ordre.
+         debut_occurrence (int, optional): Position de la première occurrence, si elle est déjà connue.
+         details (list, optional): Si donnée, reçoit (ligne, colonne, ancien texte, nouveau texte)
+                                   pour chaque ligne modifiée.
+    POST: Retourne la liste des numéros des lignes réellement modifiées.
+    """
+    lignes = []
+    position = 0
+    numero = 1
+    taille = len(tampon)
+    if debut_occurrence is None:
+        debut_occurrence = moteur.chercher(tampon)
+    while debut_occurrence >= 0:
+        debut = max(position, tampon.rfind(b"\n", position, debut_occurrence) + 1)
+        fin = tampon.find(b"\n", debut_occurrence)
+        fin = taille if fin < 0 else fin + 1
+        numero += _copier(tampon, position, debut, ecrire)
+        ligne = tampon[debut:fin]
+        nouvelle, nb_remplacements = moteur.remplacer(ligne)
+        if nb_remplacements and nouvelle != ligne:
+            lignes.append(numero)
+            if details is not None:
+                ancien = ligne.rstrip(b"\r\n").decode("utf-8", "replace")
+                nouveau = nouvelle.rstrip(b"\r\n").decode("utf-8", "replace")
+                details.append((numero, _colonne(ancien, nouveau), ancien, nouveau))
+        ecrire(nouvelle)
+        numero += 1
+        position = fin
+        debut_occurrence = moteur.chercher(tampon, position)
+    _copier(tampon, position, taille, ecrire)
+    return lignes
+
+def remplacer_dans_fichier(fichier, moteur, avant_ecriture=None, details=None, empreinte=None):
+    """
+    Remplace les motifs dans un fichier sans le réécrire s'il ne contient aucune occurrence.
+
+    Le fichier est projeté en mémoire (mmap) et parcouru une première fois pour trouver un motif.
+    S'il est présent, le résultat est écrit par blocs dans un fichier temporaire du même dossier,
+    qui remplace ensuite l'original de manière atomique (os.replace). La mémoire utilisée ne dépend
+    pas de la taille du fichier.
+
+    PRE: fichier (str): Chemin du fichier à modifier.
+         moteur: MoteurRegex ou AutomateAhoCorasick.
+         avant_ecriture (callable, optional): Fonction appelée avec le chemin du fichier juste avant
+                                              sa modification, par exemple pour le sauvegarder.
+         details (list, optional): Voir remplacer_tampon.
+         empreinte (optional): Objet de hashlib mis à jour avec le contenu du fichier après traitement,
+                               pendant la lecture ou l'écriture, ce qui évite de relire le fichier.
+    POST: Retourne la liste des numéros des lignes modifiées (vide si le fichier n'a pas été touché).
+    Raises: FileNotFoundError: Si le fichier n'existe pas.
+            OSError: Toute erreur de lecture ou d'écriture.
+    """
+    with open(fichier, "rb") as source:
+        if os.fstat(source.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as tampon:
+            debut_occurrence = moteur.chercher(tampon)
+            if debut_occurrence < 0:
+                if empreinte is not None:
+                    empreinte.update(tampon)
+                return []
+            if avant_ecriture is not None:
+                avant_ecriture(fichier)
+            dossier, nom = os.path.split(os.path.abspath(fichier))
+            descripteur, temporaire = tempfile.mkstemp(dir=dossier, prefix=f".{nom}.", suffix=".tmp")
+            try:
+                with open(descripteur, "wb", buffering=TAILLE_TAMPON) as sortie:
+                    ecrire = sortie.write
+                    if empreinte is not None:
+                        def ecrire(bloc):
+                            empreinte.update(bloc)
+                            sortie.write(bloc)
+                    lignes = remplacer_tampon(tampon, moteur, ecrire, debut_occurrence, details)
+                shutil.copymode(fichier, temporaire)
+            except BaseException:
+                os.remove(temporaire)
+                raise
+    os.replace(temporaire, fichier)
+    return lignes
+
+def _lignes_modifiees(tampon, moteur):
+    """
+    Parcourt un tampon comme remplacer_tampon, sans rien écrire.
+
+    POST: Génère (numéro, début, fin, nouvelle ligne, nombre de remplacements) pour chaque ligne modifiée,
+          début et fin étant les positions de la ligne d'origine dans le tampon.
+    """
+    ignorer = lambda bloc: None
+    position = 0
+    numero = 1
+    taille = len(tampon)
+    debut_occurrence = moteur.chercher(tampon)
+    while debut_occurrence >= 0:
+        debut = max(position, tampon.rfind(b"\n", position, debut_occurrence) + 1)
+        fin = tampon.find(b"\n", debut_occurrence)
+        fin = taille if fin < 0 else fin + 1
+        numero += _copier(tampon, position, debut, ignorer)
+        ligne = tampon[debut:fin]
+        nouvelle, nb_remplacements = moteur.remplacer(ligne)
+        if nb_remplacements and nouvelle != ligne:
+            yield numero, debut, fin, nouvelle, nb_remplacements
+        numero += 1
+        position = fin
+        debut_occurrence = moteur.chercher(tampon, position)
+
+def _decouper(tampon, debut, fin):
+    """Retourne les lignes de tampon[debut:fin], fins de ligne comprises."""
+    return tampon[debut:fin].splitlines(keepends=True)
+
+def _lignes_diff(prefixe, lignes):
+    """Formate des lignes d'un bloc de diff unifié, en signalant une dernière ligne sans fin de ligne."""
+    sortie = []
+    for ligne in lignes:
+        texte = ligne.decode("utf-8", "replace")
+        if texte.endswith("\n"):
+            sortie.append(prefixe + texte)
+        else:
+            sortie.append(prefixe + texte + "\n\\ No newline at end of file\n")
+    return sortie
+
+def _intervalle(debut, nombre):
+    """Formate un intervalle de lignes d'en-tête de bloc comme diff -u ("3" pour une seule ligne)."""
+    return str(debut) if nombre == 1 else f"{debut},{nombre}"
+
+def diff_tampon(tampon, moteur, nom, contexte=3):
+    """
+    Calcule le diff unifié du remplacement dans un tampon, sans construire le contenu modifié.
+
+    Les blocs (hunks) sont produits au fil des lignes modifiées : deux modifications séparées par
+    au plus 2 * contexte lignes sont regroupées, comme le fait diff -u.
+
+    PRE: tampon (bytes ou mmap): Contenu du fichier.
+         moteur: MoteurRegex ou AutomateAhoCorasick.
+         nom (str): Nom du fichier affiché dans l'en-tête.
+         contexte (int, optional): Nombre de lignes de contexte autour des modifications.
+    POST: Retourne (texte du diff, nombre de lignes modifiées, nombre de remplacements) ; le texte est
+          vide si rien ne change.
+    """
+    sortie = []
+    nb_lignes = 0
+    nb_remplacements = 0
+    decalage = 0
+    groupe = []
+
+    def fermer_groupe():
+        nonlocal decalage
+        premier, debut, _, _, _ = groupe[0]
+        dernier, _, fin, _, _ = groupe[-1]
+        # Contexte avant : remonte d'au plus contexte lignes
+        debut_contexte = debut
+        for _ in range(min(contexte, premier - 1)):
+            debut_contexte = tampon.rfind(b"\n", 0, debut_contexte - 1) + 1
+        avant = _decouper(tampon, debut_contexte, debut)
+        # Contexte après : avance d'au plus contexte lignes
+        fin_contexte = fin
+        for _ in range(contexte):
+            if fin_contexte >= len(tampon):
+                break
+            suivante = tampon.find(b"\n", fin_contexte)
+            fin_contexte = len(tampon) if suivante < 0 else suivante + 1
+        apres = _decouper(tampon, fin, fin_contexte)
+        anciennes = len(avant) + len(apres)
+        nouvelles = anciennes
+        corps = _lignes_diff(" ", avant)
+        retirees = []
+        ajoutees = []
+        for i, (_, debut_ligne, fin_ligne, nouvelle, _) in enumerate(groupe):
+            if i and groupe[i - 1][2] != debut_ligne:
+                # Des lignes inchangées séparent deux modifications : les lignes retirées puis ajoutées d'abord
+                corps += _lignes_diff("-", retirees) + _lignes_diff("+", ajoutees)
+                retirees, ajoutees = [], []
+                entre = _decouper(tampon, groupe[i - 1][2], debut_ligne)
+                corps += _lignes_diff(" ", entre)
+                anciennes += len(entre)
+                nouvelles += len(entre)
+            retirees.append(tampon[debut_ligne:fin_ligne])
+            lignes_nouvelles = nouvelle.splitlines(keepends=True)
+            ajoutees += lignes_nouvelles
+            anciennes += 1
+            nouvelles += len(lignes_nouvelles)
+        corps += _lignes_diff("-", retirees) + _lignes_diff("+", ajoutees)
+        corps += _lignes_diff(" ", apres)
+        debut_ancien = premier - len(avant)
+        sortie.append(f"@@ -{_intervalle(debut_ancien, anciennes)} +{_intervalle(debut_ancien + decalage, nouvelles)} @@\n")
+        sortie.extend(corps)
+        decalage += nouvelles - anciennes
+
+    for modification in _lignes_modifiees(tampon, moteur):
+        if groupe and modification[0] - groupe[-1][0] > 2 * contexte + 1:
+            fermer_groupe()
+            groupe = []
+        groupe.append(modification)
+        nb_lignes += 1
+        nb_remplacements += modification[4]
+    if not groupe:
+        return "", 0, 0
+    fermer_groupe()
+    return f"--- a/{nom}\n+++ b/{nom}\n" + "".join(sortie), nb_lignes, nb_remplacements
+
+def previsualiser_fichier(fichier, moteur, format_apercu="diff", contexte=3):
+    """
+    Calcule ce que le remplacement changerait dans un fichier, sans le modifier.
+
+    Cette fonction peut être exécutée dans un processus du pool.
+
+    PRE: fichier (str): Chemin du fichier.
+         moteur: MoteurRegex ou AutomateAhoCorasick.
+         format_apercu (str, optional): "diff" pour un diff unifié, "summary" pour le nombre de modifications.
+         contexte (int, optional): Nombre de lignes de contexte du diff.
+    POST: Retourne un dictionnaire avec les clés "fichier", "lignes" (nombre de lignes modifiées),
+          "remplacements", "apercu" (texte à afficher, vide si rien ne change) et "erreur".
+    """
+    try:
+        with open(fichier, "rb") as source:
+            if os.fstat(source.fileno()).st_size == 0:
+                return {"fichier": fichier, "lignes": 0, "remplacements": 0, "apercu": "", "erreur": None}
+            with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as tampon:
+                if format_apercu == "diff":
+                    apercu, nb_lignes, nb_remplacements = diff_tampon(tampon, moteur, fichier, contexte)
+                else:
+                    nb_lignes = nb_remplacements = 0
+                    for *_, remplacements in _lignes_modifiees(tampon, moteur):
+                        nb_lignes += 1
+                        nb_remplacements += remplacements
+                    apercu = f"{fichier} : {nb_remplacements} remplacement(s) sur {nb_lignes} ligne(s)\n" if nb_lignes else ""
+        return {"fichier": fichier, "lignes": nb_lignes, "remplacements": nb_remplacements, "apercu": apercu, "erreur": None}
+
+    except FileNotFoundError:
+        return {"fichier": fichier, "lignes": 0, "remplacements": 0, "apercu": "",
+                "erreur": f"Erreur : le fichier {fichier} n'a pas été trouvé."}
+    except Exception as e:
+        return {"fichier": fichier, "lignes": 0, "remplacements": 0, "apercu": "",
+                "erreur": f"Une erreur s'est produite : {e}"}
+
+def empreinte_motifs(table, ignore_case=False, compte=0):
+    """
+    PRE: table (dict): Associe chaque motif (str) à son remplacement (str).
+         ignore_case (bool, optional): Si True, la recherche ignore la casse.
+         compte (int, optional): Nombre maximal de remplacements par ligne.
+    POST: Retourne une empreinte identifiant le remplacement effectué, quel que soit le moteur.
+    """
+    return hashlib.sha256(repr((sorted(table.items()), ignore_case, compte)).encode("utf-8")).hexdigest()
+
+def etat_fichier(fichier, empreinte=None):
+    """
+    PRE: fichier (str): Chemin du fichier.
+         empreinte (str, optional): Empreinte du contenu si elle est déjà connue, sinon le fichier est relu.
+    POST: Retourne (taille, date de modification en nanosecondes, empreinte du contenu).
+    """
+    infos = os.stat(fichier)
+    return infos.st_size, infos.st_mtime_ns, empreinte_fichier(fichier) if empreinte is None else empreinte
+
+class IndexFichiers:
+    """
+    Index persistant (SQLite) des fichiers déjà traités avec un ensemble de motifs donné.
+
+    Pour chaque fichier, l'index garde la taille, la date de modification et l'empreinte du contenu
+    après son traitement, ainsi que l'empreinte des motifs. Un fichier dont la taille et la date
+    n'ont pas changé depuis est ignoré sans être ouvert ; si seule la date a changé, le contenu est
+    comparé à l'empreinte. L'index n'est utilisé que par le processus principal.
+    """
+
+    def __init__(self, chemin, motifs, taille_lot=1024):
+        """
+        PRE: chemin (str): Chemin de la base SQLite (créée si besoin).
+             motifs (str): Empreinte des motifs de l'exécution (voir empreinte_motifs).
+             taille_lot (int, optional): Nombre de mises à jour en attente avant une écriture.
+        """
+        self.motifs = motifs
+        self.taille_lot = taille_lot
+        self.nb_ignores = 0
+        # Avec --pipeline async, la découverte des fichiers (et donc filtrer) tourne dans un autre fil
+        self._verrou = threading.Lock()
+        self._connexion = sqlite3.connect(chemin, check_same_thread=False)
+        self._connexion.execute("PRAGMA journal_mode=WAL")
+        self._connexion.execute("PRAGMA synchronous=NORMAL")
+        self._connexion.execute("CREATE TABLE IF NOT EXISTS fichiers (chemin TEXT PRIMARY KEY, taille INTEGER, "
+                                "mtime_ns INTEGER, empreinte TEXT, motifs TEXT)")
+        # Seuls les fichiers traités avec les mêmes motifs peuvent être ignorés : ils tiennent en mémoire
+        self._connus = {chemin: (taille, mtime_ns, empreinte) for chemin, taille, mtime_ns, empreinte in
+                        self._connexion.execute("SELECT chemin, taille, mtime_ns, empreinte FROM fichiers WHERE motifs = ?",
+                                                (motifs,))}
+        self._en_attente = []
+
+    def a_jour(self, fichier):
+        """
+        PRE: fichier (str): Chemin du fichier.
+        POST: Retourne True si le fichier n'a pas changé depuis son traitement avec les mêmes motifs.
+        """
+        connu = self._connus.get(os.path.abspath(fichier))
+        if connu is None:
+            return False
+        try:
+            infos = os.stat(fichier)
+        except OSError:
+            return False
+        if infos.st_size != connu[0]:
+            return False
+        if infos.st_mtime_ns == connu[1]:
+            return True
+        # Date modifiée sans changement de taille (fichier touché, copié...) : le contenu tranche
+        if empreinte_fichier(fichier) != connu[2]:
+            return False
+        self.enregistrer(fichier, (infos.st_size, infos.st_mtime_ns, connu[2]))
+        return True
+
+    def filtrer(self, fichiers):
+        """
+        PRE: fichiers (iterable): Chemins des fichiers.
+        POST: Génère les fichiers qui ne sont pas à jour ; nb_ignores compte les autres.
+        """
+        for fichier in fichiers:
+            if self.a_jour(fichier):
+                self.nb_ignores += 1
+            else:
+                yield fichier
+
+    def enregistrer(self, fichier, etat):
+        """
+        PRE: fichier (str): Chemin du fichier traité.
+             etat (tuple): (taille, date de modification en nanosecondes, empreinte) après le traitement,
+                           ou None pour retirer le fichier de l'index.
+        """
+        with self._verrou:
+            self._en_attente.append((os.path.abspath(fichier), etat))
+            if len(self._en_attente) >= self.taille_lot:
+                self._vider()
+
+    def vider(self):
+        """Écrit les mises à jour en attente dans la base."""
+        with self._verrou:
+            self._vider()
+
+    def _vider(self):
+        with self._connexion:
+            self._connexion.executemany("DELETE FROM fichiers WHERE chemin = ?",
+                                        [(chemin,) for chemin, etat in self._en_attente if etat is None])
+            self._connexion.executemany("INSERT OR REPLACE INTO fichiers VALUES (?, ?, ?, ?, ?)",
+                                        [(chemin, *etat, self.motifs) for chemin, etat in self._en_attente if etat is not None])
+        self._en_attente.clear()
+
+    def fermer(self):
+        """Écrit les mises à jour en attente et ferme la base."""
+        self.vider()
+        self._connexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+def _resultat_erreur(fichier, erreur, sauvegarde=None):
+    """Retourne le résultat d'un fichier dont le traitement a échoué (voir traiter_fichier)."""
+    if isinstance(erreur, FileNotFoundError):
+        message = f"Erreur : le fichier {fichier} n'a pas été trouvé."
+    else:
+        message = f"Une erreur s'est produite : {erreur}"
+    return {"fichier": fichier, "lignes": [], "details": None, "etat": None, "sauvegarde": sauvegarde, "erreur": message}
+
+def traiter_fichier(fichier, moteur, options, backup_folder):
+    """
+    Effectue la recherche et le remplacement dans un fichier, en le sauvegardant s'il doit changer.
+
+    Cette fonction peut être exécutée dans un processus du pool : elle n'affiche pas le résultat
+    et ne l'écrit pas dans le journal, elle le renvoie au processus principal.
+
+    PRE: fichier (str): Chemin du fichier à modifier.
+         moteur: MoteurRegex ou AutomateAhoCorasick.
+         options (argparse.Namespace): Arguments de la ligne de commande.
+         backup_folder (str): Dossier des sauvegardes.
+    POST: Retourne un dictionnaire avec les clés "fichier", "lignes" (numéros des lignes modifiées),
+          "details" (détail des lignes modifiées pour le journal JSON, sinon None),
+          "etat" (état du fichier après traitement pour l'index, voir etat_fichier),
+          "sauvegarde" (entrée du manifeste si le fichier a été sauvegardé dans le magasin d'objets)
+          et "erreur" (None si le traitement a réussi, sinon le message d'erreur).
+    """
+    objets = []
+    if options.backup_mode == "copy":
+        sauvegarde = functools.partial(backup_file, incremental=options.incremental_backup,
+                                       backup_folder=backup_folder, backup_prefix=options.backup_prefix)
+    else:
+        def sauvegarde(chemin):
+            objets.append({"fichier": os.path.abspath(chemin),
+                           "objet": stocker_objet(chemin, backup_folder, options.compress),
+                           "mode": os.stat(chemin).st_mode & 0o7777})
+    details = [] if options.log_format == "jsonl" else None
+    empreinte = hashlib.sha256()
+    try:
+        lignes = remplacer_dans_fichier(fichier, moteur, avant_ecriture=sauvegarde, details=details, empreinte=empreinte)
+        return {"fichier": fichier, "lignes": lignes, "details": details,
+                "etat": etat_fichier(fichier, empreinte.hexdigest()),
+                "sauvegarde": objets[0] if objets else None, "erreur": None}
+
+    except Exception as e:
+        return _resultat_erreur(fichier, e, objets[0] if objets else None)
+
+# Traitement exécuté par les processus du pool, envoyé une seule fois à chaque processus
+_TRAITEMENT = None
+
+def _initialiser_traitement(traitement):
+    global _TRAITEMENT
+    _TRAITEMENT = traitement
+
+def _appliquer_traitement(fichier):
+    return _TRAITEMENT(fichier)
+
+def executer_traitements(fichiers, traitement, processus=1, max_en_cours=None, abandonnes=None):
+    """
+    Applique un traitement à chaque fichier, réparti sur un pool de processus.
+
+    Les fichiers sont soumis au fur et à mesure : au plus max_en_cours traitements sont en attente
+    à la fois, la liste des fichiers n'a donc pas besoin d'être connue à l'avance.
+    Le traitement (et le moteur qu'il contient) est transmis une seule fois à chaque processus,
+    seuls les chemins des fichiers sont envoyés ensuite.
+
+    PRE: fichiers (iterable): Chemins des fichiers à traiter.
+         traitement (callable): Fonction de niveau module (ou functools.partial) prenant un chemin.
+         processus (int, optional): Nombre de processus ; 1 traite les fichiers dans le processus courant.
+         max_en_cours (int, optional): Nombre maximal de traitements en attente (par défaut 4 par processus).
+         abandonnes (list, optional): Si le générateur est interrompu, reçoit les résultats des traitements
+                                      déjà commencés, qui se terminent malgré tout.
+    POST: Génère les résultats des traitements dans l'ordre des fichiers.
+    """
+    if processus <= 1:
+        for fichier in fichiers:
+            yield traitement(fichier)
+        return
+
+    max_en_cours = max_en_cours or 4 * processus
+    with ProcessPoolExecutor(max_workers=processus, initializer=_initialiser_traitement, initargs=(traitement,)) as pool:
+        en_cours = deque()
+        try:
+            for fichier in fichiers:
+                if len(en_cours) >= max_en_cours:
+                    yield en_cours.popleft().result()
+                en_cours.append(pool.submit(_appliquer_traitement, fichier))
+            while en_cours:
+                yield en_cours.popleft().result()
+        finally:
+            # Interruption : les traitements pas encore commencés sont annulés, les autres ont pu modifier leur fichier
+            for futur in en_cours:
+                if not futur.cancel() and abandonnes is not None:
+                    try:
+                        abandonnes.append(futur.result())
+                    except BaseException:
+                        pass
+
+# Moteur des étapes de transformation du pipeline asynchrone, fixé une fois par processus
+_MOTEUR = None
+
+def _initialiser_moteur(moteur):
+    global _MOTEUR
+    _MOTEUR = moteur
+
+def _lire_fichier(fichier):
+    """Retourne (contenu, os.stat_result) d'un fichier, lu d'un seul bloc."""
+    with open(fichier, "rb") as source:
+        return source.read(), os.fstat(source.fileno())
+
+def transformer_contenu(contenu, avec_details=False):
+    """
+    Applique le moteur du processus (voir _initialiser_moteur) à un contenu en mémoire.
+
+    PRE: contenu (bytes): Contenu du fichier.
+         avec_details (bool, optional): Si True, détaille les lignes modifiées pour le journal JSON.
+    POST: Retourne (nouveau contenu ou None s'il n'y a aucune occurrence, lignes modifiées, détails).
+    """
+    debut_occurrence = _MOTEUR.chercher(contenu)
+    if debut_occurrence < 0:
+        return None, [], None
+    morceaux = []
+    details = [] if avec_details else None
+    lignes = remplacer_tampon(contenu, _MOTEUR, morceaux.append, debut_occurrence, details)
+    return b"".join(morceaux), lignes, details
+
+def _ecrire_resultat(fichier, contenu, infos, nouveau, lignes, details, options, backup_folder):
+    """
+    Étape d'écriture : sauvegarde puis remplace un fichier modifié, et retourne son résultat (voir traiter_fichier).
+    """
+    sauvegarde = None
+    try:
+        if nouveau is None or not lignes:
+            return {"fichier": fichier, "lignes": [], "details": None, "sauvegarde": None, "erreur": None,
+                    "etat": (infos.st_size, infos.st_mtime_ns, hashlib.sha256(contenu).hexdigest())}
+        if options.backup_mode == "copy":
+            backup_file(fichier, incremental=options.incremental_backup, backup_folder=backup_folder,
+                        backup_prefix=options.backup_prefix)
+        else:
+            sauvegarde = {"fichier": os.path.abspath(fichier),
+                          "objet": stocker_octets(contenu, backup_folder, options.compress),
+                          "mode": infos.st_mode & 0o7777}
+        dossier, nom = os.path.split(os.path.abspath(fichier))
+        descripteur, temporaire = tempfile.mkstemp(dir=dossier, prefix=f".{nom}.", suffix=".tmp")
+        try:
+            with open(descripteur, "wb") as sortie:
+                sortie.write(nouveau)
+            os.chmod(temporaire, infos.st_mode & 0o7777)
+        except BaseException:
+            os.remove(temporaire)
+            raise
+        os.replace(temporaire, fichier)
+        etat = (len(nouveau), os.stat(fichier).st_mtime_ns, hashlib.sha256(nouveau).hexdigest())
+        return {"fichier": fichier, "lignes": lignes, "details": details, "etat": etat, "sauvegarde": sauvegarde,
+                "erreur": None}
+
+    except Exception as e:
+        return _resultat_erreur(fichier, e, sauvegarde)
+
+async def _pipeline(fichiers, moteur, options, backup_folder, publier, arret=None):
+    """
+    Traite les fichiers en quatre étapes reliées par des files bornées : découverte, lecture,
+    transformation et écriture. Chaque étape a son propre nombre de tâches ; les entrées-sorties
+    sont faites dans des fils, la transformation dans des processus si elle en a plus d'une.
+    publier est appelée avec le résultat de chaque fichier, dans l'ordre où ils se terminent.
+    Quand arret (threading.Event) est levé, plus aucun fichier n'est découvert et ceux en cours se terminent.
+    """
+    boucle = asyncio.get_running_loop()
+    boucle.set_default_executor(ThreadPoolExecutor(options.read_concurrency + options.write_concurrency + 2))
+    a_lire = asyncio.Queue(options.queue_size)
+    a_transformer = asyncio.Queue(options.queue_size)
+    a_ecrire = asyncio.Queue(options.queue_size)
+    _initialiser_moteur(moteur)
+    pool = None
+    if options.transform_concurrency > 1:
+        pool = ProcessPoolExecutor(options.transform_concurrency, initializer=_initialiser_moteur, initargs=(moteur,))
+    avec_details = options.log_format == "jsonl"
+
+    async def decouvrir():
+        iterateur = iter(fichiers)
+        while arret is None or not arret.is_set():
+            # Parcourir l'arborescence touche aussi le disque : les chemins arrivent par lots depuis un fil
+            lot = await asyncio.to_thread(list, itertools.islice(iterateur, 64))
+            if not lot:
+                return
+            for fichier in lot:
+                await a_lire.put(fichier)
+
+    async def lire():
+        while (fichier := await a_lire.get()) is not None:
+            try:
+                contenu, infos = await asyncio.to_thread(_lire_fichier, fichier)
+            except Exception as e:
+                publier(_resultat_erreur(fichier, e))
+                continue
+            await a_transformer.put((fichier, contenu, infos))
+
+    async def transformer():
+        while (element := await a_transformer.get()) is not None:
+            fichier, contenu, infos = element
+            try:
+                nouveau, lignes, details = await boucle.run_in_executor(pool, transformer_contenu, contenu, avec_details)
+            except Exception as e:
+                publier(_resultat_erreur(fichier, e))
+                continue
+            await a_ecrire.put((fichier, contenu, infos, nouveau, lignes, details))
+
+    async def ecrire():
+        while (element := await a_ecrire.get()) is not None:
+            publier(await asyncio.to_thread(_ecrire_resultat, *element, options, backup_folder))
+
+    async def etape(travail, nombre, suivante=None, nb_suivants=0):
+        # Quand toutes les tâches d'une étape ont fini, chaque tâche de l'étape suivante reçoit None
+        await asyncio.gather(*(travail() for _ in range(nombre)))
+        for _ in range(nb_suivants):
+            await suivante.put(None)
+
+    try:
+        await asyncio.gather(
+            etape(decouvrir, 1, a_lire, options.read_concurrency),
+            etape(lire, options.read_concurrency, a_transformer, options.transform_concurrency),
+            etape(transformer, options.transform_concurrency, a_ecrire, options.write_concurrency),
+            etape(ecrire, options.write_concurrency))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+def executer_pipeline(fichiers, moteur, options, backup_folder, abandonnes=None):
+    """
+    Traite les fichiers avec le pipeline asynchrone, exécuté dans un fil dédié.
+
+    Adapté aux systèmes de fichiers lents ou distants (NFS...) : plusieurs fichiers sont lus et écrits
+    en même temps, le débit ne dépend donc plus de la latence d'un aller-retour par fichier.
+
+    PRE: fichiers (iterable): Chemins des fichiers à traiter.
+         moteur: MoteurRegex ou AutomateAhoCorasick.
+         options (argparse.Namespace): Arguments de la ligne de commande.
+         backup_folder (str): Dossier des sauvegardes.
+         abandonnes (list, optional): Si le générateur est interrompu, reçoit les résultats des fichiers
+                                      déjà en cours, que le pipeline termine avant de s'arrêter.
+    POST: Génère les résultats (voir traiter_fichier) dans l'ordre où les fichiers se terminent.
+    """
+    resultats = queue.Queue()
+    fin = object()
+    arret = threading.Event()
+
+    def executer():
+        try:
+            asyncio.run(_pipeline(fichiers, moteur, options, backup_folder, resultats.put, arret))
+        except BaseException as e:
+            resultats.put(e)
+        finally:
+            resultats.put(fin)
+
+    fil = threading.Thread(target=executer, daemon=True)
+    fil.start()
+    termine = False
+    try:
+        while (resultat := resultats.get()) is not fin:
+            if isinstance(resultat, BaseException):
+                raise resultat
+            yield resultat
+        termine = True
+    finally:
+        if not termine:
+            arret.set()
+            while (resultat := resultats.get()) is not fin:
+                if abandonnes is not None and not isinstance(resultat, BaseException):
+                    abandonnes.append(resultat)
+    fil.join()
+
+def apercu_remplacement(fichiers, moteur, options):
+    """
+    Affiche les modifications que ferait le remplacement, sans écrire dans aucun fichier.
+
+    Les aperçus sont calculés en parallèle et affichés dans l'ordre des fichiers.
+
+    PRE: fichiers (iterable): Chemins des fichiers.
+         moteur: MoteurRegex ou AutomateAhoCorasick.
+         options (argparse.Namespace): Arguments de la ligne de commande.
+    POST: Retourne le nombre de fichiers en erreur.
+    """
+    traitement = functools.partial(previsualiser_fichier, moteur=moteur, format_apercu=options.preview,
+                                   contexte=options.context)
+    nb_fichiers = 0
+    nb_modifies = 0
+    nb_lignes = 0
+    nb_erreurs = 0
+    for resultat in executer_traitements(fichiers, traitement, options.workers, options.max_in_flight):
+        nb_fichiers += 1
+        if resultat["erreur"]:
+            nb_erreurs += 1
+            print(resultat["erreur"], file=sys.stderr)
+            continue
+        if resultat["lignes"]:
+            nb_modifies += 1
+            nb_lignes += resultat["lignes"]
+            sys.stdout.write(resultat["apercu"])
+    print(f"Aperçu : {nb_fichiers} fichier(s) examiné(s), {nb_modifies} à modifier, {nb_lignes} ligne(s) à modifier, "
+          f"{nb_erreurs} erreur(s).", file=sys.stderr)
+    return nb_erreurs
+
+def taille_octets(texte):
+    """
+    PRE: texte (str): Taille en octets, éventuellement suivie de K, M, G ou T (ex: "500M").
+    POST: Retourne la taille en octets.
+    Raises: argparse.ArgumentTypeError: Si le texte n'est pas une taille.
+    """
+    unites = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+    texte = texte.strip().upper()
+    facteur = unites.get(texte[-1:], 1)
+    try:
+        return int(float(texte[:-1] if facteur != 1 else texte) * facteur)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"taille invalide : {texte}")
+
+def do_recherche_remplacement(argv=None):
     """
     Fonction principale pour effectuer la recherche et le remplacement dans les fichiers spécifiés.
 
     Cette fonction utilise les arguments de ligne de commande pour configurer le comportement du script.
     Les fichiers spécifiés seront sauvegardés, puis les occurrences du motif de recherche seront remplacées
     par les motifs de remplacement dans chaque fichier.
+    Si --pattern ou --mapping est donné, le script s'exécute sans interaction : les fichiers viennent de --files,
+    --glob, --stdin ou --root. Sinon, les fichiers et les motifs sont demandés à l'utilisateur.
 
-    PRE: /
-    POST: /
-    Raises: FileNotFoundError: Si l'un des fichiers spécifiés n'est pas trouvé.
-            Exception: Toute autre exception qui pourrait se produire pendant l'exécution.
+    PRE: argv (list, optional): Arguments de la ligne de commande (par défaut sys.argv).
+    POST: Retourne le nombre de fichiers en erreur.
+    Raises: Exception: Toute exception qui pourrait se produire pendant l'exécution.
     """
     # Configuration des arguments en ligne de commande
     parser = argparse.ArgumentParser(description="Script de recherche et remplacement dans des fichiers.")
     parser.add_argument("--extensions", nargs="+", default=["txt"], help="Extensions de fichier à prendre en compte.")
     parser.add_argument("--ignore-case", action="store_true", help="Ignorer la casse lors de la recherche.")
     parser.add_argument("--replace-all", action="store_true", help="Remplacer toutes les occurrences du motif.")
-    parser.add_argument("--incremental-backup", action="store_true", help="Utiliser une sauvegarde incrémentielle")
-    parser.add_argument("--backup-prefix", default="backup", help="Préfixe pour les fichiers de sauvegarde.")
-    
-    args = parser.parse_args()
-
-    motifs = []
-    
-    # Demande à l'utilisateur de spécifier les fichiers à traiter
-    while True:
-        fichier = input("Entrez le chemin vers un fichier à modifier (laissez vide pour terminer) : ")
-        if not fichier:
-            break
-        _, extension = os.path.splitext(fichier)
-        # Vérifie si l'extension du fichier est prise en charge
-        if extension[1:].lower() in args.extensions:
-            motifs.append(fichier)
+    parser.add_argument("--incremental-backup", action="store_true", help="Utiliser une sauvegarde incrémentielle (avec --backup-mode copy)")
+    parser.add_argument("--backup-prefix", default="backup", help="Préfixe pour les fichiers de sauvegarde (avec --backup-mode copy).")
+    parser.add_argument("--backup-mode", choices=["cas", "copy"], default="cas", help="Sauvegardes dédupliquées adressées par contenu avec un manifeste par exécution (cas), ou copies complètes (copy).")
+    parser.add_argument("--compress", action="store_true", help="Compresser les nouveaux objets sauvegardés (zlib).")
+    parser.add_argument("--clean", action="store_true", help="Nettoyer le dossier des sauvegardes selon --keep-runs, --max-age et --max-size puis quitter (avec --dry-run : sans rien supprimer).")
+    parser.add_argument("--keep-runs", type=int, default=None, help="Avec --clean : nombre d'exécutions les plus récentes à conserver.")
+    parser.add_argument("--max-age", type=float, default=None, help="Avec --clean : âge maximal des sauvegardes, en jours.")
+    parser.add_argument("--max-size", type=taille_octets, default=None, help="Avec --clean : taille maximale du dossier des sauvegardes (ex: 500M, 10G).")
+    parser.add_argument("--restore", metavar="EXECUTION", help="Restaurer les fichiers modifiés par une exécution ('last' pour la plus récente) puis quitter.")
+    parser.add_argument("--pattern", help="Motif à rechercher (active le mode non interactif).")
+    parser.add_argument("--replacement", default="", help="Texte de remplacement (mode non interactif).")
+    parser.add_argument("--mapping", help="Fichier de correspondances 'motif<TAB>remplacement', appliquées en un seul passage (mode non interactif).")
+    parser.add_argument("--engine", choices=["regex", "aho"], default="regex", help="Moteur multi-motifs utilisé avec --mapping : expression en alternance ou automate d'Aho-Corasick.")
+    parser.add_argument("--files", nargs="+", default=[], help="Fichiers à modifier.")
+    parser.add_argument("--glob", help="Motif glob des fichiers à modifier (ex: 'src/**/*.txt').")
+    parser.add_argument("--stdin", action="store_true", help="Lire les chemins des fichiers sur l'entrée standard, un par ligne.")
+    parser.add_argument("--root", help="Dossier à parcourir récursivement pour trouver les fichiers à modifier.")
+    parser.add_argument("--ignore", nargs="+", default=[], help="Motifs de noms de fichiers ou dossiers à ignorer avec --root (ex: 'build' '*.min.txt').")
+    parser.add_argument("--log-format", choices=["text", "jsonl"], default="text", help="Format du journal : texte, ou JSON (une ligne par modification, avec colonne, ancien et nouveau texte).")
+    parser.add_argument("--log-max-size", type=int, default=10 << 20, help="Taille en octets au-delà de laquelle le journal est archivé (0 : jamais).")
+    parser.add_argument("--log-backups", type=int, default=5, help="Nombre d'anciens journaux conservés.")
+    parser.add_argument("--force", action="store_true", help="Traiter aussi les fichiers inchangés depuis leur traitement avec les mêmes motifs.")
+    parser.add_argument("--dry-run", action="store_true", help="Afficher les modifications sans rien écrire.")
+    parser.add_argument("--preview", choices=["diff", "summary"], default="diff", help="Avec --dry-run : diff unifié, ou nombre de remplacements par fichier.")
+    parser.add_argument("--context", type=int, default=3, help="Nombre de lignes de contexte des diffs de --dry-run.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Nombre de processus pour traiter les fichiers.")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="Nombre maximal de fichiers en attente de traitement.")
+    parser.add_argument("--pipeline", choices=["pool", "async"], default="pool", help="Traitement par un pool de processus (pool), ou par étapes asynchrones pour les systèmes de fichiers lents ou distants (async).")
+    parser.add_argument("--queue-size", type=int, default=64, help="Avec --pipeline async : taille des files entre les étapes.")
+    parser.add_argument("--read-concurrency", type=int, default=16, help="Avec --pipeline async : nombre de lectures simultanées.")
+    parser.add_argument("--transform-concurrency", type=int, default=1, help="Avec --pipeline async : nombre de transformations simultanées (au-delà de 1, dans des processus).")
+    parser.add_argument("--write-concurrency", type=int, default=16, help="Avec --pipeline async : nombre d'écritures simultanées.")
+
+    args = parser.parse_args(argv)
+
+    if args.clean:
+        nb_supprimes, octets, erreurs = nettoyer_sauvegardes(create_backup_folder(), args.keep_runs,
+                                                             None if args.max_age is None else args.max_age * 86400,
+                                                             args.max_size, max(args.workers, 8), args.dry_run)
+        for erreur in erreurs:
+            print(erreur)
+        verbe = "à supprimer" if args.dry_run else "supprimé(s)"
+        print(f"Nettoyage : {nb_supprimes} fichier(s) {verbe}, {octets} octet(s) récupéré(s), {len(erreurs)} erreur(s).")
+        return len(erreurs)
+
+    if args.restore is not None:
+        try:
+            restaures = restaurer_sauvegarde(args.restore, create_backup_folder())
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Erreur lors de la restauration : {e}")
+            return 1
+        for fichier in restaures:
+            print(f"Fichier restauré : {fichier}")
+        print(f"Résumé : {len(restaures)} fichier(s) restauré(s).")
+        return 0
+
+    if args.pattern is not None or args.mapping is not None:
+        # Mode non interactif : tout vient des arguments
+        if not (args.files or args.glob or args.stdin or args.root):
+            print("Aucun fichier spécifié (--files, --glob, --stdin ou --root). Fin du programme.")
+            return 0
+        fichiers = filtrer_extensions(lister_fichiers(args.files, args.glob, args.stdin), args.extensions)
+        if args.root:
+            dossiers_script = (create_log_folder(), create_backup_folder(), create_cache_folder())
+            fichiers = itertools.chain(fichiers, parcourir_arborescence(args.root, args.extensions, args.ignore,
+                                                                        chemins_ignores=dossiers_script))
+        if args.mapping is not None:
+            try:
+                table = lire_table(args.mapping)
+            except (OSError, ValueError) as e:
+                print(f"Erreur : {e}")
+                return 1
+            motif_recherche = f"table {args.mapping}"
+            motifs_remplacement = [f"{len(table)} correspondances"]
         else:
-            print(f"L'extension {extension[1:]} n'est pas prise en charge. Le fichier {fichier} ne sera pas inclus.")
+            motif_recherche = args.pattern
+            motifs_remplacement = args.replacement.split()
+    else:
+        motifs = []
 
-    if not motifs:
-        print("Aucun fichier spécifié. Fin du programme.")
-        return
+        # Demande à l'utilisateur de spécifier les fichiers à traiter
+        while True:
+            fichier = input("Entrez le chemin vers un fichier à modifier (laissez vide pour terminer) : ")
+            if not fichier:
+                break
+            motifs.extend(filtrer_extensions([fichier], args.extensions))
+
+        if not motifs:
+            print("Aucun fichier spécifié. Fin du programme.")
+            return 0
+
+        fichiers = motifs
+        motif_recherche = input("Choisissez le motif à rechercher : ")
+        motifs_remplacement = input("Choisissez le mot ou les mots qui remplacent le précédent (séparés par un espace) : ").split()
 
-    motif_recherche = input("Choisissez le motif à rechercher : ")
-    motifs_remplacement = input("Choisissez le mot ou les mots qui remplacent le précédent (séparés par un espace) : ").split()
+    fichiers = sans_doublons(fichiers)
+
+    # Sans --ignore-case, toutes les occurrences sont remplacées ; avec, une par ligne sauf avec --replace-all
+    compte = 1 if args.ignore_case and not args.replace_all else 0
+    try:
+        if args.mapping is None:
+            moteur = compiler_motif(motif_recherche, " ".join(motifs_remplacement), args.ignore_case, compte)
+        elif args.engine == "aho":
+            moteur = charger_automate(table, args.ignore_case, compte, create_cache_folder())
+        else:
+            moteur = compiler_table(table, args.ignore_case, compte)
+    except ValueError as e:
+        print(f"Erreur : {e}")
+        return 1
+
+    if args.dry_run:
+        return apercu_remplacement(fichiers, moteur, args)
 
     log_folder = create_log_folder()
     backup_folder = create_backup_folder()
+    log_file = os.path.join(log_folder, "log_replacement.jsonl" if args.log_format == "jsonl" else "log_replacement.txt")
+    if args.mapping is None:
+        table = {motif_recherche: " ".join(motifs_remplacement)}
+    index = IndexFichiers(os.path.join(log_folder, "index.sqlite"), empreinte_motifs(table, args.ignore_case, compte))
+    if not args.force:
+        fichiers = index.filtrer(fichiers)
 
-    for fichier in motifs:
+    traitement = functools.partial(traiter_fichier, moteur=moteur, options=args, backup_folder=backup_folder)
+    nb_fichiers = 0
+    nb_modifies = 0
+    nb_lignes = 0
+    erreurs = []
+    manifeste = []
+    abandonnes = []
+    with JournalModifications(log_file, args.log_format, args.log_max_size, args.log_backups) as journal, index:
+        if args.pipeline == "async":
+            resultats = executer_pipeline(fichiers, moteur, args, backup_folder, abandonnes)
+        else:
+            resultats = executer_traitements(fichiers, traitement, args.workers, args.max_in_flight, abandonnes)
         try:
-            # Crée une sauvegarde du fichier
-            backup_file(fichier, incremental=args.incremental_backup, backup_folder=backup_folder, backup_prefix=args.backup_prefix)
-
-            # Effectue la recherche et le remplacement dans le fichier
-            modified_lines = []
-            with fileinput.FileInput(fichier, inplace=True, backup='.bak') as file:
-                for i, line in enumerate(file, start=1):
-                    if args.ignore_case:
-                        # Remplacement insensible à la casse
-                        for motif_r, motif_rep in zip([motif_recherche], motifs_remplacement):
-                            line = line.replace(motif_r, str(motif_rep), -1 if args.replace_all else 1)
-                        modified_lines.append(i)
-                        print(line, end='')
-                    else:
-                        # Remplacement sensible à la casse
-                        line = line.replace(motif_recherche, ' '.join(map(str, motifs_remplacement)))
-                        modified_lines.append(i)
-                        print(line, end='')
-
-            # Enregistre le remplacement dans le journal des modifications
-            log_file = os.path.join(log_folder, "log_replacement.txt")
-            log_replacement(log_file, fichier, motif_recherche, motifs_remplacement, modified_lines)
-
-            print(f"Opération de recherche et remplacement effectuée avec succès dans {fichier}")
+            for resultat in resultats:
+                nb_fichiers += 1
+                if resultat["sauvegarde"] is not None:
+                    manifeste.append(resultat["sauvegarde"])
+                if resultat["erreur"]:
+                    index.enregistrer(resultat["fichier"], None)
+                    erreurs.append(resultat["erreur"])
+                    print(resultat["erreur"])
+                    continue
+                index.enregistrer(resultat["fichier"], resultat["etat"])
+                if not resultat["lignes"]:
+                    continue
+                # Enregistre le remplacement dans le journal des modifications
+                journal.enregistrer(resultat["fichier"], resultat["lignes"], motif_recherche, motifs_remplacement,
+                                    resultat["details"])
+                nb_modifies += 1
+                nb_lignes += len(resultat["lignes"])
+                print(f"Opération de recherche et remplacement effectuée avec succès dans {resultat['fichier']}")
+        finally:
+            # Même interrompue (erreur, Ctrl-C), l'exécution doit rester restaurable : le manifeste
+            # référence aussi les fichiers réécrits dont le résultat n'a pas encore été reçu
+            resultats.close()
+            manifeste.extend(resultat["sauvegarde"] for resultat in abandonnes if resultat["sauvegarde"] is not None)
+            if manifeste:
+                print(f"Sauvegarde {ecrire_manifeste(manifeste, backup_folder)} : restaurable avec --restore.")
 
-        except FileNotFoundError:
-            print(f"Erreur : le fichier {fichier} n'a pas été trouvé.")
-        except Exception as e:
-            print(f"Une erreur s'est produite : {e}")
+    print(f"Résumé : {nb_fichiers} fichier(s) traité(s), {index.nb_ignores} ignoré(s) car inchangé(s), {nb_modifies} modifié(s), "
+          f"{nb_lignes} ligne(s) modifiée(s), {len(erreurs)} erreur(s).")
+    return len(erreurs)
 
 if __name__ == "__main__":
     do_recherche_remplacement()
-    clean_backup_files()
@@ -0,0 +1,78 @@
+from TP7 import Fraction
+from calculator import MAX_DECIMAL_EXPONENT, MAX_EXPONENT, evaluate, evaluate_many, parse
+import fractions
+import unittest
+
+
+class CalculatorTestCase(unittest.TestCase):
+    def test_precedence(self):
+        self.assertEqual(evaluate("1 + 2 * 3"), Fraction(7, 1))
+        self.assertEqual(evaluate("(1 + 2) * 3"), Fraction(9, 1))
+        self.assertEqual(evaluate("1 - 2 - 3"), Fraction(-4, 1))
+        self.assertEqual(evaluate("8 / 4 / 2"), Fraction(1, 1))
+        self.assertEqual(evaluate("2 * 3 ^ 2"), Fraction(18, 1))
+        self.assertEqual(evaluate("1 + 1/3"), Fraction(4, 3))
+
+    def test_power_right_associative(self):
+        self.assertEqual(evaluate("2 ^ 3 ^ 2"), Fraction(512, 1))
+        self.assertEqual(evaluate("(2 ^ 3) ^ 2"), Fraction(64, 1))
+        self.assertEqual(evaluate("2 ** 3 ** 2"), Fraction(512, 1))
+        self.assertEqual(evaluate("2 ^ -1"), Fraction(1, 2))
+        self.assertEqual(evaluate("(2/3) ^ -2"), Fraction(9, 4))
+
+    def test_unary_minus(self):
+        self.assertEqual(evaluate("-3"), Fraction(-3, 1))
+        self.assertEqual(evaluate("--3"), Fraction(3, 1))
+        self.assertEqual(evaluate("+-3"), Fraction(-3, 1))
+        self.assertEqual(evaluate("-2 ^ 2"), Fraction(-4, 1))
+        self.assertEqual(evaluate("(-2) ^ 2"), Fraction(4, 1))
+        self.assertEqual(evaluate("4 * -1/2"), Fraction(-2, 1))
+
+    def test_exact_decimals(self):
+        self.assertEqual(evaluate("0.1 + 0.2"), Fraction(3, 10))
+        self.assertEqual(evaluate(".5 * 4"), Fraction(2, 1))
+        self.assertEqual(evaluate("1e-3 * 1000"), Fraction(1, 1))
+        self.assertEqual(evaluate("2.5e1"), Fraction(25, 1))
+
+    def test_against_stdlib(self):
+        expression = "(3/7 - 0.25) * (2 ^ 5 + 1/9) / -(4 - 1/3)"
+        expected = ((fractions.Fraction(3, 7) - fractions.Fraction(1, 4)) * (32 + fractions.Fraction(1, 9))
+                    / -(4 - fractions.Fraction(1, 3)))
+        result = evaluate(expression)
+        self.assertEqual((result.numerator, result.denominator), (expected.numerator, expected.denominator))
+
+    def test_errors(self):
+        for text in ("", "1 +", "(1 + 2", "1 2", "2 * * 3", "1 + x", ")", "1 / (2 - 2) +"):
+            with self.assertRaises(ValueError):
+                parse(text)
+        with self.assertRaises(ZeroDivisionError):
+            evaluate("1 / (2 - 2)")
+        with self.assertRaises(ZeroDivisionError):
+            evaluate("0 ^ -1")
+        with self.assertRaises(ValueError):
+            evaluate("2 ^ (1/2)")
+        with self.assertRaises(ValueError):
+            evaluate(f"2 ^ {MAX_EXPONENT + 1}")
+        with self.assertRaises(ValueError):
+            evaluate("(9 ^ 9999) ^ 999")
+        for text in ("1e10000000", "2.5E-10000000", f"1e{MAX_DECIMAL_EXPONENT + 1}"):
+            with self.assertRaises(ValueError):
+                parse(text)
+        self.assertEqual(evaluate(f"1e{MAX_DECIMAL_EXPONENT} / 1e{MAX_DECIMAL_EXPONENT}"), Fraction(1, 1))
+
+    def test_evaluate_many(self):
+        self.assertEqual(evaluate_many(["1/2", "1/3 + 1/6", "1/2"]),
+                         [Fraction(1, 2), Fraction(1, 2), Fraction(1, 2)])
+        results = evaluate_many(["1 + 1", "1 / 0", "1 +", "2 ^ 3"], return_exceptions=True)
+        self.assertEqual(results[0], Fraction(2, 1))
+        self.assertIsInstance(results[1], ZeroDivisionError)
+        self.assertIsInstance(results[2], ValueError)
+        self.assertEqual(results[3], Fraction(8, 1))
+        with self.assertRaises(ZeroDivisionError):
+            evaluate_many(["1 + 1", "1 / 0"])
+        self.assertEqual(evaluate_many(["1/2", "1/4", "x"], workers=2, return_exceptions=True)[:2],
+                         [Fraction(1, 2), Fraction(1, 4)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+from TP7 import Fraction
+from fraction_accumulator import ProductAccumulator, SumAccumulator, fraction_prod, fraction_sum
+import random
+import unittest
+
+
+def loop_sum(values):
+    total = Fraction(0, 1)
+    for value in values:
+        total = total + value
+    return total
+
+
+def loop_prod(values):
+    total = Fraction(1, 1)
+    for value in values:
+        total = total * value
+    return total
+
+
+def sample(seed, count, bits):
+    rng = random.Random(seed)
+    return [Fraction(rng.randint(- 2 ** bits, 2 ** bits), rng.randint(1, 2 ** bits)) for _ in range(count)]
+
+
+class FractionAccumulatorTestCase(unittest.TestCase):
+    def test_fraction_sum(self):
+        for bits in (3, 20, 80):
+            values = sample(bits, 1000, bits)
+            self.assertEqual(fraction_sum(values), loop_sum(values))
+            self.assertEqual(fraction_sum(values, pairwise=False), loop_sum(values))
+        self.assertEqual(fraction_sum([Fraction(1, 2), 3, Fraction(-1, 6)]), Fraction(10, 3))
+        self.assertEqual(fraction_sum([Fraction(1, 3), Fraction(-1, 3)]), Fraction(0, 1))
+        self.assertEqual(fraction_sum([]), Fraction(0, 1))
+
+    def test_fraction_prod(self):
+        for bits in (3, 20, 80):
+            values = sample(bits, 600, bits)
+            self.assertEqual(fraction_prod(values), loop_prod(values))
+            self.assertEqual(fraction_prod(values, pairwise=False), loop_prod(values))
+        self.assertEqual(fraction_prod([Fraction(2, 3), -3, Fraction(1, 4)]), Fraction(-1, 2))
+        self.assertEqual(fraction_prod([Fraction(2, 3), 0]), Fraction(0, 1))
+        self.assertEqual(fraction_prod([]), Fraction(1, 1))
+
+    def test_accumulators(self):
+        values = sample(0, 700, 12)
+        total = SumAccumulator(max_groups=4)
+        product = ProductAccumulator(buffer_size=3)
+        for i, value in enumerate(values):
+            total += value
+            product *= value
+            if i % 100 == 0:
+                # the value can be read at any time without changing the result
+                self.assertEqual(total.value(), loop_sum(values[:i + 1]))
+                self.assertEqual(product.value(), loop_prod(values[:i + 1]))
+        self.assertEqual(total.value(), loop_sum(values))
+        self.assertEqual(product.value(), loop_prod(values))
+
+    def test_type_error(self):
+        with self.assertRaises(TypeError):
+            fraction_sum([Fraction(1, 2), 0.5])
+        with self.assertRaises(TypeError):
+            fraction_prod(["1/2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+from TP7 import Fraction
+from fraction_array import FractionArray
+import random
+import unittest
+
+
+def as_fractions(array):
+    return [Fraction(int(num), int(den)) for num, den in zip(array._num, array._den)]
+
+
+class FractionArrayTestCase(unittest.TestCase):
+    def test_against_fraction(self):
+        rng = random.Random(0)
+        for bits in (8, 40, 70):
+            left = [Fraction(rng.randint(-2 ** bits, 2 ** bits), rng.randint(1, 2 ** bits)) for _ in range(50)]
+            right = [Fraction(rng.randint(1, 2 ** bits), rng.randint(1, 2 ** bits)) for _ in range(50)]
+            a = FractionArray.from_fractions(left)
+            b = FractionArray.from_fractions(right)
+            self.assertEqual(as_fractions(a + b), [x + y for x, y in zip(left, right)])
+            self.assertEqual(as_fractions(a - b), [x - y for x, y in zip(left, right)])
+            self.assertEqual(as_fractions(a * b), [x * y for x, y in zip(left, right)])
+            self.assertEqual(as_fractions(a / b), [x / y for x, y in zip(left, right)])
+            self.assertEqual(as_fractions(a ** 3), [x ** 3 for x in left])
+
+    def test_int64_min(self):
+        a = FractionArray([- 2 ** 63])
+        self.assertEqual(as_fractions(a + FractionArray([-1])), [Fraction(- 2 ** 63 - 1, 1)])
+        self.assertEqual(as_fractions(a * 2), [Fraction(- 2 ** 64, 1)])
+        self.assertEqual(as_fractions(- a), [Fraction(2 ** 63, 1)])
+        self.assertEqual(as_fractions(a ** 2), [Fraction(2 ** 126, 1)])
+        self.assertEqual(as_fractions(1 / a), [Fraction(-1, 2 ** 63)])
+        self.assertEqual(as_fractions(FractionArray([1], [- 2 ** 63])), [Fraction(-1, 2 ** 63)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+from TP7 import Fraction
+from fraction_cache import FractionInterner, PowerTable, interned
+import operator
+import unittest
+
+
+class FractionInternerTestCase(unittest.TestCase):
+    def test_same_object(self):
+        interner = FractionInterner(max_num=10, max_den=10)
+        half = interner.get(1, 2)
+        self.assertIs(interner.get(1, 2), half)
+        self.assertIs(interner.get(2, 4), half)
+        self.assertIs(interner.get(-3, -6), half)
+        self.assertIs(interner.intern(Fraction(5, 10)), half)
+        self.assertEqual(interner.get(-1, 3), Fraction(-1, 3))
+        self.assertIs(interned(3, 4), interned(6, 8))
+
+    def test_out_of_range(self):
+        interner = FractionInterner(max_num=10, max_den=10)
+        big = interner.get(11, 2)
+        self.assertEqual(big, Fraction(11, 2))
+        self.assertIsNot(interner.get(11, 2), big)
+        # 20/40 is out of range but its reduced form 1/2 is shared
+        self.assertIs(interner.get(20, 40), interner.get(1, 2))
+        self.assertEqual(interner.stats()["interned"], 1)
+
+    def test_counters(self):
+        interner = FractionInterner(max_num=10, max_den=10)
+        interner.get(1, 2)
+        interner.get(1, 2)
+        interner.get(1, 2)
+        interner.intern(Fraction(1, 3))
+        interner.intern(Fraction(1, 3))
+        stats = interner.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 2))
+        interner.clear()
+        self.assertEqual(interner.stats(), {"hits": 0, "misses": 0, "memo_hits": 0, "memo_misses": 0,
+                                            "interned": 0, "memoized": 0})
+
+    def test_memo(self):
+        interner = FractionInterner(max_num=100, max_den=100, memo_size=2)
+        a, b = interner.get(1, 2), interner.get(1, 3)
+        total = interner.add(a, b)
+        self.assertEqual(total, Fraction(5, 6))
+        self.assertIs(interner.add(a, b), total)
+        self.assertEqual(interner.sub(a, b), Fraction(1, 6))
+        self.assertEqual(interner.mul(a, b), Fraction(1, 6))
+        self.assertIs(interner.mul(a, b), interner.sub(a, b))
+        self.assertEqual(interner.truediv(a, b), Fraction(3, 2))
+        stats = interner.stats()
+        self.assertEqual((stats["memo_hits"], stats["memo_misses"]), (3, 4))
+        self.assertEqual(stats["memoized"], 2)
+        # add is the least recently used result, it was dropped from the memo
+        interner.add(a, b)
+        self.assertEqual(interner.stats()["memo_misses"], 5)
+        self.assertEqual(interner.apply(operator.add, Fraction(1000, 1), a), Fraction(2001, 2))
+        with self.assertRaises(ZeroDivisionError):
+            interner.get(1, 0)
+
+
+class PowerTableTestCase(unittest.TestCase):
+    def test_powers(self):
+        table = PowerTable()
+        base = Fraction(-3, 5)
+        self.assertEqual(table.powers(base, 30, -5), [base ** k for k in range(-5, 30)])
+        self.assertIs(table.power(base, 7), table.power(base, 7))
+        self.assertEqual(table.power(Fraction(2, 3), 100), Fraction(2 ** 100, 3 ** 100))
+        with self.assertRaises(ZeroDivisionError):
+            table.power(Fraction(0, 1), -1)
+        with self.assertRaises(TypeError):
+            table.power(base, Fraction(1, 2))
+
+    def test_counters(self):
+        table = PowerTable(max_bases=1)
+        half, third = Fraction(1, 2), Fraction(1, 3)
+        table.powers(half, 4)
+        table.power(half, 3)
+        self.assertEqual(table.stats(), {"hits": 1, "misses": 4, "bases": 1, "powers": 4})
+        # a new base evicts the least recently used one
+        table.power(third, 2)
+        self.assertEqual(table.stats()["bases"], 1)
+        table.power(half, 3)
+        self.assertEqual(table.stats()["misses"], 6)
+        table.clear()
+        self.assertEqual(table.stats(), {"hits": 0, "misses": 0, "bases": 0, "powers": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+from TP7 import Fraction
+from fraction_io import FractionFile, dump, load, read_fractions, write_fractions
+import io
+import os
+import random
+import struct
+import tempfile
+import unittest
+
+
+def round_trip(fractions, delta=False, stride=1024):
+    data = b"".join(write_fractions(fractions, delta, stride))
+    return list(read_fractions(io.BytesIO(data)))
+
+
+def sample(seed, count, bits):
+    rng = random.Random(seed)
+    return [Fraction(rng.randint(- 2 ** bits, 2 ** bits), rng.randint(1, 2 ** bits)) for _ in range(count)]
+
+
+class FractionIOTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "fractions.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        for bits in (4, 12, 30, 62):
+            values = sample(bits, 300, bits)
+            self.assertEqual(round_trip(values), values)
+            self.assertEqual(round_trip(values, delta=True), values)
+
+    def test_bigint(self):
+        values = sample(1, 50, 100) + [Fraction(- 2 ** 64, 3), Fraction(1, 2 ** 64 + 1), Fraction(2 ** 200 + 1, 1)]
+        self.assertEqual(round_trip(values), values)
+        self.assertEqual(round_trip(values, delta=True), values)
+        self.assertEqual(round_trip(values, stride=7), values)
+
+    def test_delta(self):
+        values = sorted(sample(2, 500, 20))
+        self.assertEqual(round_trip(values, delta=True, stride=64), values)
+        # big sorted values : the escaped column then holds small differences instead of 9 byte values
+        close = [Fraction(n, 1) for n in range(2 ** 70, 2 ** 70 + 1000)]
+        plain = b"".join(write_fractions(close))
+        delta = b"".join(write_fractions(close, delta=True))
+        self.assertLess(2 * len(delta), len(plain))
+        self.assertEqual(round_trip(close, delta=True), close)
+
+    def test_strides(self):
+        values = sample(3, 100, 16)
+        for stride in (1, 3, 10, 25, 99, 100, 101):
+            self.assertEqual(round_trip(values, stride=stride), values)
+            self.assertEqual(round_trip(values, delta=True, stride=stride), values)
+
+    def test_empty(self):
+        self.assertEqual(round_trip([]), [])
+        dump([], self.path)
+        self.assertEqual(load(self.path), [])
+        with FractionFile(self.path) as file:
+            self.assertEqual(len(file), 0)
+            self.assertEqual(list(file), [])
+            with self.assertRaises(IndexError):
+                file[0]
+
+    def test_random_access(self):
+        values = sample(4, 257, 40) + [Fraction(3 ** 60, 7)]
+        rng = random.Random(5)
+        for delta in (False, True):
+            for stride in (16, 25):
+                dump(values, self.path, delta, stride)
+                self.assertEqual(load(self.path), values)
+                with FractionFile(self.path) as file:
+                    self.assertEqual(len(file), len(values))
+                    self.assertEqual(list(file), values)
+                    for index in [rng.randrange(len(values)) for _ in range(100)]:
+                        self.assertEqual(file[index], values[index])
+                        self.assertEqual(file[index - len(values)], values[index])
+                    self.assertEqual(file[-1], values[-1])
+                    with self.assertRaises(IndexError):
+                        file[len(values)]
+                    with self.assertRaises(IndexError):
+                        file[- len(values) - 1]
+
+    def test_errors(self):
+        with self.assertRaises(TypeError):
+            b"".join(write_fractions([Fraction(1, 2), 0.5]))
+        with open(self.path, "wb") as file:
+            file.write(b"not a fraction file at all, but long enough")
+        with self.assertRaises(ValueError):
+            load(self.path)
+        with self.assertRaises(ValueError):
+            FractionFile(self.path)
+
+    def test_corrupted(self):
+        dump(sample(6, 50, 20), self.path, stride=8)
+        with open(self.path, "rb") as file:
+            data = file.read()
+        end = len(data) - 20
+        corrupted = [b"XXXX" + data[4:],                                 # header magic
+                     data[:6] + bytes(4) + data[10:],                    # null stride
+                     data[:end + 8] + struct.pack("<Q", len(data)) + data[end + 16:],  # index after the end
+                     data[:end + 8] + struct.pack("<Q", 3) + data[end + 16:],          # index in the header
+                     data[:end] + struct.pack("<Q", 10 ** 6) + data[end + 8:]]          # count without blocks
+        for content in corrupted:
+            with open(self.path, "wb") as file:
+                file.write(content)
+            with self.assertRaises(ValueError):
+                FractionFile(self.path)
+        # the stream reader does not use the index, but it checks the header too
+        for content in corrupted[:2]:
+            with open(self.path, "wb") as file:
+                file.write(content)
+            with self.assertRaises(ValueError):
+                load(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
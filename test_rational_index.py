@@ -0,0 +1,85 @@
+from TP7 import Fraction
+from rational_index import RationalIndex, farey, farey_neighbours
+import random
+import unittest
+
+
+def brute_force_pairs(values):
+    values = sorted(set(values))
+    return {(x, y) for i, x in enumerate(values) for y in values[i + 1:] if x.is_adjacent_to(y)}
+
+
+def explicit_farey(order):
+    return sorted({Fraction(num, den) for den in range(1, order + 1) for num in range(den + 1)})
+
+
+class RationalIndexTestCase(unittest.TestCase):
+    def test_sorted_unique(self):
+        index = RationalIndex([Fraction(1, 2), Fraction(2, 4), 3, Fraction(-1, 3)])
+        self.assertEqual(list(index), [Fraction(-1, 3), Fraction(1, 2), Fraction(3, 1)])
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.add(Fraction(1, 2)), False)
+        self.assertEqual(index.add(Fraction(2, 3)), True)
+        self.assertEqual(index.update([Fraction(2, 3), Fraction(0, 1), 5]), 2)
+        self.assertEqual(Fraction(2, 3) in index, True)
+        self.assertEqual(list(index), sorted(index))
+        with self.assertRaises(TypeError):
+            index.add("1/2")
+
+    def test_range(self):
+        rng = random.Random(0)
+        values = {Fraction(rng.randint(-30, 30), rng.randint(1, 30)) for _ in range(200)}
+        index = RationalIndex(values)
+        for _ in range(50):
+            low, high = sorted([Fraction(rng.randint(-40, 40), rng.randint(1, 9)) for _ in range(2)])
+            self.assertEqual(index.range(low, high), sorted(x for x in values if low <= x <= high))
+            self.assertEqual(index.range(low, high, inclusive=False), sorted(x for x in values if low < x < high))
+        self.assertEqual(RationalIndex([1, 2, 3]).range(1, 3, inclusive=False), [Fraction(2, 1)])
+
+    def test_nearest(self):
+        rng = random.Random(1)
+        values = sorted({Fraction(rng.randint(-30, 30), rng.randint(1, 30)) for _ in range(200)})
+        index = RationalIndex(values)
+        for _ in range(200):
+            value = Fraction(rng.randint(-40, 40), rng.randint(1, 40))
+            expected = min(values, key=lambda x: (x - value if x >= value else value - x, x))
+            self.assertEqual(index.nearest(value), expected)
+        self.assertEqual(RationalIndex([0, 1]).nearest(Fraction(1, 2)), Fraction(0, 1))
+        self.assertEqual(RationalIndex([0, 1]).nearest(0.75), Fraction(1, 1))
+        with self.assertRaises(ValueError):
+            RationalIndex().nearest(1)
+
+    def test_adjacent_pairs(self):
+        rng = random.Random(2)
+        for _ in range(100):
+            values = [Fraction(rng.randint(-30, 30), rng.randint(1, 30)) for _ in range(rng.randint(0, 60))]
+            pairs = list(RationalIndex(values).adjacent_pairs())
+            self.assertEqual(len(pairs), len(set(pairs)))
+            self.assertEqual(set(pairs), brute_force_pairs(values))
+        self.assertEqual(list(RationalIndex([1, 2]).adjacent_pairs()), [(Fraction(1, 1), Fraction(2, 1))])
+
+    def test_farey(self):
+        for order in range(1, 25):
+            self.assertEqual(list(farey(order)), explicit_farey(order))
+        self.assertEqual([str(x) for x in farey(3)], ["0", "1/3", "1/2", "2/3", "1"])
+        # consecutive terms of a Farey sequence are always adjacent
+        terms = list(farey(50))
+        self.assertEqual(all(x.is_adjacent_to(y) for x, y in zip(terms, terms[1:])), True)
+        with self.assertRaises(ValueError):
+            next(farey(0))
+
+    def test_farey_neighbours(self):
+        for order in range(1, 20):
+            terms = explicit_farey(order)
+            for i, term in enumerate(terms):
+                left = terms[i - 1] if i else None
+                right = terms[i + 1] if i + 1 < len(terms) else None
+                self.assertEqual(farey_neighbours(term, order), (left, right))
+        with self.assertRaises(ValueError):
+            farey_neighbours(Fraction(3, 2), 5)
+        with self.assertRaises(ValueError):
+            farey_neighbours(Fraction(1, 7), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+from TP7 import Fraction
+from rational_matrix import determinant, inverse, rank, solve
+import fractions
+import random
+import unittest
+
+
+def to_stdlib(matrix):
+    return [[fractions.Fraction(value.numerator, value.denominator) for value in row] for row in matrix]
+
+
+def same(ours, theirs):
+    return (ours.numerator, ours.denominator) == (theirs.numerator, theirs.denominator)
+
+
+def gauss_jordan(matrix):
+    """Reference elimination with stdlib fractions : return (determinant, rank, reduced rows)."""
+    rows = [list(row) for row in matrix]
+    det = fractions.Fraction(1)
+    pivot_row = 0
+    for col in range(len(rows[0])):
+        pivot = next((i for i in range(pivot_row, len(rows)) if rows[i][col] != 0), None)
+        if pivot is None:
+            det = fractions.Fraction(0)
+            continue
+        if pivot != pivot_row:
+            rows[pivot], rows[pivot_row] = rows[pivot_row], rows[pivot]
+            det = - det
+        value = rows[pivot_row][col]
+        det *= value
+        rows[pivot_row] = [x / value for x in rows[pivot_row]]
+        for i in range(len(rows)):
+            if i != pivot_row and rows[i][col] != 0:
+                factor = rows[i][col]
+                rows[i] = [x - factor * y for x, y in zip(rows[i], rows[pivot_row])]
+        pivot_row += 1
+        if pivot_row == len(rows):
+            break
+    return det, pivot_row, rows
+
+
+def random_matrix(rng, rows, cols):
+    return [[Fraction(rng.randint(-9, 9), rng.randint(1, 9)) for _ in range(cols)] for _ in range(rows)]
+
+
+class RationalMatrixTestCase(unittest.TestCase):
+    def test_determinant(self):
+        self.assertEqual(determinant([[1, 2], [3, 4]]), Fraction(-2, 1))
+        self.assertEqual(determinant([[Fraction(1, 2)]]), Fraction(1, 2))
+        self.assertEqual(determinant([[0, 1], [1, 0]]), Fraction(-1, 1))
+        rng = random.Random(0)
+        for size in range(1, 7):
+            matrix = random_matrix(rng, size, size)
+            det, _, _ = gauss_jordan(to_stdlib(matrix))
+            self.assertTrue(same(determinant(matrix), det))
+
+    def test_workers(self):
+        rng = random.Random(4)
+        matrix = random_matrix(rng, 40, 40)
+        self.assertEqual(determinant(matrix, workers=2), determinant(matrix))
+        self.assertEqual(rank(matrix, workers=2), rank(matrix))
+        self.assertEqual(inverse(matrix, workers=2), inverse(matrix))
+
+    def test_rank(self):
+        self.assertEqual(rank([[1, 2, 3], [2, 4, 6]]), 1)
+        self.assertEqual(rank([[0, 0], [0, 0]]), 0)
+        rng = random.Random(1)
+        for rows, cols in ((3, 5), (5, 3), (4, 4)):
+            matrix = random_matrix(rng, rows, cols)
+            # a combination of the first two rows makes the last one dependent
+            matrix[-1] = [x * 2 - y / 3 for x, y in zip(matrix[0], matrix[1])]
+            _, expected, _ = gauss_jordan(to_stdlib(matrix))
+            self.assertEqual(rank(matrix), expected)
+
+    def test_solve(self):
+        self.assertEqual(solve([[2, 1], [1, 3]], [3, 5]), [Fraction(4, 5), Fraction(7, 5)])
+        rng = random.Random(2)
+        for size in range(1, 6):
+            matrix = random_matrix(rng, size, size)
+            b = [Fraction(rng.randint(-9, 9), rng.randint(1, 9)) for _ in range(size)]
+            augmented = [row + [value] for row, value in zip(to_stdlib(matrix), to_stdlib([b])[0])]
+            _, _, reduced = gauss_jordan(augmented)
+            x = solve(matrix, b)
+            self.assertTrue(all(same(ours, row[-1]) for ours, row in zip(x, reduced)))
+
+    def test_inverse(self):
+        self.assertEqual(inverse([[4, 7], [2, 6]]),
+                         [[Fraction(3, 5), Fraction(-7, 10)], [Fraction(-1, 5), Fraction(2, 5)]])
+        rng = random.Random(3)
+        for size in range(1, 6):
+            matrix = random_matrix(rng, size, size)
+            identity = [[fractions.Fraction(int(i == j)) for j in range(size)] for i in range(size)]
+            augmented = [row + unit for row, unit in zip(to_stdlib(matrix), identity)]
+            _, _, reduced = gauss_jordan(augmented)
+            result = inverse(matrix)
+            for ours, row in zip(result, reduced):
+                self.assertTrue(all(same(x, y) for x, y in zip(ours, row[size:])))
+
+    def test_singular(self):
+        singular = [[1, 2], [Fraction(1, 2), 1]]
+        self.assertEqual(determinant(singular), Fraction(0, 1))
+        self.assertEqual(rank(singular), 1)
+        with self.assertRaises(ZeroDivisionError):
+            solve(singular, [1, 1])
+        with self.assertRaises(ZeroDivisionError):
+            inverse(singular)
+
+    def test_value_error(self):
+        with self.assertRaises(ValueError):
+            determinant([[1, 2, 3], [4, 5, 6]])
+        with self.assertRaises(ValueError):
+            rank([[1, 2], [3]])
+        with self.assertRaises(ValueError):
+            determinant([[1.5]])
+        with self.assertRaises(ValueError):
+            solve([[1, 0], [0, 1]], [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from kivy.clock import Clock
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(kind="thread"):
+    """Return the shared executor of a kind, created on first use.
+
+    PRE : kind is "thread" (the computation stays in the process, fine for short tasks or code
+          releasing the GIL) or "process" (for long pure Python computations).
+    POST : return a ThreadPoolExecutor or a ProcessPoolExecutor shared by the whole application.
+    RAISES : ValueError if kind is unknown.
+    """
+    with _executors_lock:
+        executor = _executors.get(kind)
+        if executor is None:
+            if kind == "thread":
+                executor = ThreadPoolExecutor(thread_name_prefix="ui_tasks")
+            elif kind == "process":
+                executor = ProcessPoolExecutor()
+            else:
+                raise ValueError(f"unknown executor kind : {kind!r}")
+            _executors[kind] = executor
+        return executor
+
+
+def shutdown():
+    """Stop the shared executors, ex : in App.on_stop."""
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        _executors.clear()
+
+
+def run_in_background(function, *args, on_result=None, on_error=None, executor="thread"):
+    """Run function(*args) off the Kivy event loop and hand its outcome back to it.
+
+    PRE : function and args must be picklable with the "process" executor.
+    POST : return the Future of the computation. on_result(result), or on_error(exception),
+           is called on the Kivy main thread by the Clock once the computation is over.
+    """
+    future = get_executor(executor).submit(function, *args)
+
+    def done(future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            if on_error is not None:
+                Clock.schedule_once(lambda dt: on_error(error))
+        elif on_result is not None:
+            result = future.result()
+            Clock.schedule_once(lambda dt: on_result(result))
+
+    future.add_done_callback(done)
+    return future
+
+
+class LatestTask:
+    """Class running a background computation whose only the latest result matters
+
+    Submitting a new computation cancels the previous one if it has not started yet, and the
+    result of an outdated computation is dropped instead of being delivered. A computation which
+    has already started cannot be stopped : it keeps its worker busy until it ends.
+    """
+
+    def __init__(self, on_result, on_error=None, executor="thread"):
+        """This builds a task without any computation.
+
+        PRE : on_result and on_error are called on the Kivy main thread, see run_in_background.
+        """
+        self.on_result = on_result
+        self.on_error = on_error
+        self.executor = executor
+        self.generation = 0
+        self.future = None
+
+    def submit(self, function, *args):
+        """Start function(*args) in the background, replacing the pending computation."""
+        self.generation += 1
+        generation = self.generation
+        if self.future is not None:
+            self.future.cancel()
+
+        def deliver(result):
+            if generation == self.generation:
+                self.on_result(result)
+
+        def fail(error):
+            if generation == self.generation and self.on_error is not None:
+                self.on_error(error)
+
+        self.future = run_in_background(function, *args, on_result=deliver, on_error=fail, executor=self.executor)
+        return self.future
+
+
+class Debounced:
+    """Class coalescing the calls of a callback
+
+    Any number of calls within a frame (or within delay seconds of each other) gives a single
+    call of the callback on the next frame (or delay seconds after the last call), with the
+    arguments of the last call.
+    """
+
+    def __init__(self, callback, delay=0):
+        """This wraps callback.
+
+        PRE : delay is a number of seconds, 0 to coalesce the calls of a single frame.
+        """
+        self.callback = callback
+        self.delay = delay
+        self.args = ()
+        self.kwargs = {}
+        self.trigger = Clock.create_trigger(self.fire, delay)
+
+    def __call__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        if self.delay:
+            # a new call pushes the deadline back
+            self.trigger.cancel()
+        self.trigger()
+
+    def fire(self, dt):
+        self.callback(*self.args, **self.kwargs)
+
+    def cancel(self):
+        self.trigger.cancel()